@@ -4,17 +4,12 @@ Provides interactive prediction, network visualization, and model inferences.
 """
 
 from flask import Flask, render_template, request, jsonify
-import pandas as pd
-import numpy as np
 import os
-import re
 import sys
 import json
-import joblib
-import requests
-from collections import Counter
-from Bio.SeqUtils.ProtParam import ProteinAnalysis
-from xgboost import XGBClassifier
+import hashlib
+import threading
+from collections import OrderedDict
 
 app = Flask(__name__)
 
@@ -24,120 +19,95 @@ app = Flask(__name__)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODEL_PATH = os.path.join(BASE_DIR, "models", "ppi_xgboost_model.json")
 FEATURE_COLS_PATH = os.path.join(BASE_DIR, "models", "feature_columns.pkl")
-DATASET_PATH = os.path.join(BASE_DIR, "data", "processed", "final_ppi_dataset.csv")
-RESULTS_PATH = os.path.join(BASE_DIR, "results", "viral_wise_results.csv")
-IMPORTANCE_PATH = os.path.join(BASE_DIR, "results", "feature_importance_full.csv")
 
 # -------------------------
-# Feature extraction (same as pipeline)
+# Shared feature / sequence / dataset code (src/)
 # -------------------------
-AA = "ACDEFGHIKLMNPQRSTVWY"
+sys.path.insert(0, os.path.join(BASE_DIR, "src"))
+from engine import InferenceEngine
+from features import PROTEIN_NAMES, clean_seq, protein_features
+from predict import is_accession
+from seqcache import get_cache
+from snapshot import VIRAL_NAMES, build_snapshot, load_snapshot, save_snapshot
+from network import KINDS, NetworkIndex
 
-def clean_seq(s):
-    return re.sub(r"[^ACDEFGHIKLMNPQRSTVWY]", "", str(s).upper())
+def fetch_sequence(uniprot_id):
+    try:
+        return get_cache().get(uniprot_id)
+    except Exception:
+        return None, None
 
-def aac(seq):
-    c = Counter(seq)
-    return [c[a] / max(1, len(seq)) for a in AA]
+# -------------------------
+# Result cache
+# -------------------------
+LEN_COL, MW_COL, GRAVY_COL = (PROTEIN_NAMES.index(c) for c in ("len", "mw", "gravy"))
 
-def dpc(seq):
-    pairs = [seq[i:i+2] for i in range(len(seq)-1)]
-    c = Counter(pairs)
-    total = max(1, len(pairs))
-    return [c[a+b] / total for a in AA for b in AA]
+RESULT_CACHE_SIZE = 4096
+MAX_BATCH = 1000
 
-def physchem(seq):
-    if len(seq) < 5:
-        return [len(seq), 0.0, 0.0, 0.0]
-    try:
-        pa = ProteinAnalysis(seq)
-        return [len(seq), pa.molecular_weight(), pa.gravy(), pa.aromaticity()]
-    except Exception:
-        return [len(seq), 0.0, 0.0, 0.0]
+class ResultCache:
+    """Bounded LRU of prediction results keyed by (viral key, human key, model version)."""
 
-def fetch_sequence(uniprot_id):
-    url = f"https://rest.uniprot.org/uniprotkb/{uniprot_id}.fasta"
-    try:
-        r = requests.get(url, timeout=20)
-        if r.status_code == 200 and r.text.startswith(">"):
-            seq = "".join(r.text.splitlines()[1:])
-            # Also get protein name from header
-            header = r.text.splitlines()[0]
-            name = header.split("|")[-1].split(" OS=")[0].strip() if "|" in header else uniprot_id
-            return seq, name
-    except:
-        pass
-    return None, None
-
-# -------------------------
-# Load model + data on startup
-# -------------------------
-print("Loading model...")
-model = XGBClassifier()
-model.load_model(MODEL_PATH)
-feature_cols = joblib.load(FEATURE_COLS_PATH)
-
-# Load network data for visualization
-print("Loading network data...")
-network_data = {"nodes": [], "edges": []}
-viral_results = {}
-
-try:
-    df = pd.read_csv(DATASET_PATH, usecols=["viral_uniprot", "human_uniprot", "label"])
-    positives = df[df["label"] == 1]
-
-    # Build network: viral proteins and their top human targets
-    viral_proteins = positives["viral_uniprot"].unique().tolist()
-    
-    # Viral protein name mapping
-    VIRAL_NAMES = {
-        "P0DTC1": "ORF1ab (pp1a)", "P0DTC2": "Spike (S)", "P0DTC3": "ORF3a",
-        "P0DTC4": "Envelope (E)", "P0DTC5": "Membrane (M)", "P0DTC6": "ORF6",
-        "P0DTC7": "ORF7a", "P0DTC8": "ORF8", "P0DTC9": "Nucleocapsid (N)",
-        "P0DTD1": "ORF1ab (replicase)", "P0DTD2": "ORF9b", "P0DTD3": "ORF14",
-        "P0DTD8": "ORF7b", "A0A663DJA2": "ORF10"
-    }
-    
-    nodes = []
-    edges = []
-    
-    for vp in viral_proteins:
-        nodes.append({"id": vp, "label": VIRAL_NAMES.get(vp, vp), "type": "viral"})
-        
-        # Get top human targets for this viral protein
-        targets = positives[positives["viral_uniprot"] == vp]["human_uniprot"].value_counts().head(8).index.tolist()
-        for hp in targets:
-            if not any(n["id"] == hp for n in nodes):
-                nodes.append({"id": hp, "label": hp, "type": "human"})
-            edges.append({"source": vp, "target": hp})
-    
-    network_data = {"nodes": nodes, "edges": edges}
-    
-    # Compute inferences
-    interaction_counts = positives.groupby("viral_uniprot")["human_uniprot"].nunique().to_dict()
-    total_interactions = len(positives)
-    total_human = positives["human_uniprot"].nunique()
-    
-except Exception as e:
-    print(f"Warning: Could not load dataset: {e}")
-    interaction_counts = {}
-    total_interactions = 0
-    total_human = 0
-
-# Load results
-try:
-    results_df = pd.read_csv(RESULTS_PATH)
-    viral_results = results_df.to_dict('records')
-except:
-    viral_results = []
-
-# Load feature importance
-top_features = []
-try:
-    imp_df = pd.read_csv(IMPORTANCE_PATH).head(15)
-    top_features = imp_df.to_dict('records')
-except:
-    pass
+    def __init__(self, maxsize=RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+        return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+result_cache = ResultCache()
+
+# -------------------------
+# Model + startup snapshot
+# -------------------------
+# The snapshot (counts, results) is read from disk at boot; it is only rebuilt
+# from the dataset, and the model and network index only loaded, on first use.
+_lock = threading.Lock()
+_engine = None
+_network = None
+_snapshot = load_snapshot()
+
+def get_model():
+    """InferenceEngine, loaded on first use; feature columns are validated against the model once here."""
+    global _engine
+    with _lock:
+        if _engine is None:
+            print("Loading model...")
+            _engine = InferenceEngine.load(MODEL_PATH, FEATURE_COLS_PATH)
+    return _engine
+
+def get_snapshot():
+    global _snapshot
+    with _lock:
+        if _snapshot is None:
+            print("Snapshot missing or stale, building from dataset...")
+            _snapshot = build_snapshot()
+            try:
+                save_snapshot(_snapshot)
+            except OSError as e:
+                print(f"Warning: Could not save snapshot: {e}")
+    return _snapshot
+
+def get_network():
+    """Adjacency index over known + predicted edges; rebuilt when the dataset or edge list changes."""
+    global _network
+    with _lock:
+        if _network is None or _network.is_stale():
+            print("Building network index...")
+            _network = NetworkIndex.load()
+    return _network
 
 print("App ready!")
 
@@ -146,15 +116,152 @@ print("App ready!")
 # -------------------------
 @app.route("/")
 def index():
+    snap = get_snapshot()
     return render_template("index.html",
-                         network_data=json.dumps(network_data),
-                         viral_results=viral_results,
-                         top_features=top_features,
-                         interaction_counts=interaction_counts,
-                         total_interactions=total_interactions,
-                         total_human=total_human,
+                         viral_results=snap["viral_results"],
+                         top_features=snap["top_features"],
+                         interaction_counts=snap["interaction_counts"],
+                         total_interactions=snap["total_interactions"],
+                         total_human=snap["total_human"],
                          viral_names=json.dumps(VIRAL_NAMES))
 
+# -------------------------
+# Network API (paginated; the page fetches the graph incrementally)
+# -------------------------
+def _kind_arg():
+    kind = request.args.get("kind", "all")
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+    return kind
+
+@app.route("/api/network/summary")
+def network_summary():
+    return jsonify(get_network().summary())
+
+@app.route("/api/network/nodes")
+def network_nodes():
+    """?type=viral|human&q=&min_degree=&kind=&offset=&limit="""
+    node_type = request.args.get("type", "human")
+    if node_type not in ("viral", "human"):
+        return jsonify({"error": "type must be viral or human"}), 400
+    try:
+        return jsonify(get_network().nodes(
+            node_type, _kind_arg(), request.args.get("q", ""),
+            request.args.get("min_degree", 1, type=int),
+            request.args.get("offset", 0, type=int), request.args.get("limit", 100, type=int)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/api/network/neighbors/<node_id>")
+def network_neighbors(node_id):
+    """?kind=&offset=&limit="""
+    network = get_network()
+    if not network.has_node(node_id):
+        return jsonify({"error": f"Unknown protein: {node_id}"}), 404
+    try:
+        return jsonify(network.neighbors(
+            node_id, _kind_arg(),
+            request.args.get("offset", 0, type=int), request.args.get("limit", 100, type=int)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/api/network/subgraph")
+def network_subgraph():
+    """?min_degree=&kind=&offset=&limit= ; edges of human hubs first"""
+    try:
+        return jsonify(get_network().subgraph(
+            request.args.get("min_degree", 1, type=int), _kind_arg(),
+            request.args.get("offset", 0, type=int), request.args.get("limit", 500, type=int)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+# -------------------------
+# Scoring with result cache
+# -------------------------
+def _input_key(id_or_seq):
+    """Accessions are cached by ID, raw sequences by a hash of the cleaned sequence."""
+    if is_accession(id_or_seq):
+        return id_or_seq
+    return "seq:" + hashlib.sha1(clean_seq(id_or_seq).encode()).hexdigest()
+
+def _resolve(id_or_seq):
+    """Return (sequence, display name) for a UniProt ID or raw sequence, or (None, None)."""
+    if is_accession(id_or_seq):
+        return fetch_sequence(id_or_seq)
+    return id_or_seq, "custom sequence"
+
+def _protein_info(id_or_seq, name, block):
+    return {
+        "id": id_or_seq if is_accession(id_or_seq) else "custom",
+        "name": name or id_or_seq,
+        "seq_length": int(block[LEN_COL]),
+        "mw": round(float(block[MW_COL]), 1),
+        "gravy": round(float(block[GRAVY_COL]), 3),
+    }
+
+def score_pairs(pairs):
+    """
+    Score (viral, human) pairs of IDs or sequences with one model call.
+
+    Cached pairs are answered from the result cache; the rest are resolved
+    (each distinct input once), featurized and predicted together. Failed
+    pairs come back as {"error": ..., "status": 400}.
+    """
+    engine = get_model()
+    results = [None] * len(pairs)
+    todo = []
+    for i, (v, h) in enumerate(pairs):
+        key = (_input_key(v), _input_key(h), engine.version)
+        hit = result_cache.get(key)
+        if hit is not None:
+            results[i] = hit
+        else:
+            todo.append((i, key, v, h))
+    if not todo:
+        return results
+
+    inputs = list(dict.fromkeys([v for _, _, v, _ in todo] + [h for _, _, _, h in todo]))
+    resolved = {x: _resolve(x) for x in inputs}
+    seqs = [resolved[x][0] or "" for x in inputs]
+    features = protein_features(seqs)
+    blocks = dict(zip(inputs, features))
+    # model rows per input (with k-mer spectra appended for a k-mer model)
+    rows, row_of = engine.extend(features, seqs), {x: i for i, x in enumerate(inputs)}
+
+    ready = []
+    for i, key, v, h in todo:
+        if not resolved[v][0]:
+            results[i] = {"error": f"Could not fetch sequence for viral protein: {v}", "status": 400}
+        elif not resolved[h][0]:
+            results[i] = {"error": f"Could not fetch sequence for human protein: {h}", "status": 400}
+        elif blocks[v][LEN_COL] < 5 or blocks[h][LEN_COL] < 5:
+            results[i] = {"error": "Sequences too short after cleaning", "status": 400}
+        else:
+            ready.append((i, key, v, h))
+    if not ready:
+        return results
+
+    probs = engine.predict(engine.pair_matrix(
+        rows[[row_of[v] for _, _, v, _ in ready]],
+        rows[[row_of[h] for _, _, _, h in ready]]
+    ))
+
+    for (i, key, v, h), prob in zip(ready, probs):
+        prob = float(prob)
+        result = {
+            "prediction": "INTERACTING" if prob >= 0.5 else "NON-INTERACTING",
+            "probability": round(prob, 4),
+            "confidence": round(abs(prob - 0.5) * 200, 1),
+            "viral": _protein_info(v, resolved[v][1], blocks[v]),
+            "human": _protein_info(h, resolved[h][1], blocks[h]),
+        }
+        result_cache.put(key, result)
+        results[i] = result
+    return results
+
+# -------------------------
+# Prediction routes
+# -------------------------
 @app.route("/predict", methods=["POST"])
 def predict():
     data = request.json
@@ -165,60 +272,44 @@ def predict():
         return jsonify({"error": "Both viral and human protein IDs are required"}), 400
     
     try:
-        # Fetch sequences
-        viral_seq, viral_name = fetch_sequence(viral_id)
-        if not viral_seq:
-            return jsonify({"error": f"Could not fetch sequence for viral protein: {viral_id}"}), 400
-        
-        human_seq, human_name = fetch_sequence(human_id)
-        if not human_seq:
-            return jsonify({"error": f"Could not fetch sequence for human protein: {human_id}"}), 400
-        
-        # Clean sequences
-        v_clean = clean_seq(viral_seq)
-        h_clean = clean_seq(human_seq)
-        
-        if len(v_clean) < 5 or len(h_clean) < 5:
-            return jsonify({"error": "Sequences too short after cleaning"}), 400
-        
-        # Extract features
-        feat = aac(v_clean) + dpc(v_clean) + physchem(v_clean) + \
-               aac(h_clean) + dpc(h_clean) + physchem(h_clean)
-        
-        X = pd.DataFrame([feat], columns=feature_cols)
-        
-        # Predict
-        prob = float(model.predict_proba(X)[0, 1])
-        pred = "INTERACTING" if prob >= 0.5 else "NON-INTERACTING"
-        
-        # Physicochemical properties for display
-        v_pa = ProteinAnalysis(v_clean) if len(v_clean) >= 5 else None
-        h_pa = ProteinAnalysis(h_clean) if len(h_clean) >= 5 else None
-        
-        result = {
-            "prediction": pred,
-            "probability": round(prob, 4),
-            "confidence": round(abs(prob - 0.5) * 200, 1),
-            "viral": {
-                "id": viral_id,
-                "name": viral_name or viral_id,
-                "seq_length": len(v_clean),
-                "mw": round(v_pa.molecular_weight(), 1) if v_pa else 0,
-                "gravy": round(v_pa.gravy(), 3) if v_pa else 0,
-            },
-            "human": {
-                "id": human_id,
-                "name": human_name or human_id,
-                "seq_length": len(h_clean),
-                "mw": round(h_pa.molecular_weight(), 1) if h_pa else 0,
-                "gravy": round(h_pa.gravy(), 3) if h_pa else 0,
-            }
-        }
-        
+        result = score_pairs([(viral_id, human_id)])[0]
+        if "error" in result:
+            return jsonify({"error": result["error"]}), result["status"]
         return jsonify(result)
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/predict_batch", methods=["POST"])
+def predict_batch():
+    """Body: {"pairs": [{"viral_id": ..., "human_id": ...}, ...]}; results come back in order."""
+    data = request.json or {}
+    pairs = data.get("pairs")
+    if not isinstance(pairs, list) or not pairs:
+        return jsonify({"error": "Expected a non-empty 'pairs' list"}), 400
+    if len(pairs) > MAX_BATCH:
+        return jsonify({"error": f"At most {MAX_BATCH} pairs per request"}), 400
+
+    cleaned = []
+    for p in pairs:
+        v = str(p.get("viral_id", "")).strip() if isinstance(p, dict) else ""
+        h = str(p.get("human_id", "")).strip() if isinstance(p, dict) else ""
+        if not v or not h:
+            return jsonify({"error": "Every pair needs viral_id and human_id"}), 400
+        cleaned.append((v, h))
+
+    try:
+        results = score_pairs(cleaned)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    out = []
+    for (v, h), r in zip(cleaned, results):
+        if "error" in r:
+            out.append({"viral_id": v, "human_id": h, "error": r["error"]})
+        else:
+            out.append(r)
+    return jsonify({"results": out})
+
 if __name__ == "__main__":
     app.run(debug=True, port=5000)
@@ -0,0 +1,190 @@
+"""
+Adjacency index over the interaction network, served by the app's
+/api/network/* endpoints.
+
+Edges are the BioGRID positives of final_ppi_dataset ("known") plus, when
+results/predicted_edges.csv exists (written by src/interactome.py), the
+predicted interactions in it ("predicted"; a predicted pair that is also known
+stays one known edge carrying the probability).
+
+The index is built once per process. Every viral→human and human→viral
+neighbourhood is a precomputed array of edge rows (known first, then by
+probability), and edges are also kept ordered by the degree of their human
+endpoint, so a degree-filtered subgraph is a prefix of that order. A request
+only serializes the page it asks for.
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "src"))
+from dataset import DATASET, binary_paths, load_ids
+from snapshot import VIRAL_NAMES
+
+PREDICTED_EDGES = os.path.join(BASE_DIR, "results", "predicted_edges.csv")
+
+KINDS = ("all", "known", "predicted")
+MAX_PAGE = 1000
+
+def _sources(dataset=DATASET, predicted=PREDICTED_EDGES):
+    paths = [dataset, *binary_paths(dataset), predicted]
+    return {os.path.basename(p): os.path.getmtime(p) for p in paths if os.path.exists(p)}
+
+def page_bounds(total, offset=0, limit=100):
+    """Clamped (offset, limit) and the pagination fields of a response."""
+    offset = max(0, int(offset))
+    limit = max(1, min(int(limit), MAX_PAGE))
+    end = offset + limit
+    return offset, limit, {"total": int(total), "offset": offset, "limit": limit,
+                           "next_offset": end if end < total else None}
+
+class _View:
+    """Neighbourhoods, degrees and the degree-ordered edge list of one kind of edge."""
+
+    def __init__(self, edges, rows):
+        sub = edges.iloc[rows]
+        self.viral_degree = sub.groupby("viral_uniprot").size().to_dict()
+        self.human_degree = sub.groupby("human_uniprot").size().to_dict()
+
+        # neighbourhoods: known edges first, then by decreasing probability
+        rank = sub.assign(_pred=sub["kind"] != "known", _p=-sub["probability"].fillna(1.0))
+        by_viral = rank.sort_values(["viral_uniprot", "_pred", "_p", "human_uniprot"])
+        by_human = rank.sort_values(["human_uniprot", "_pred", "_p", "viral_uniprot"])
+        self.neighbours = {}
+        for df, key in ((by_viral, "viral_uniprot"), (by_human, "human_uniprot")):
+            ids = df[key].to_numpy()
+            pos = df.index.to_numpy()
+            starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]]) if len(ids) else np.empty(0, dtype=int)
+            for s, e in zip(starts, np.r_[starts[1:], len(ids)]):
+                self.neighbours[ids[s]] = pos[s:e]
+
+        # subgraph order: edges of high-degree human proteins first
+        h_deg = sub["human_uniprot"].map(self.human_degree).to_numpy()
+        order = np.lexsort((sub["viral_uniprot"].to_numpy(), sub["human_uniprot"].to_numpy(), -h_deg))
+        self.by_degree = sub.index.to_numpy()[order]
+        self.degree_sorted = h_deg[order]
+
+        # node lists, by decreasing degree
+        self.nodes = {
+            t: sorted(deg, key=lambda n: (-deg[n], n))
+            for t, deg in (("viral", self.viral_degree), ("human", self.human_degree))
+        }
+
+    def degree(self, node_id):
+        return self.viral_degree.get(node_id, self.human_degree.get(node_id, 0))
+
+class NetworkIndex:
+    def __init__(self, known, predicted=None, sources=None):
+        """
+        known: DataFrame of (viral_uniprot, human_uniprot) positives (one row per record)
+        predicted: optional DataFrame of (viral_uniprot, human_uniprot, probability)
+        sources: (dataset, predicted) paths the frames were read from, for is_stale()
+        """
+        keys = ["viral_uniprot", "human_uniprot"]
+        edges = known.groupby(keys).size().rename("evidence").reset_index()
+        edges["kind"] = "known"
+        edges["probability"] = np.nan
+        if predicted is not None and len(predicted):
+            pred = predicted[keys + ["probability"]].sort_values("probability", ascending=False)
+            pred = pred.drop_duplicates(keys)
+            edges = edges.drop(columns="probability").merge(pred, how="left", on=keys)
+            new = pred.merge(edges[keys], how="left", on=keys, indicator=True)
+            new = new[new["_merge"] == "left_only"].drop(columns="_merge")
+            edges = pd.concat([edges, new.assign(evidence=0, kind="predicted")], ignore_index=True)
+        self.edges = edges.reset_index(drop=True)[keys + ["kind", "probability", "evidence"]]
+        self.sources = sources
+        self._mtimes = _sources(*sources) if sources else None
+
+        kind = self.edges["kind"].to_numpy()
+        self.views = {
+            "all": _View(self.edges, np.arange(len(self.edges))),
+            "known": _View(self.edges, np.flatnonzero(kind == "known")),
+            "predicted": _View(self.edges, np.flatnonzero(kind == "predicted")),
+        }
+        self.viral_ids = set(self.views["all"].viral_degree)
+        self.human_ids = set(self.views["all"].human_degree)
+
+    @classmethod
+    def load(cls, dataset=DATASET, predicted=PREDICTED_EDGES):
+        ids = load_ids(dataset)
+        known = ids.loc[ids["label"] == 1, ["viral_uniprot", "human_uniprot"]]
+        pred = None
+        if os.path.exists(predicted):
+            pred = pd.read_csv(predicted, usecols=["viral_uniprot", "human_uniprot", "probability"])
+        return cls(known, pred, (dataset, predicted))
+
+    def is_stale(self):
+        return self.sources is not None and self._mtimes != _sources(*self.sources)
+
+    # -------------------------
+    # Serialization
+    # -------------------------
+    def _node(self, node_id, view):
+        kind = "viral" if node_id in self.viral_ids else "human"
+        label = VIRAL_NAMES.get(node_id, node_id) if kind == "viral" else node_id
+        return {"id": node_id, "label": label, "type": kind, "degree": int(view.degree(node_id))}
+
+    def _edges(self, rows):
+        e = self.edges.iloc[rows]
+        prob = e["probability"].to_numpy()
+        return [
+            {"source": v, "target": h, "kind": k, "evidence": int(n),
+             "probability": None if np.isnan(p) else round(float(p), 4)}
+            for v, h, k, n, p in zip(e["viral_uniprot"], e["human_uniprot"], e["kind"], e["evidence"], prob)
+        ]
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def summary(self):
+        view = self.views["all"]
+        counts = self.edges["kind"].value_counts()
+        return {
+            "viral_proteins": len(self.viral_ids),
+            "human_proteins": len(self.human_ids),
+            "known_edges": int(counts.get("known", 0)),
+            "predicted_edges": int(counts.get("predicted", 0)),
+            "max_human_degree": int(view.degree_sorted[0]) if len(view.degree_sorted) else 0,
+            "viral": [self._node(v, view) for v in view.nodes["viral"]],
+        }
+
+    def has_node(self, node_id):
+        return node_id in self.viral_ids or node_id in self.human_ids
+
+    def neighbors(self, node_id, kind="all", offset=0, limit=100):
+        """One page of the node's edges (known first, then by probability)."""
+        view = self.views[kind]
+        rows = view.neighbours.get(node_id, np.empty(0, dtype=int))
+        offset, limit, page = page_bounds(len(rows), offset, limit)
+        edges = self._edges(rows[offset:offset + limit])
+        other = "target" if node_id in self.viral_ids else "source"
+        return {**page, "node": self._node(node_id, view), "kind": kind,
+                "nodes": [self._node(e[other], view) for e in edges], "edges": edges}
+
+    def subgraph(self, min_degree=1, kind="all", offset=0, limit=500):
+        """
+        One page of the edges whose human protein interacts with at least
+        min_degree viral proteins, hubs first, with the nodes they touch.
+        """
+        view = self.views[kind]
+        total = int(np.searchsorted(-view.degree_sorted, -int(min_degree), side="right"))
+        offset, limit, page = page_bounds(total, offset, limit)
+        edges = self._edges(view.by_degree[offset:min(offset + limit, total)])
+        node_ids = list(dict.fromkeys(n for e in edges for n in (e["source"], e["target"])))
+        return {**page, "kind": kind, "min_degree": int(min_degree),
+                "nodes": [self._node(n, view) for n in node_ids], "edges": edges}
+
+    def nodes(self, node_type="human", kind="all", q="", min_degree=1, offset=0, limit=100):
+        """One page of viral or human proteins by decreasing degree, optionally filtered by ID / name."""
+        view = self.views[kind]
+        ids = view.nodes[node_type]
+        q = q.strip().upper()
+        deg = view.viral_degree if node_type == "viral" else view.human_degree
+        match = [n for n in ids if deg[n] >= min_degree
+                 and (not q or q in n.upper() or q in VIRAL_NAMES.get(n, "").upper())]
+        offset, limit, page = page_bounds(len(match), offset, limit)
+        return {**page, "type": node_type, "kind": kind,
+                "nodes": [self._node(n, view) for n in match[offset:offset + limit]]}
@@ -0,0 +1,94 @@
+"""
+Startup snapshot for the Flask app.
+
+Everything the index page needs from the dataset and results files
+(interaction counts, viral-wise results, top features) is computed once and
+written to data/processed/app_snapshot.json, so app workers boot by reading
+one small JSON file instead of parsing the dataset. The network graph itself is
+not part of the page; it is served in pages from network.py's index.
+
+Build it after the pipeline / evaluation scripts:
+    python app/snapshot.py
+The app rebuilds it lazily when it is missing or older than its sources.
+"""
+
+import os
+import sys
+import json
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "src"))
+from dataset import DATASET, binary_paths, load_ids
+
+SNAPSHOT_PATH = os.path.join(BASE_DIR, "data", "processed", "app_snapshot.json")
+RESULTS_PATH = os.path.join(BASE_DIR, "results", "viral_wise_results.csv")
+IMPORTANCE_PATH = os.path.join(BASE_DIR, "results", "feature_importance_full.csv")
+
+# Viral protein name mapping
+VIRAL_NAMES = {
+    "P0DTC1": "ORF1ab (pp1a)", "P0DTC2": "Spike (S)", "P0DTC3": "ORF3a",
+    "P0DTC4": "Envelope (E)", "P0DTC5": "Membrane (M)", "P0DTC6": "ORF6",
+    "P0DTC7": "ORF7a", "P0DTC8": "ORF8", "P0DTC9": "Nucleocapsid (N)",
+    "P0DTD1": "ORF1ab (replicase)", "P0DTD2": "ORF9b", "P0DTD3": "ORF14",
+    "P0DTD8": "ORF7b", "A0A663DJA2": "ORF10"
+}
+
+def _source_mtimes():
+    sources = [DATASET, *binary_paths(DATASET), binary_paths(DATASET, sparse=True)[0], RESULTS_PATH, IMPORTANCE_PATH]
+    return {os.path.basename(p): os.path.getmtime(p) for p in sources if os.path.exists(p)}
+
+def build_snapshot():
+    snap = {
+        "interaction_counts": {},
+        "total_interactions": 0,
+        "total_human": 0,
+        "viral_results": [],
+        "top_features": [],
+        "sources": _source_mtimes()
+    }
+
+    try:
+        df = load_ids(DATASET)
+        positives = df[df["label"] == 1]
+
+        counts = positives.groupby("viral_uniprot")["human_uniprot"].nunique()
+        snap["interaction_counts"] = {k: int(v) for k, v in counts.items()}
+        snap["total_interactions"] = int(len(positives))
+        snap["total_human"] = int(positives["human_uniprot"].nunique())
+    except Exception as e:
+        print(f"Warning: Could not load dataset: {e}")
+
+    try:
+        snap["viral_results"] = json.loads(pd.read_csv(RESULTS_PATH).to_json(orient="records"))
+    except Exception:
+        pass
+
+    try:
+        snap["top_features"] = json.loads(pd.read_csv(IMPORTANCE_PATH).head(15).to_json(orient="records"))
+    except Exception:
+        pass
+
+    return snap
+
+def save_snapshot(snap, path=SNAPSHOT_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(snap, f, separators=(",", ":"))
+    os.replace(path + ".tmp", path)
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    """Saved snapshot, or None if it is missing or older than its source files."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        snap = json.load(f)
+    if snap.get("sources") != _source_mtimes():
+        return None
+    return snap
+
+if __name__ == "__main__":
+    snap = build_snapshot()
+    save_snapshot(snap)
+    print(f"Interactions: {snap['total_interactions']} | Human proteins: {snap['total_human']}")
+    print(f"Saved → {SNAPSHOT_PATH}")
@@ -81,78 +81,109 @@ document.getElementById('viralInput').addEventListener('keypress', e => {
 });
 
 // ---- NETWORK GRAPH ----
+// The graph is fetched in pages from /api/network/*: hubs first, more on
+// "Load more", and a node's full neighbourhood on double-click.
 const canvas = document.getElementById('networkCanvas');
 const ctx = canvas.getContext('2d');
+const PAGE_SIZE = 400;
 let nodes = [], edges = [];
+let nodeById = new Map(), edgeKeys = new Set(), adjacency = new Map();
+let nextOffset = 0, totalEdges = 0, loading = false, generation = 0;
 let width, height;
 let dragging = null, offsetX = 0, offsetY = 0;
 let hovered = null;
+let drawPending = false;
 
-function initNetwork() {
-    const rect = canvas.parentElement.getBoundingClientRect();
-    width = canvas.width = rect.width;
-    height = canvas.height = 800;
+function networkKind() {
+    return document.getElementById('networkKind').value;
+}
 
-    const data = NETWORK_DATA;
-    if (!data.nodes.length) return;
+function setStatus(text) {
+    document.getElementById('networkStatus').textContent = text;
+}
 
-    // Position nodes - viral in center ring, human around
-    const viralNodes = data.nodes.filter(n => n.type === 'viral');
-    const humanNodes = data.nodes.filter(n => n.type === 'human');
+function updateStatus() {
+    const more = nextOffset !== null;
+    document.getElementById('networkMore').disabled = !more || loading;
+    setStatus(`${nodes.length} proteins · ${edges.length} of ${totalEdges} interactions shown`);
+}
 
+// Place a new node near a neighbour already on the canvas (or on a ring)
+function addNode(n, near) {
+    let node = nodeById.get(n.id);
+    if (node) {
+        node.degree = n.degree;
+        return null;
+    }
     const cx = width / 2, cy = height / 2;
+    const angle = Math.random() * Math.PI * 2;
+    const r = near ? 40 + Math.random() * 60 : (n.type === 'viral' ? 180 : 250 + Math.random() * 150);
+    const ox = near ? near.x : cx, oy = near ? near.y : cy;
+    node = {
+        ...n, x: ox + Math.cos(angle) * r, y: oy + Math.sin(angle) * r,
+        vx: 0, vy: 0, radius: n.type === 'viral' ? 18 : 8
+    };
+    nodes.push(node);
+    nodeById.set(n.id, node);
+    adjacency.set(n.id, new Set());
+    return node;
+}
 
-    viralNodes.forEach((n, i) => {
-        const angle = (i / viralNodes.length) * Math.PI * 2;
-        const r = 180;
-        nodes.push({
-            ...n, x: cx + Math.cos(angle) * r, y: cy + Math.sin(angle) * r,
-            vx: 0, vy: 0, radius: 18
-        });
-    });
+function addEdge(e) {
+    const key = `${e.source}|${e.target}`;
+    if (edgeKeys.has(key)) return;
+    const source = nodeById.get(e.source), target = nodeById.get(e.target);
+    if (!source || !target) return;
+    edgeKeys.add(key);
+    edges.push({ source, target, kind: e.kind, probability: e.probability });
+    adjacency.get(source.id).add(target.id);
+    adjacency.get(target.id).add(source.id);
+}
 
-    humanNodes.forEach((n, i) => {
-        const angle = (i / humanNodes.length) * Math.PI * 2 + 0.5;
-        const r = 250 + Math.random() * 150;
-        nodes.push({
-            ...n, x: cx + Math.cos(angle) * r, y: cy + Math.sin(angle) * r,
-            vx: 0, vy: 0, radius: 8
-        });
+// Add one API page; only the newly added nodes are relaxed
+function addPage(data, anchor) {
+    const added = [];
+    data.nodes.forEach(n => {
+        const node = addNode(n, anchor || null);
+        if (node) added.push(node);
     });
+    data.edges.forEach(addEdge);
+    relax(added);
+    scheduleDraw();
+}
 
-    edges = data.edges.map(e => ({
-        source: nodes.find(n => n.id === e.source),
-        target: nodes.find(n => n.id === e.target)
-    })).filter(e => e.source && e.target);
-
-    // Simple force simulation
-    for (let iter = 0; iter < 120; iter++) {
+// Bounded force relaxation: cost is (new nodes × all nodes) per iteration
+function relax(moving) {
+    if (!moving.length) return;
+    const cx = width / 2, cy = height / 2;
+    const moved = new Set(moving.map(n => n.id));
+    const iterations = Math.max(20, Math.min(120, Math.floor(200000 / (moving.length * nodes.length + 1))));
+    for (let iter = 0; iter < iterations; iter++) {
         // Repulsion
-        for (let i = 0; i < nodes.length; i++) {
-            for (let j = i + 1; j < nodes.length; j++) {
-                const dx = nodes[j].x - nodes[i].x;
-                const dy = nodes[j].y - nodes[i].y;
+        moving.forEach(a => {
+            nodes.forEach(b => {
+                if (a === b) return;
+                const dx = b.x - a.x;
+                const dy = b.y - a.y;
                 const dist = Math.max(1, Math.sqrt(dx * dx + dy * dy));
                 const force = 1200 / (dist * dist);
-                nodes[i].vx -= (dx / dist) * force;
-                nodes[i].vy -= (dy / dist) * force;
-                nodes[j].vx += (dx / dist) * force;
-                nodes[j].vy += (dy / dist) * force;
-            }
-        }
-        // Attraction (edges)
+                a.vx -= (dx / dist) * force;
+                a.vy -= (dy / dist) * force;
+            });
+        });
+        // Attraction (edges touching a moving node)
         edges.forEach(e => {
+            const s = moved.has(e.source.id), t = moved.has(e.target.id);
+            if (!s && !t) return;
             const dx = e.target.x - e.source.x;
             const dy = e.target.y - e.source.y;
-            const dist = Math.sqrt(dx * dx + dy * dy);
+            const dist = Math.max(1, Math.sqrt(dx * dx + dy * dy));
             const force = (dist - 120) * 0.01;
-            e.source.vx += (dx / dist) * force;
-            e.source.vy += (dy / dist) * force;
-            e.target.vx -= (dx / dist) * force;
-            e.target.vy -= (dy / dist) * force;
+            if (s) { e.source.vx += (dx / dist) * force; e.source.vy += (dy / dist) * force; }
+            if (t) { e.target.vx -= (dx / dist) * force; e.target.vy -= (dy / dist) * force; }
         });
         // Center gravity
-        nodes.forEach(n => {
+        moving.forEach(n => {
             n.vx += (cx - n.x) * 0.005;
             n.vy += (cy - n.y) * 0.005;
             n.x += n.vx * 0.3;
@@ -164,31 +195,128 @@ function initNetwork() {
             n.y = Math.max(20, Math.min(height - 20, n.y));
         });
     }
+}
+
+async function fetchJSON(url) {
+    const res = await fetch(url);
+    const data = await res.json();
+    if (!res.ok) throw new Error(data.error || `Request failed (${res.status})`);
+    return data;
+}
+
+async function loadMoreEdges() {
+    if (loading || nextOffset === null) return;
+    loading = true;
+    const gen = generation;
+    updateStatus();
+    try {
+        const minDegree = Math.max(1, parseInt(document.getElementById('networkMinDegree').value) || 1);
+        const data = await fetchJSON(`/api/network/subgraph?kind=${networkKind()}&min_degree=${minDegree}`
+            + `&offset=${nextOffset}&limit=${PAGE_SIZE}`);
+        if (gen !== generation) return;
+        totalEdges = data.total;
+        nextOffset = data.next_offset;
+        addPage(data);
+    } catch (err) {
+        setStatus(err.message);
+        return;
+    } finally {
+        if (gen === generation) loading = false;
+    }
+    updateStatus();
+}
+
+// All partners of one protein, page by page
+async function expandNode(node) {
+    const gen = generation;
+    let offset = 0;
+    try {
+        while (offset !== null && gen === generation) {
+            setStatus(`Loading partners of ${node.label}...`);
+            const data = await fetchJSON(`/api/network/neighbors/${encodeURIComponent(node.id)}`
+                + `?kind=${networkKind()}&offset=${offset}&limit=${PAGE_SIZE}`);
+            if (gen !== generation) return;
+            addPage(data, node);
+            offset = data.next_offset;
+        }
+    } catch (err) {
+        setStatus(err.message);
+        return;
+    }
+    updateStatus();
+}
+
+async function initNetwork() {
+    const rect = canvas.parentElement.getBoundingClientRect();
+    width = canvas.width = rect.width;
+    height = canvas.height = 800;
+
+    const gen = generation;
+    try {
+        // Viral proteins are always drawn, in the inner ring
+        const summary = await fetchJSON('/api/network/summary');
+        if (gen !== generation) return;
+        const cx = width / 2, cy = height / 2;
+        summary.viral.forEach((n, i) => {
+            const node = addNode(n);
+            const angle = (i / summary.viral.length) * Math.PI * 2;
+            node.x = cx + Math.cos(angle) * 180;
+            node.y = cy + Math.sin(angle) * 180;
+        });
+        scheduleDraw();
+    } catch (err) {
+        setStatus(err.message);
+        return;
+    }
+    await loadMoreEdges();
+}
 
-    drawNetwork();
+function resetNetwork() {
+    generation++;
+    nodes = []; edges = [];
+    nodeById = new Map(); edgeKeys = new Set(); adjacency = new Map();
+    nextOffset = 0; totalEdges = 0; loading = false;
+    hovered = null;
+    scheduleDraw();
+    initNetwork();
+}
+
+// The canvas is redrawn when something changes (a page arrives, hover, drag), at most once per frame
+function scheduleDraw() {
+    if (drawPending) return;
+    drawPending = true;
+    requestAnimationFrame(() => {
+        drawPending = false;
+        drawNetwork();
+    });
 }
 
 function drawNetwork() {
     ctx.clearRect(0, 0, width, height);
+    const neighbours = hovered ? adjacency.get(hovered.id) : null;
 
     // Draw edges
     edges.forEach(e => {
         const isHighlighted = hovered && (hovered.id === e.source.id || hovered.id === e.target.id);
+        const predicted = e.kind === 'predicted';
         ctx.beginPath();
         ctx.moveTo(e.source.x, e.source.y);
         ctx.lineTo(e.target.x, e.target.y);
-        ctx.strokeStyle = isHighlighted ? 'rgba(6,182,212,0.5)' : 'rgba(255,255,255,0.06)';
+        ctx.setLineDash(predicted ? [4, 4] : []);
+        if (predicted) {
+            ctx.strokeStyle = isHighlighted ? 'rgba(245,158,11,0.6)' : 'rgba(245,158,11,0.08)';
+        } else {
+            ctx.strokeStyle = isHighlighted ? 'rgba(6,182,212,0.5)' : 'rgba(255,255,255,0.06)';
+        }
         ctx.lineWidth = isHighlighted ? 1.5 : 0.5;
         ctx.stroke();
     });
+    ctx.setLineDash([]);
 
     // Draw nodes
     nodes.forEach(n => {
         const isHov = hovered && hovered.id === n.id;
-        const isConnected = hovered && edges.some(e =>
-            (e.source.id === hovered.id && e.target.id === n.id) ||
-            (e.target.id === hovered.id && e.source.id === n.id)
-        );
+        const isConnected = neighbours && neighbours.has(n.id);
 
         ctx.beginPath();
         ctx.arc(n.x, n.y, isHov ? n.radius + 3 : n.radius, 0, Math.PI * 2);
@@ -213,16 +341,14 @@ function drawNetwork() {
             ctx.fillText(n.label, n.x, n.y - n.radius - 8);
         }
 
-        // Labels for human proteins (show always, highlight on hover)
-        if (n.type === 'human') {
+        // Labels for human proteins (always while the graph is small, else on hover)
+        if (n.type === 'human' && (nodes.length < 300 || isHov || isConnected)) {
             ctx.font = isHov ? '600 11px Inter, sans-serif' : '500 10px Inter, sans-serif';
             ctx.textAlign = 'center';
             ctx.fillStyle = isHov || isConnected ? '#e5e7eb' : '#9ca3af';
             ctx.fillText(n.id, n.x, n.y - n.radius - 6);
         }
     });
-
-    requestAnimationFrame(drawNetwork);
 }
 
 // Mouse interactions for network
@@ -234,6 +360,7 @@ canvas.addEventListener('mousemove', e => {
     if (dragging) {
         dragging.x = mx + offsetX;
         dragging.y = my + offsetY;
+        scheduleDraw();
         return;
     }
 
@@ -245,6 +372,7 @@ canvas.addEventListener('mousemove', e => {
             break;
         }
     }
+    if (found !== hovered) scheduleDraw();
     hovered = found;
     canvas.style.cursor = found ? 'pointer' : 'grab';
 
@@ -253,9 +381,10 @@ canvas.addEventListener('mousemove', e => {
     if (found) {
         document.getElementById('nodeInfoTitle').textContent = found.type === 'viral'
             ? `🦠 ${found.label}` : `🧬 ${found.id}`;
-        const connCount = edges.filter(e => e.source.id === found.id || e.target.id === found.id).length;
+        const shown = adjacency.get(found.id).size;
         document.getElementById('nodeInfoDetail').textContent =
-            `${found.type === 'viral' ? 'Viral' : 'Human'} protein · ${connCount} interactions`;
+            `${found.type === 'viral' ? 'Viral' : 'Human'} protein · ${found.degree} interactions`
+            + (shown < found.degree ? ` (${shown} shown, double-click for all)` : '');
         info.classList.remove('hidden');
     } else {
         info.classList.add('hidden');
@@ -271,14 +400,21 @@ canvas.addEventListener('mousedown', e => {
     }
 });
 
+canvas.addEventListener('dblclick', () => {
+    if (hovered) expandNode(hovered);
+});
+
 canvas.addEventListener('mouseup', () => { dragging = null; });
-canvas.addEventListener('mouseleave', () => { dragging = null; hovered = null; });
+canvas.addEventListener('mouseleave', () => {
+    dragging = null;
+    hovered = null;
+    scheduleDraw();
+});
 
 // Init
 window.addEventListener('load', () => {
     initNetwork();
 });
 window.addEventListener('resize', () => {
-    nodes = []; edges = [];
-    initNetwork();
+    resetNetwork();
 });
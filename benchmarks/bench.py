@@ -0,0 +1,259 @@
+"""
+Micro and end-to-end benchmarks for the PPI stack.
+
+Everything runs on synthetic protein sequences whose lengths follow a
+log-normal distribution clipped to 30–7000 aa (plus one ORF1ab-sized
+protein), with UniProt fetching stubbed out, so results do not depend on the
+network or on data/processed/ being present. If models/ppi_xgboost_model.json
+is missing, a small synthetic model with the same feature layout is used.
+
+Usage:
+    python benchmarks/bench.py                                  # print + write JSON
+    python benchmarks/bench.py --save-baseline                  # store as baseline
+    python benchmarks/bench.py --baseline benchmarks/baseline.json --quick
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import runpy
+import argparse
+import platform
+import tempfile
+import functools
+import contextlib
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "src"))
+
+import features
+import predict
+import biogrid
+import fetch
+from xgboost import XGBClassifier
+
+BENCH_DIR = os.path.join(BASE_DIR, "benchmarks")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+OUTPUT_PATH = os.path.join(BENCH_DIR, "results.json")
+
+# -------------------------
+# Synthetic data
+# -------------------------
+def synthetic_sequences(n, seed=0, min_len=30, max_len=7000):
+    """n random sequences with realistic lengths (median ~400 aa); the first is ORF1ab-sized."""
+    rng = np.random.default_rng(seed)
+    lengths = np.clip(rng.lognormal(mean=6.0, sigma=0.7, size=n), min_len, max_len).astype(int)
+    if n:
+        lengths[0] = 7096
+    letters = np.frombuffer(features.AA.encode(), dtype=np.uint8)
+    return [letters[rng.integers(0, 20, size=L)].tobytes().decode() for L in lengths]
+
+def synthetic_model(seed=0):
+    """Small model over the pipeline column layout, used when no trained model is present."""
+    rng = np.random.default_rng(seed)
+    X = rng.random((400, len(features.FEATURE_COLUMNS)), dtype=np.float32)
+    y = rng.integers(0, 2, size=400)
+    model = XGBClassifier(n_estimators=100, max_depth=6, tree_method="hist", n_jobs=1)
+    model.fit(pd.DataFrame(X, columns=features.FEATURE_COLUMNS), y)
+    return model, list(features.FEATURE_COLUMNS)
+
+def load_bench_model():
+    if os.path.exists(predict.MODEL_PATH):
+        return predict.load_model() + ("trained",)
+    return synthetic_model() + ("synthetic",)
+
+# -------------------------
+# Timing
+# -------------------------
+def timeit(fn, repeat=5, number=1, items=1):
+    """Best / median wall time of `number` calls, over `repeat` rounds."""
+    fn()  # warm-up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return {
+        "best_s": min(times),
+        "median_s": float(np.median(times)),
+        "items": items,
+        "per_item_us": min(times) / items * 1e6,
+    }
+
+# -------------------------
+# Benchmarks
+# -------------------------
+def bench_features(seqs, repeat):
+    out = {}
+    dirty = [s[:50] + "xX*-" + s[50:] for s in seqs]
+    cleaned = [features.clean_seq(s) for s in seqs]
+    out["clean_seq"] = timeit(lambda: [features.clean_seq(s) for s in dirty], repeat, items=len(seqs))
+    out["aac"] = timeit(lambda: [features.aac(s) for s in cleaned], repeat, items=len(seqs))
+    out["dpc"] = timeit(lambda: [features.dpc(s) for s in cleaned], repeat, items=len(seqs))
+    out["physchem"] = timeit(lambda: [features.physchem(s) for s in cleaned], repeat, items=len(seqs))
+    out["protein_features_batch"] = timeit(lambda: features.protein_features(cleaned), repeat, items=len(seqs))
+    pairs = list(zip(cleaned[1::2], cleaned[::2]))
+    out["extract_pair_features"] = timeit(
+        lambda: [features.extract_pair_features(v, h) for v, h in pairs], repeat, items=len(pairs))
+    return out
+
+@contextlib.contextmanager
+def stubbed_fetch(seq_by_id):
+    """Serve sequences from a dict instead of UniProt."""
+    original = predict.fetch_sequence
+    predict.fetch_sequence = seq_by_id.get
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        predict.fetch_sequence = original
+
+def bench_predict(seqs, model, feature_cols, repeat, n_pairs):
+    out = {}
+    viral_ids = [f"V{i:04d}" for i in range(14)]
+    human_ids = [f"H{i:05d}" for i in range(len(seqs))]
+    seq_by_id = dict(zip(viral_ids, seqs[:14]))
+    seq_by_id.update(zip(human_ids, seqs))
+
+    rng = random.Random(0)
+    pairs = [(rng.choice(viral_ids), rng.choice(human_ids)) for _ in range(n_pairs)]
+    with stubbed_fetch(seq_by_id):
+        out["predict_interaction"] = timeit(
+            lambda: [predict.predict_interaction(v, h, model, feature_cols) for v, h in pairs[:20]],
+            repeat, items=20)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            csv = os.path.join(tmp, "pairs.csv")
+            pd.DataFrame(pairs, columns=["viral_uniprot", "human_uniprot"]).to_csv(csv, index=False)
+            out["batch_predict"] = timeit(
+                lambda: predict.batch_predict(csv, model=model, feature_cols=feature_cols),
+                max(1, repeat // 2), items=n_pairs)
+    return out
+
+def bench_pipeline(n_human, n_interactions, repeat):
+    """End-to-end pipeline.py on a synthetic BioGRID release in a temporary tree."""
+    seqs = synthetic_sequences(n_human + 14, seed=1)
+    viral_ids = [f"P0DT{i:02d}" for i in range(14)]
+    human_ids = [f"Q{i:05d}" for i in range(n_human)]
+    viral_seq = dict(zip(viral_ids, seqs[:14]))
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "src"))
+        os.makedirs(os.path.join(tmp, "data", "processed"))
+        shutil.copy(os.path.join(BASE_DIR, "src", "pipeline.py"), os.path.join(tmp, "src", "pipeline.py"))
+        pd.DataFrame({"uniprot": human_ids, "sequence": seqs[14:]}).to_csv(
+            os.path.join(tmp, "data", "processed", "human_sequences_clean.csv"), index=False)
+
+        bg_file = os.path.join(tmp, "biogrid.tab3.txt")
+        pd.DataFrame({
+            "Organism ID Interactor A": biogrid.SARS_COV2_TAXID,
+            "Organism ID Interactor B": biogrid.HUMAN_TAXID,
+            "SWISS-PROT Accessions Interactor A": [rng.choice(viral_ids) for _ in range(n_interactions)],
+            "SWISS-PROT Accessions Interactor B": [rng.choice(human_ids) for _ in range(n_interactions)],
+            "REFSEQ Accessions Interactor A": "-",
+            "Systematic Name Interactor A": "-",
+        }).to_csv(bg_file, sep="\t", index=False)
+
+        def stub_fetch(accessions, **kwargs):
+            accessions = list(accessions)
+            return ({a: viral_seq[a] for a in accessions},
+                    [{"accession": a, "status": "ok", "attempts": 1, "error": None, "seconds": 0.0} for a in accessions])
+
+        patched = {
+            (biogrid, "BIOGRID_FILE"): bg_file,
+            (biogrid, "load_biogrid"): functools.partial(biogrid.load_biogrid, cache_dir=None),
+            (fetch, "fetch_fasta_many"): stub_fetch,
+        }
+        saved = {k: getattr(*k) for k in patched}
+        for (mod, name), value in patched.items():
+            setattr(mod, name, value)
+        try:
+            def run():
+                # from scratch every time: no stage checkpoints, feature store or previous build
+                shutil.rmtree(os.path.join(tmp, "data", "cache"), ignore_errors=True)
+                argv, sys.argv = sys.argv, ["pipeline.py", "--full"]
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        runpy.run_path(os.path.join(tmp, "src", "pipeline.py"), run_name="__main__")
+                finally:
+                    sys.argv = argv
+            return {"pipeline_end_to_end": timeit(run, repeat, items=n_interactions)}
+        finally:
+            for (mod, name), value in saved.items():
+                setattr(mod, name, value)
+
+# -------------------------
+# Baseline comparison
+# -------------------------
+def compare(results, baseline):
+    """current / baseline best time per benchmark (< 1 is faster)."""
+    out = {}
+    for name, r in results.items():
+        if name in baseline.get("results", {}):
+            base = baseline["results"][name]["best_s"]
+            out[name] = {"baseline_s": base, "current_s": r["best_s"], "ratio": r["best_s"] / base if base else None}
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PPI feature / prediction / pipeline paths")
+    parser.add_argument("--quick", action="store_true", help="Fewer sequences and repeats")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="JSON results file")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Also write the results as the new baseline")
+    parser.add_argument("--only", nargs="*", choices=["features", "predict", "pipeline"], help="Subset of benchmark groups")
+    args = parser.parse_args()
+
+    n_seqs, repeat, n_pairs, n_human, n_inter = (60, 3, 500, 300, 600) if args.quick else (300, 5, 5000, 2000, 5000)
+    groups = set(args.only or ["features", "predict", "pipeline"])
+    seqs = synthetic_sequences(n_seqs)
+
+    results = {}
+    model_kind = None
+    if "features" in groups:
+        results.update(bench_features(seqs, repeat))
+    if "predict" in groups:
+        model, feature_cols, model_kind = load_bench_model()
+        results.update(bench_predict(seqs, model, feature_cols, repeat, n_pairs))
+    if "pipeline" in groups:
+        results.update(bench_pipeline(n_human, n_inter, max(1, repeat // 2)))
+
+    import xgboost
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "xgboost": xgboost.__version__,
+            "cpus": os.cpu_count(),
+            "quick": args.quick,
+            "model": model_kind,
+            "n_sequences": n_seqs,
+        },
+        "results": results,
+    }
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            report["comparison"] = compare(results, json.load(f))
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({k: v for k, v in report.items() if k != "comparison"}, f, indent=2)
+
+    print(f"{'benchmark':<26}{'best (s)':>12}{'per item (us)':>16}{'vs baseline':>14}")
+    for name, r in results.items():
+        ratio = report.get("comparison", {}).get(name, {}).get("ratio")
+        print(f"{name:<26}{r['best_s']:>12.4f}{r['per_item_us']:>16.1f}{(f'{ratio:.2f}x' if ratio else '-'):>14}")
+    print(f"\nSaved → {args.output}")
+
+if __name__ == "__main__":
+    main()
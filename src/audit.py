@@ -1,28 +1,24 @@
 import pandas as pd
 import os
 
+from biogrid import BIOGRID_FILE, SARS_COV2_TAXID, load_biogrid
+from dataset import load_ids
+
 print("\n=== BIOGRID VIRAL PROTEIN AUDIT (GROUND TRUTH) ===\n")
 
 # =========================
 # Paths
 # =========================
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-BIOGRID_FILE = os.path.join(BASE_DIR, "data", "raw", "BIOGRID-PROJECT-covid19_coronavirus_project-5.0.251", "BIOGRID-PROJECT-covid19_coronavirus_project-INTERACTIONS-5.0.251.tab3.txt")
 RESULTS_DIR = os.path.join(BASE_DIR, "results")
 
 # =========================
-# 1. Load BioGRID file
-# =========================
-biogrid = pd.read_csv(BIOGRID_FILE, sep="\t", low_memory=False)
-
-print("Total BioGRID rows:", len(biogrid))
-
-# =========================
-# 2. Filter SARS-CoV-2 interactions
+# 1-2. Load BioGRID file, filtered to SARS-CoV-2 interactions
 # =========================
-# SARS-CoV-2 taxonomy ID = 2697049
-viral_rows = biogrid[biogrid["Organism ID Interactor A"] == 2697049]
+# SARS-CoV-2 taxonomy ID = 2697049 (filtered while streaming)
+viral_rows = load_biogrid(BIOGRID_FILE, organism_a=SARS_COV2_TAXID)
 
+print("Total BioGRID rows:", viral_rows.attrs["source_rows"])
 print("Total SARS-CoV-2 interaction rows:", len(viral_rows))
 
 # =========================
@@ -63,7 +59,7 @@ print("\nSaved → results/biogrid_all_viral_uniprot_ids.csv")
 DATASET_FILE = os.path.join(BASE_DIR, "data", "processed", "final_ppi_dataset.csv")
 
 if os.path.exists(DATASET_FILE):
-    dataset = pd.read_csv(DATASET_FILE, usecols=["viral_uniprot"])
+    dataset = load_ids(DATASET_FILE)
     dataset_viral = set(dataset["viral_uniprot"].unique())
     biogrid_set = set(biogrid_viral_ids["viral_uniprot"])
 
@@ -0,0 +1,87 @@
+"""
+Streaming BioGRID tab3 loader shared by pipeline.py and audit.py.
+
+Only the columns we use are read, with explicit dtypes, and rows are filtered
+on organism chunk by chunk so the full interaction table never sits in memory.
+The filtered extract is cached as a pickle under data/cache/, keyed by the
+SHA-1 of the source file plus the filter and column selection, so a second run
+on the same release skips parsing entirely.
+"""
+
+import os
+import hashlib
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BIOGRID_FILE = os.path.join(BASE_DIR, "data", "raw", "BIOGRID-PROJECT-covid19_coronavirus_project-5.0.251", "BIOGRID-PROJECT-covid19_coronavirus_project-INTERACTIONS-5.0.251.tab3.txt")
+CACHE_DIR = os.path.join(BASE_DIR, "data", "cache")
+
+SARS_COV2_TAXID = 2697049
+HUMAN_TAXID = 9606
+
+COLUMNS = {
+    "Organism ID Interactor A": "int32",
+    "Organism ID Interactor B": "int32",
+    "SWISS-PROT Accessions Interactor A": "object",
+    "SWISS-PROT Accessions Interactor B": "object",
+    "REFSEQ Accessions Interactor A": "object",
+    "Systematic Name Interactor A": "object",
+}
+
+_hash_memo = {}
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-1 of a file's contents ("missing" if absent), memoized on (size, mtime)."""
+    if not os.path.exists(path):
+        return "missing"
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if memo_key not in _hash_memo:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                h.update(block)
+        _hash_memo[memo_key] = h.hexdigest()
+    return _hash_memo[memo_key]
+
+def _cache_path(path, organism_a, organism_b, columns, cache_dir):
+    key = hashlib.sha1("|".join(
+        [file_hash(path), str(organism_a), str(organism_b)] + list(columns)
+    ).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"biogrid_{key}.pkl")
+
+def load_biogrid(path=BIOGRID_FILE, organism_a=SARS_COV2_TAXID, organism_b=None,
+                 columns=None, chunksize=100_000, cache_dir=CACHE_DIR):
+    """
+    Load BioGRID interactions whose interactor A (and optionally B) match the given taxonomy IDs.
+
+    Returns a DataFrame with the requested columns (default: COLUMNS). The
+    number of rows in the source file is kept in df.attrs["source_rows"].
+    """
+    columns = list(columns or COLUMNS)
+    cache_file = _cache_path(path, organism_a, organism_b, columns, cache_dir) if cache_dir else None
+    if cache_file and os.path.exists(cache_file):
+        return pd.read_pickle(cache_file)
+
+    needed = list(dict.fromkeys(columns + ["Organism ID Interactor A", "Organism ID Interactor B"]))
+    dtypes = {c: COLUMNS.get(c, "object") for c in needed}
+
+    parts = []
+    source_rows = 0
+    for chunk in pd.read_csv(path, sep="\t", usecols=needed, dtype=dtypes, chunksize=chunksize):
+        source_rows += len(chunk)
+        mask = pd.Series(True, index=chunk.index)
+        if organism_a is not None:
+            mask &= chunk["Organism ID Interactor A"] == organism_a
+        if organism_b is not None:
+            mask &= chunk["Organism ID Interactor B"] == organism_b
+        parts.append(chunk.loc[mask, columns])
+
+    df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+    df.attrs["source_rows"] = source_rows
+
+    if cache_file:
+        os.makedirs(cache_dir, exist_ok=True)
+        df.to_pickle(cache_file + ".tmp")
+        os.replace(cache_file + ".tmp", cache_file)
+    return df
@@ -0,0 +1,253 @@
+"""
+Grouped cross-validation engine used by eval_viral_cv.py.
+
+The feature matrix is quantized once into a reference QuantileDMatrix (the
+hist bins); each fold then builds its training matrix against that reference
+by streaming its rows in batches, so the full fold subset is never copied and
+no fold re-sketches the quantiles. Folds run concurrently on a thread pool
+(XGBoost releases the GIL) under an explicit core budget:
+parallel folds × threads per fold <= cores.
+
+Shared bins are opt-in: their cut points come from all rows, so metrics move
+slightly. By default every fold sketches its own bins from its training rows,
+which reproduces the per-fold XGBClassifier.fit() results exactly.
+
+tune.py builds on the same pieces: grouped_folds() / validation_split() give
+viral-grouped folds with a held-out validation set, and fit_early_stopping()
+trains one fold until the validation AUC stops improving. The best
+configuration it finds is saved to models/tuned_params.json (load_tuned()).
+"""
+
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from sklearn.metrics import roc_auc_score, average_precision_score
+
+from dataset import take_rows
+
+# Same model as train.py / the original eval_viral_cv.py, in native xgb.train terms
+PARAMS = {
+    "max_depth": 8,
+    "eta": 0.05,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+    "objective": "binary:logistic",
+    "eval_metric": "auc",
+    "tree_method": "hist",
+    "seed": 42,
+}
+N_ROUNDS = 500
+MAX_BIN = 256
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TUNED_PARAMS_PATH = os.path.join(BASE_DIR, "models", "tuned_params.json")
+
+class RowBatches(xgb.DataIter):
+    """Feed rows of X (a view, memory map or CSR matrix) to XGBoost in batches without materializing the subset."""
+
+    def __init__(self, X, y, rows, batch_size=4096):
+        self.X, self.y, self.rows = X, y, rows
+        self.batch_size = batch_size
+        self._pos = 0
+        super().__init__()
+
+    def next(self, input_data):
+        if self._pos >= len(self.rows):
+            return False
+        r = self.rows[self._pos:self._pos + self.batch_size]
+        input_data(data=take_rows(self.X, r), label=self.y[r])
+        self._pos += self.batch_size
+        return True
+
+    def reset(self):
+        self._pos = 0
+
+def shared_bins(X, y, max_bin=MAX_BIN, nthread=None):
+    """Quantize the whole matrix once; folds reference these bins."""
+    return xgb.QuantileDMatrix(X, label=y, max_bin=max_bin, nthread=nthread)
+
+def fold_matrix(X, y, rows, ref=None, max_bin=MAX_BIN, nthread=None):
+    if ref is None:
+        return xgb.QuantileDMatrix(take_rows(X, rows), label=y[rows], max_bin=max_bin, nthread=nthread)
+    return xgb.QuantileDMatrix(RowBatches(X, y, rows), ref=ref, max_bin=max_bin, nthread=nthread)
+
+def leave_one_group_out(groups, y):
+    """
+    Yield (group, train_rows, test_rows) for every group, in sorted order.
+    Groups whose test rows hold a single class are yielded with test_rows=None.
+    """
+    for g in sorted(np.unique(groups)):
+        test = np.flatnonzero(groups == g)
+        if len(np.unique(y[test])) < 2:
+            yield g, None, None
+            continue
+        yield g, np.flatnonzero(groups != g), test
+
+def core_budget(n_folds, cores=None, parallel_folds=None):
+    """Split `cores` into (parallel folds, threads per fold)."""
+    cores = cores or os.cpu_count() or 1
+    parallel = max(1, min(parallel_folds or cores, n_folds, cores))
+    return parallel, max(1, cores // parallel)
+
+def fit_fold(X, y, train_rows, test_rows, params=PARAMS, n_rounds=N_ROUNDS, ref=None, nthread=1):
+    """Train on train_rows, score test_rows; return metrics, test probabilities and timing."""
+    start = time.perf_counter()
+    dtrain = fold_matrix(X, y, train_rows, ref=ref, nthread=nthread)
+    booster = xgb.train({**params, "nthread": nthread}, dtrain, num_boost_round=n_rounds)
+    y_prob = booster.inplace_predict(take_rows(X, test_rows))
+    y_test = y[test_rows]
+    return {
+        "n_test_samples": len(test_rows),
+        "roc_auc": roc_auc_score(y_test, y_prob),
+        "pr_auc": average_precision_score(y_test, y_prob),
+        "y_prob": y_prob,
+        "seconds": time.perf_counter() - start,
+    }
+
+def run_folds(X, y, folds, cores=None, parallel_folds=None, shared=False,
+              params=PARAMS, n_rounds=N_ROUNDS, on_result=None):
+    """
+    Run (name, train_rows, test_rows) folds concurrently.
+
+    Returns:
+        dict name -> fit_fold() result; on_result(name, result) is called as folds finish
+    """
+    parallel, nthread = core_budget(len(folds), cores, parallel_folds)
+    ref = shared_bins(X, y, nthread=parallel * nthread) if shared else None
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        futures = {
+            pool.submit(fit_fold, X, y, tr, te, params, n_rounds, ref, nthread): name
+            for name, tr, te in folds
+        }
+        for fut in as_completed(futures):
+            name = futures[fut]
+            results[name] = fut.result()
+            if on_result:
+                on_result(name, results[name])
+    return results
+
+# -------------------------
+# Grouped folds with early stopping (tuning)
+# -------------------------
+def grouped_folds(groups, y, n_folds=5, seed=42):
+    """
+    Split the groups into n_folds folds (shuffled, balanced by row count).
+    Returns [(fold name, train_rows, test_rows)]; folds whose test rows hold a
+    single class are dropped.
+    """
+    rng = np.random.default_rng(seed)
+    names, sizes = np.unique(groups, return_counts=True)
+    order = rng.permutation(len(names))
+    load = np.zeros(n_folds)
+    assign = {}
+    for i in sorted(order, key=lambda i: -sizes[i]):  # largest groups first, into the lightest fold
+        f = int(np.argmin(load))
+        assign[names[i]] = f
+        load[f] += sizes[i]
+    fold_of = np.array([assign[g] for g in groups])
+    folds = []
+    for f in range(n_folds):
+        test = np.flatnonzero(fold_of == f)
+        if len(test) and len(np.unique(y[test])) == 2:
+            folds.append((f"fold{f}", np.flatnonzero(fold_of != f), test))
+    return folds
+
+def validation_split(groups, y, rows, fraction=0.15, seed=42):
+    """Hold whole groups out of rows until about `fraction` of them (with both classes) are set aside."""
+    rng = np.random.default_rng(seed)
+    names = rng.permutation(np.unique(groups[rows]))
+    valid_groups = []
+    for g in names:
+        valid_groups.append(g)
+        valid = np.isin(groups[rows], valid_groups)
+        if valid.sum() >= fraction * len(rows) and len(np.unique(y[rows[valid]])) == 2:
+            break
+    if valid.all() or len(np.unique(y[rows[valid]])) < 2:
+        # too few groups to hold any out: fall back to a random row split
+        valid = rng.random(len(rows)) < fraction
+    return rows[~valid], rows[valid]
+
+def fit_early_stopping(X, y, train_rows, valid_rows, test_rows, params=PARAMS, max_rounds=2000,
+                       early_stopping=50, nthread=1):
+    """Train until the validation AUC has not improved for early_stopping rounds, then score test_rows."""
+    start = time.perf_counter()
+    dtrain = fold_matrix(X, y, train_rows, nthread=nthread)
+    dvalid = xgb.QuantileDMatrix(take_rows(X, valid_rows), label=y[valid_rows], ref=dtrain, nthread=nthread)
+    booster = xgb.train({**params, "eval_metric": "auc", "nthread": nthread}, dtrain,
+                        num_boost_round=max_rounds, evals=[(dvalid, "valid")],
+                        early_stopping_rounds=early_stopping, verbose_eval=False)
+    y_prob = booster.inplace_predict(take_rows(X, test_rows), iteration_range=(0, booster.best_iteration + 1))
+    y_test = y[test_rows]
+    return {
+        "roc_auc": roc_auc_score(y_test, y_prob),
+        "pr_auc": average_precision_score(y_test, y_prob),
+        "best_iteration": int(booster.best_iteration),
+        "seconds": time.perf_counter() - start,
+    }
+
+def load_tuned(path=TUNED_PARAMS_PATH):
+    """(params, n_rounds) saved by tune.py, or the defaults if there is no tuned config."""
+    if not os.path.exists(path):
+        return PARAMS, N_ROUNDS
+    with open(path) as f:
+        tuned = json.load(f)
+    return {**PARAMS, **tuned["params"]}, int(tuned["n_rounds"])
+
+def sklearn_params(params):
+    """Native xgb.train params as XGBClassifier keyword arguments."""
+    renamed = {"eta": "learning_rate", "seed": "random_state"}
+    return {renamed.get(k, k): v for k, v in params.items()}
+
+# -------------------------
+# Content-addressed fold cache
+# -------------------------
+def fold_key(data_hash, group, feature_cols, params, n_rounds, shared):
+    """Key over everything a fold's result depends on."""
+    payload = json.dumps({
+        "dataset": data_hash,
+        "group": str(group),
+        "features": list(feature_cols),
+        "params": params,
+        "n_rounds": n_rounds,
+        "shared_bins": bool(shared),
+    }, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:20]
+
+class FoldCache:
+    """
+    Fold metrics ({key}.json) and out-of-fold predictions ({key}.oof.csv) under
+    one directory. Each fold is written as soon as it finishes, so an
+    interrupted run resumes where it stopped.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.oof.csv")
+
+    def get(self, key):
+        meta_path, oof_path = self._paths(key)
+        if not (os.path.exists(meta_path) and os.path.exists(oof_path)):
+            return None
+        with open(meta_path) as f:
+            result = json.load(f)
+        result["oof"] = pd.read_csv(oof_path)
+        return result
+
+    def put(self, key, result, oof):
+        meta_path, oof_path = self._paths(key)
+        oof.to_csv(oof_path + ".tmp", index=False)
+        os.replace(oof_path + ".tmp", oof_path)
+        meta = {k: v for k, v in result.items() if k not in ("y_prob", "oof")}
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(meta_path + ".tmp", meta_path)
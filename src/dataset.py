@@ -0,0 +1,138 @@
+"""
+Binary layout for final_ppi_dataset.
+
+Next to final_ppi_dataset.csv the pipeline writes
+    final_ppi_dataset.features.npy  float32 feature matrix (opened with mmap_mode)
+    final_ppi_dataset.meta.npz      viral_uniprot, human_uniprot, label, feature column names
+or, for a sparse build (pipeline.py --sparse),
+    final_ppi_dataset.features.npz  float32 CSR matrix (scipy.sparse.save_npz) instead of the .npy
+Consumers call load_dataset() / load_ids(), which read the binary form when it
+is present and at least as new as the CSV, and fall back to parsing the CSV.
+
+Zeros are not stored in the CSR form, and XGBoost treats entries that are not
+stored as missing values. A model trained on it therefore has to be scored with
+zeros as missing (engine.mark_sparse()), and dataset_hash() keeps the two forms
+apart.
+"""
+
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET = os.path.join(BASE_DIR, "data", "processed", "final_ppi_dataset.csv")
+
+ID_COLS = ["viral_uniprot", "human_uniprot", "label"]
+
+def binary_paths(csv_path, sparse=False):
+    stem = os.path.splitext(csv_path)[0]
+    return stem + (".features.npz" if sparse else ".features.npy"), stem + ".meta.npz"
+
+def _binary_features(csv_path):
+    """Path of the stored feature matrix (dense or CSR) if the binary form is usable, else None."""
+    meta_path = binary_paths(csv_path)[1]
+    stored = [p for p in (binary_paths(csv_path, s)[0] for s in (False, True)) if os.path.exists(p)]
+    if not stored or not os.path.exists(meta_path):
+        return None
+    feat_path = max(stored, key=os.path.getmtime)
+    if os.path.exists(csv_path) and min(os.path.getmtime(feat_path), os.path.getmtime(meta_path)) < os.path.getmtime(csv_path):
+        return None
+    return feat_path
+
+def as_float32(X):
+    """float32 CSR for sparse input, a contiguous float32 array otherwise."""
+    if sp.issparse(X):
+        return sp.csr_matrix(X, dtype=np.float32)
+    return np.ascontiguousarray(X, dtype=np.float32)
+
+def save_dataset(ids, X, feature_cols, csv_path=DATASET, write_csv=True, chunk_rows=4096):
+    """Write the dataset as CSV (optional) plus the binary layout (CSR if X is sparse)."""
+    X = as_float32(X)
+    sparse = sp.issparse(X)
+    ids = ids[ID_COLS].reset_index(drop=True)
+    if write_csv and sparse:
+        # densified a block of rows at a time
+        for start in range(0, max(1, len(ids)), chunk_rows):
+            block = pd.DataFrame(X[start:start + chunk_rows].toarray(), columns=feature_cols)
+            pd.concat([ids.iloc[start:start + chunk_rows].reset_index(drop=True), block], axis=1).to_csv(
+                csv_path, index=False, mode="w" if start == 0 else "a", header=start == 0)
+    elif write_csv:
+        pd.concat([ids, pd.DataFrame(X, columns=feature_cols)], axis=1).to_csv(csv_path, index=False)
+
+    feat_path, meta_path = binary_paths(csv_path, sparse)
+    # write to temp names then rename, so readers never see a half-written pair
+    tmp_feat = feat_path + (".tmp.npz" if sparse else ".tmp.npy")
+    if sparse:
+        X.eliminate_zeros()
+        sp.save_npz(tmp_feat, X, compressed=False)
+    else:
+        np.save(tmp_feat, X)
+    np.savez(
+        meta_path + ".tmp.npz",
+        viral_uniprot=ids["viral_uniprot"].to_numpy(dtype=str),
+        human_uniprot=ids["human_uniprot"].to_numpy(dtype=str),
+        label=ids["label"].to_numpy(dtype=np.int8),
+        feature_cols=np.array(feature_cols, dtype=str)
+    )
+    os.replace(tmp_feat, feat_path)
+    os.replace(meta_path + ".tmp.npz", meta_path)
+    # drop the matrix of the other form so a stale one is never picked up
+    other = binary_paths(csv_path, not sparse)[0]
+    if os.path.exists(other):
+        os.remove(other)
+
+def _load_meta(meta_path):
+    with np.load(meta_path) as meta:
+        ids = pd.DataFrame({c: meta[c] for c in ID_COLS})
+        feature_cols = meta["feature_cols"].tolist()
+    ids["viral_uniprot"] = ids["viral_uniprot"].astype(object)
+    ids["human_uniprot"] = ids["human_uniprot"].astype(object)
+    return ids, feature_cols
+
+def load_ids(csv_path=DATASET):
+    """ID/label table only (viral_uniprot, human_uniprot, label)."""
+    if _binary_features(csv_path):
+        return _load_meta(binary_paths(csv_path)[1])[0]
+    return pd.read_csv(csv_path, usecols=ID_COLS)
+
+def load_dataset(csv_path=DATASET, mmap=True):
+    """
+    Load the PPI dataset.
+
+    Returns:
+        (ids DataFrame with ID_COLS, float32 feature matrix, feature column list)
+        The matrix is a read-only memory map when the dense binary form is
+        used, and a float32 CSR matrix when the dataset was saved sparse.
+    """
+    feat_path = _binary_features(csv_path)
+    if feat_path:
+        ids, feature_cols = _load_meta(binary_paths(csv_path)[1])
+        if feat_path.endswith(".npz"):
+            X = sp.load_npz(feat_path).tocsr()
+        else:
+            X = np.load(feat_path, mmap_mode="r" if mmap else None)
+        return ids, X, feature_cols
+
+    print(f"Binary dataset not found, parsing {os.path.basename(csv_path)}...")
+    df = pd.read_csv(csv_path)
+    feature_cols = [c for c in df.columns if c not in ID_COLS]
+    return df[ID_COLS], df[feature_cols].to_numpy(dtype=np.float32), feature_cols
+
+def take_rows(X, rows):
+    """Rows of a dense / memory-mapped or CSR matrix, as float32 in the same form."""
+    return as_float32(X[rows])
+
+def dataset_hash(ids, X, chunk_rows=4096):
+    """Content hash of the ID/label table and feature matrix (and whether it is sparse)."""
+    h = hashlib.sha1()
+    for c in ID_COLS:
+        h.update("\x1f".join(map(str, ids[c].tolist())).encode())
+    h.update(str(X.shape).encode())
+    if sp.issparse(X):
+        h.update(b"csr")  # absent entries are missing values to XGBoost, not zeros
+    for start in range(0, X.shape[0], chunk_rows):
+        block = X[start:start + chunk_rows]
+        h.update(np.ascontiguousarray(block.toarray() if sp.issparse(block) else block, dtype=np.float32).tobytes())
+    return h.hexdigest()
@@ -0,0 +1,140 @@
+"""
+Lean inference engine for the trained PPI model.
+
+Holds the XGBoost Booster and scores float32 NumPy matrices with
+Booster.inplace_predict, so no DataFrame is built and no feature names are
+checked per call. The column layout is validated once, when the engine is
+created, against feature_columns.pkl (and the names stored in the model).
+
+A model trained on the sparse (CSR) dataset saw zeros as missing values; it is
+tagged with mark_sparse(), and the engine then scores dense input with
+missing=0 so dense and CSR rows give the same probabilities. CSR input to a
+model trained on dense data is densified first.
+
+A model trained with k-mer spectra (pipeline.py --kmers) carries its
+KmerSpectrum configuration (mark_kmers()). Its per-protein blocks are then the
+425 features followed by the spectrum, as CSR: extend() appends the spectra
+to (n, 425) blocks (only the spectrum columns the model reads are counted),
+and pair_matrix() gathers from either form.
+
+    engine = InferenceEngine.load()
+    probs = engine.predict(engine.pair_matrix(viral_blocks, human_blocks))
+"""
+
+import os
+import json
+import hashlib
+import joblib
+import numpy as np
+import scipy.sparse as sp
+import xgboost as xgb
+
+from features import PROTEIN_NAMES, column_index, protein_features, required_names
+from kmers import from_booster
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "ppi_xgboost_model.json")
+FEATURE_COLS_PATH = os.path.join(BASE_DIR, "models", "feature_columns.pkl")
+
+def mark_sparse(booster, feature_cols):
+    """Tag a booster trained on CSR data (zeros are missing values) and store its column names."""
+    booster.feature_names = list(feature_cols)
+    booster.set_attr(missing="0")
+    return booster
+
+def mark_kmers(booster, config):
+    """Record the KmerSpectrum configuration a booster was trained with."""
+    booster.set_attr(kmers=json.dumps(config, sort_keys=True))
+    return booster
+
+class InferenceEngine:
+    def __init__(self, booster, feature_cols, version=None):
+        feature_cols = list(feature_cols)
+        if booster.num_features() != len(feature_cols):
+            raise ValueError(
+                f"Model expects {booster.num_features()} features, feature_columns.pkl has {len(feature_cols)}")
+        if booster.feature_names is not None and list(booster.feature_names) != feature_cols:
+            raise ValueError("Feature columns do not match the names stored in the model")
+
+        self.booster = booster
+        self.feature_cols = feature_cols
+        self.version = version
+        self.missing = np.nan if booster.attr("missing") is None else float(booster.attr("missing"))
+        self.kmers = from_booster(booster)
+        # per-protein layout: the 425 features, then the k-mer spectrum if the model uses one
+        self.layout = PROTEIN_NAMES + (self.kmers.names if self.kmers else [])
+        # (v block ++ h block) positions of every model column, resolved once
+        self.index = column_index(feature_cols, self.layout)
+        # per-protein features the model reads; anything else is never computed
+        self.viral_names, self.human_names = required_names(feature_cols, self.layout)
+        # spectrum columns the model reads (None: all of them), so a compact model counts only those
+        self.kmer_columns = None
+        if self.kmers:
+            used = set(self.viral_names) | set(self.human_names)
+            cols = [i for i, name in enumerate(self.kmers.names) if name in used]
+            if len(cols) < self.kmers.dim:
+                self.kmer_columns = np.array(cols, dtype=np.int64)
+
+    @classmethod
+    def load(cls, model_path=MODEL_PATH, feature_cols_path=FEATURE_COLS_PATH):
+        booster = xgb.Booster()
+        booster.load_model(model_path)
+        with open(model_path, "rb") as f:
+            version = hashlib.sha1(f.read()).hexdigest()[:12]
+        return cls(booster, joblib.load(feature_cols_path), version)
+
+    @classmethod
+    def wrap(cls, model, feature_cols):
+        """Engine for an in-memory XGBClassifier / Booster (returned as-is if already an engine)."""
+        if isinstance(model, cls):
+            return model
+        booster = model.get_booster() if hasattr(model, "get_booster") else model
+        return cls(booster, feature_cols)
+
+    def extend(self, blocks, seqs):
+        """
+        (n, 425) blocks of seqs, with their k-mer spectra appended (CSR) if the
+        model uses them; spectrum columns the model does not read stay empty.
+        """
+        if self.kmers is None:
+            return blocks
+        spectra = self.kmers.transform(seqs, self.kmer_columns)
+        return sp.hstack([sp.csr_matrix(blocks, dtype=np.float32), spectra], format="csr")
+
+    def protein_blocks(self, seqs, names=None):
+        """Per-protein blocks in the engine's layout (only the 425-dim features in names are computed)."""
+        return self.extend(protein_features(seqs, names), seqs)
+
+    def pair_matrix(self, viral_blocks, human_blocks):
+        """
+        Gather model columns from viral and human blocks into a contiguous
+        float32 matrix (CSR for k-mer blocks). A single-row block is broadcast.
+        """
+        dim = len(self.layout)
+        if sp.issparse(viral_blocks) or sp.issparse(human_blocks):
+            V, H = sp.csr_matrix(viral_blocks, dtype=np.float32), sp.csr_matrix(human_blocks, dtype=np.float32)
+            n = max(V.shape[0], H.shape[0])
+            V = V[np.zeros(n, dtype=np.int64)] if V.shape[0] == 1 else V
+            H = H[np.zeros(n, dtype=np.int64)] if H.shape[0] == 1 else H
+            return sp.hstack([V, H], format="csr")[:, self.index]
+        viral_blocks, human_blocks = np.asarray(viral_blocks), np.asarray(human_blocks)
+        v_idx = self.index < dim
+        X = np.empty((max(len(viral_blocks), len(human_blocks)), len(self.index)), dtype=np.float32)
+        X[:, v_idx] = viral_blocks[:, self.index[v_idx]]
+        X[:, ~v_idx] = human_blocks[:, self.index[~v_idx] - dim]
+        return X
+
+    def predict(self, X):
+        """Interaction probabilities for a (n, n_features) dense or CSR matrix in feature_cols order."""
+        if sp.issparse(X):
+            if self.missing != 0:
+                X = X.toarray()  # a dense-trained model reads zeros as values
+            else:
+                return self.booster.inplace_predict(sp.csr_matrix(X, dtype=np.float32), validate_features=False)
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return self.booster.inplace_predict(X, missing=self.missing, validate_features=False)
+
+    def predict_pair(self, viral_seq, human_seq):
+        v = self.protein_blocks([viral_seq], self.viral_names)
+        h = self.protein_blocks([human_seq], self.human_names)
+        return float(self.predict(self.pair_matrix(v, h))[0])
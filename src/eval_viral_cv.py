@@ -1,89 +1,106 @@
 import pandas as pd
 import numpy as np
 import os
+import argparse
 
-from xgboost import XGBClassifier
-from sklearn.metrics import roc_auc_score, average_precision_score
+from cv import N_ROUNDS, PARAMS, FoldCache, core_budget, fold_key, leave_one_group_out, load_tuned, run_folds
+from dataset import dataset_hash, load_dataset
+
+parser = argparse.ArgumentParser(description="Leave-one-viral-out cross-validation")
+parser.add_argument("--cores", type=int, default=None, help="Total core budget (default: all cores)")
+parser.add_argument("--parallel-folds", type=int, default=None, help="Folds trained concurrently (default: as many as cores allow)")
+parser.add_argument("--shared-bins", action="store_true", help="Quantize once for all folds (faster; metrics shift slightly)")
+parser.add_argument("--force", action="store_true", help="Recompute every fold even if cached")
+parser.add_argument("--tuned", action="store_true", help="Use the configuration found by tune.py (models/tuned_params.json)")
+args = parser.parse_args()
 
 print("\n=== VIRAL-WISE XGBOOST CROSS-VALIDATION ===\n")
 
+params, n_rounds = load_tuned() if args.tuned else (PARAMS, N_ROUNDS)
+
 # -------------------------
 # Paths
 # -------------------------
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATASET = os.path.join(BASE_DIR, "data", "processed", "final_ppi_dataset.csv")
 RESULTS_DIR = os.path.join(BASE_DIR, "results")
+CV_CACHE_DIR = os.path.join(BASE_DIR, "results", "cv_cache")
 
 # -------------------------
 # Load dataset
 # -------------------------
-df = pd.read_csv(DATASET)
+ids, X, feature_cols = load_dataset(DATASET)
+y = ids["label"].to_numpy()
+viral = ids["viral_uniprot"].to_numpy()
 
-print("Total samples:", df.shape[0])
-print("Total viral proteins:", df["viral_uniprot"].nunique())
+print("Total samples:", X.shape[0])
+print("Total viral proteins:", ids["viral_uniprot"].nunique())
 
 # -------------------------
-# Columns
+# Leave-One-Viral-Out folds
 # -------------------------
-id_cols = ["viral_uniprot", "human_uniprot", "label"]
-feature_cols = [c for c in df.columns if c not in id_cols]
-
-results = []
+folds = []
+for virus, train_rows, test_rows in leave_one_group_out(viral, y):
+    if test_rows is None:
+        print(f"⚠ Skipping {virus} (only one class present)")
+        continue
+    folds.append((virus, train_rows, test_rows))
 
 # -------------------------
-# Leave-One-Viral-Out loop
+# Fold cache: only folds whose inputs changed are recomputed
 # -------------------------
-for virus in sorted(df["viral_uniprot"].unique()):
-    print(f"\n--- Testing on viral protein: {virus} ---")
-
-    train_df = df[df["viral_uniprot"] != virus]
-    test_df  = df[df["viral_uniprot"] == virus]
-
-    # Safety check
-    if test_df["label"].nunique() < 2:
-        print("⚠ Skipping (only one class present)")
-        continue
-
-    X_train = train_df[feature_cols]
-    y_train = train_df["label"]
-
-    X_test  = test_df[feature_cols]
-    y_test  = test_df["label"]
-
-    # -------------------------
-    # Model
-    # -------------------------
-    model = XGBClassifier(
-        n_estimators=500,
-        max_depth=8,
-        learning_rate=0.05,
-        subsample=0.8,
-        colsample_bytree=0.8,
-        objective="binary:logistic",
-        eval_metric="auc",
-        tree_method="hist",
-        random_state=42,
-        n_jobs=-1
-    )
-
-    model.fit(X_train, y_train)
-
-    # -------------------------
-    # Evaluation
-    # -------------------------
-    y_prob = model.predict_proba(X_test)[:, 1]
-
-    roc_auc = roc_auc_score(y_test, y_prob)
-    pr_auc  = average_precision_score(y_test, y_prob)
-
-    print(f"ROC-AUC: {roc_auc:.4f} | PR-AUC: {pr_auc:.4f}")
-
-    results.append({
+cache = FoldCache(CV_CACHE_DIR)
+data_hash = dataset_hash(ids, X)
+keys = {virus: fold_key(data_hash, virus, feature_cols, params, n_rounds, args.shared_bins) for virus, _, _ in folds}
+
+fold_results = {}
+if not args.force:
+    for virus, _, _ in folds:
+        cached = cache.get(keys[virus])
+        if cached is not None:
+            fold_results[virus] = cached
+todo = [f for f in folds if f[0] not in fold_results]
+print(f"\nCached folds: {len(fold_results)} | To compute: {len(todo)}")
+
+def report(virus, r):
+    print(f"--- {virus}: ROC-AUC: {r['roc_auc']:.4f} | PR-AUC: {r['pr_auc']:.4f} ({r['seconds']:.1f}s)")
+    test_rows = fold_rows[virus]
+    r["oof"] = pd.DataFrame({
         "viral_uniprot": virus,
-        "n_test_samples": len(test_df),
-        "roc_auc": roc_auc,
-        "pr_auc": pr_auc
+        "human_uniprot": ids["human_uniprot"].to_numpy()[test_rows],
+        "label": y[test_rows],
+        "y_prob": r["y_prob"]
     })
+    cache.put(keys[virus], r, r["oof"])
+
+if todo:
+    fold_rows = {virus: test_rows for virus, _, test_rows in todo}
+    parallel, nthread = core_budget(len(todo), args.cores, args.parallel_folds)
+    print(f"Running {len(todo)} folds: {parallel} in parallel × {nthread} threads"
+          + (" (shared bins)" if args.shared_bins else ""))
+
+    fold_results.update(run_folds(
+        X, y, todo,
+        cores=args.cores,
+        parallel_folds=args.parallel_folds,
+        shared=args.shared_bins,
+        params=params,
+        n_rounds=n_rounds,
+        on_result=report
+    ))
+
+results = [
+    {
+        "viral_uniprot": virus,
+        "n_test_samples": fold_results[virus]["n_test_samples"],
+        "roc_auc": fold_results[virus]["roc_auc"],
+        "pr_auc": fold_results[virus]["pr_auc"]
+    }
+    for virus, _, _ in folds
+]
+
+oof_df = pd.concat([fold_results[virus]["oof"] for virus, _, _ in folds], ignore_index=True)
+oof_df.to_csv(os.path.join(RESULTS_DIR, "viral_wise_oof_predictions.csv"), index=False)
 
 # -------------------------
 # Final summary
@@ -98,4 +115,5 @@ print("\nMean ROC-AUC:", results_df["roc_auc"].mean())
 print("Mean PR-AUC :", results_df["pr_auc"].mean())
 
 print("\nSaved → results/viral_wise_results.csv")
+print("Saved → results/viral_wise_oof_predictions.csv")
 print("=== DONE ===")
@@ -0,0 +1,62 @@
+"""
+Per-protein feature store keyed by sequence content.
+
+Every protein's 425-dim block is stored under the SHA-1 of its cleaned
+sequence, so a rebuild only computes blocks for sequences it has not seen
+before, whatever accession they come under. The store is two .npy files under
+data/cache/ (keys + float32 blocks); their names carry a hash of the feature
+layout and of features.FEATURES_VERSION, so a change to PROTEIN_NAMES or to the
+code that computes them starts a fresh store.
+"""
+
+import os
+import hashlib
+import numpy as np
+
+from features import FEATURES_VERSION, PROTEIN_DIM, PROTEIN_NAMES, clean_seq, protein_features
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_DIR = os.path.join(BASE_DIR, "data", "cache")
+LAYOUT_KEY = hashlib.sha1("\x1f".join([FEATURES_VERSION] + PROTEIN_NAMES).encode()).hexdigest()[:12]
+
+def seq_hash(seq):
+    return hashlib.sha1(clean_seq(seq).encode()).hexdigest()
+
+class FeatureStore:
+    def __init__(self, store_dir=STORE_DIR):
+        stem = os.path.join(store_dir, f"protein_features_{LAYOUT_KEY}")
+        self.keys_path, self.feat_path = stem + ".keys.npy", stem + ".npy"
+        if os.path.exists(self.keys_path) and os.path.exists(self.feat_path):
+            keys = np.load(self.keys_path).tolist()
+            self._X = np.load(self.feat_path)
+        else:
+            keys, self._X = [], np.empty((0, PROTEIN_DIM), dtype=np.float32)
+        self._pos = {k: i for i, k in enumerate(keys)}
+        self._dirty = False
+        self.computed = 0
+        self.reused = 0
+
+    def features(self, seqs):
+        """(n, 425) blocks for seqs; only sequences missing from the store are featurized."""
+        hashes = [seq_hash(s) for s in seqs]
+        by_hash = dict(zip(hashes, seqs))
+        missing = [h for h in by_hash if h not in self._pos]
+        if missing:
+            new = protein_features([by_hash[h] for h in missing])
+            for h in missing:
+                self._pos[h] = len(self._pos)
+            self._X = np.vstack([self._X, new])
+            self._dirty = True
+        self.computed += len(missing)
+        self.reused += len(by_hash) - len(missing)
+        return self._X[[self._pos[h] for h in hashes]]
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.keys_path), exist_ok=True)
+        np.save(self.keys_path + ".tmp.npy", np.array(list(self._pos), dtype=str))
+        np.save(self.feat_path + ".tmp.npy", self._X)
+        os.replace(self.keys_path + ".tmp.npy", self.keys_path)
+        os.replace(self.feat_path + ".tmp.npy", self.feat_path)
+        self._dirty = False
@@ -0,0 +1,230 @@
+"""
+Sequence feature extraction shared by pipeline.py, predict.py and the Flask app.
+
+Sequences are encoded once as uint8 residue indices (0..19 over AA), and the
+composition (AAC) and dipeptide (DPC) counts are taken with np.bincount over
+the residue codes and the 20*a+b dipeptide codes. The physicochemical
+properties are weighted sums over those same counts, using Biopython's
+residue and dipeptide tables (the numbers ProteinAnalysis would use), so no
+per-sequence Python loop is left. Every batch function takes a list of
+sequences and returns a float32 matrix with one row per sequence, laid out as
+in models/feature_columns.pkl.
+
+pair_features() lays every protein out as the full 425-dim block and then
+selects the columns a model was trained on, so both the 850-column pipeline
+layout and the older 848-column layout resolve from the same code. Feature
+families (AAC, DPC, physchem) that none of the selected columns use
+are not computed; their block entries stay zero.
+"""
+
+import re
+import hashlib
+import numpy as np
+from Bio.Data.IUPACData import protein_weights
+from Bio.SeqUtils.ProtParamData import DIWV, kd
+
+# -------------------------
+# Amino acids / column layout
+# -------------------------
+AA = "ACDEFGHIKLMNPQRSTVWY"
+N_AA = len(AA)
+N_DPC = N_AA * N_AA
+
+AAC_NAMES = [f"aac_{a}" for a in AA]
+DPC_NAMES = [f"dpc_{a}{b}" for a in AA for b in AA]
+PHYSCHEM_NAMES = ["len", "mw", "gravy", "arom", "instab"]
+PROTEIN_NAMES = AAC_NAMES + DPC_NAMES + PHYSCHEM_NAMES
+PROTEIN_DIM = len(PROTEIN_NAMES)  # 425
+
+FEATURE_COLUMNS = [f"v_{c}" for c in PROTEIN_NAMES] + [f"h_{c}" for c in PROTEIN_NAMES]
+
+# Older models (the shipped feature_columns.pkl) name GRAVY "hydro" and drop "instab"
+ALIASES = {"hydro": "gravy"}
+
+# k-mer spectrum columns (kmers.KmerSpectrum.names): k{k}_{kmer}, or kh_{i} when hashed
+_KMER_NAME = re.compile(r"k\d+_[A-Z]+$|kh_\d+$")
+
+# Physicochemical tables, indexed like AA (residues) and like DPC_NAMES (dipeptides)
+_RESIDUE_MW = np.array([protein_weights[a] for a in AA])      # average masses, as ProteinAnalysis
+_WATER = 18.0153
+_KYTE_DOOLITTLE = np.array([kd[a] for a in AA])
+_AROMATIC = np.array([a in "FWY" for a in AA], dtype=np.float64)
+_INSTABILITY = np.array([DIWV[a][b] for a in AA for b in AA])  # Guruprasad DIWV
+
+# Byte -> residue index; everything outside the 20 standard residues maps to 255
+_LUT = np.full(256, 255, dtype=np.uint8)
+for _i, _a in enumerate(AA):
+    _LUT[ord(_a)] = _i
+    _LUT[ord(_a.lower())] = _i
+
+def _code_version():
+    """Hash of this module's source and the Biopython tables it reads."""
+    h = hashlib.sha1()
+    with open(__file__, "rb") as f:
+        h.update(f.read())
+    for table in (_RESIDUE_MW, _KYTE_DOOLITTLE, _AROMATIC, _INSTABILITY):
+        h.update(table.tobytes())
+    return h.hexdigest()[:12]
+
+# Changes whenever the feature code (or a table) changes: part of every on-disk
+# cache of per-protein blocks, so blocks computed by older code are never reused
+FEATURES_VERSION = _code_version()
+
+# -------------------------
+# Encoding
+# -------------------------
+def clean_seq(s):
+    """Remove non-standard amino acid characters."""
+    return re.sub(r"[^ACDEFGHIKLMNPQRSTVWY]", "", str(s).upper())
+
+def encode(seq):
+    """Encode a sequence as uint8 residue indices, dropping non-standard characters."""
+    codes = _LUT[np.frombuffer(str(seq).encode("ascii", "ignore"), dtype=np.uint8)]
+    return codes[codes < N_AA]
+
+def _concat(encoded):
+    """Concatenate encoded sequences; return codes, row index per residue and lengths."""
+    lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+    codes = np.concatenate(encoded) if len(encoded) else np.empty(0, dtype=np.uint8)
+    rows = np.repeat(np.arange(len(encoded)), lengths)
+    return codes.astype(np.int64), rows, lengths
+
+# -------------------------
+# Batch features
+# -------------------------
+def aac_counts(encoded):
+    """Residue counts, shape (n, 20)."""
+    codes, rows, _ = _concat(encoded)
+    n = len(encoded)
+    return np.bincount(rows * N_AA + codes, minlength=n * N_AA).reshape(n, N_AA)
+
+def dpc_counts(encoded):
+    """Dipeptide counts over 20*a+b codes, shape (n, 400)."""
+    codes, rows, _ = _concat(encoded)
+    n = len(encoded)
+    # keep only adjacent positions that belong to the same sequence
+    same = rows[:-1] == rows[1:]
+    pair_codes = codes[:-1][same] * N_AA + codes[1:][same]
+    return np.bincount(rows[:-1][same] * N_DPC + pair_codes, minlength=n * N_DPC).reshape(n, N_DPC)
+
+def _lengths(encoded):
+    return np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+
+def _aac_from_counts(counts, lengths):
+    return (counts / np.maximum(1, lengths)[:, None]).astype(np.float32)
+
+def _dpc_from_counts(counts, lengths):
+    return (counts / np.maximum(1, lengths - 1)[:, None]).astype(np.float32)
+
+def _physchem_from_counts(aac_c, dpc_c, lengths):
+    """
+    Length, molecular weight, GRAVY, aromaticity and instability index from
+    residue / dipeptide counts, matching Biopython's ProteinAnalysis.
+    Sequences shorter than 5 residues get zeros (length is still filled in).
+    """
+    out = np.zeros((len(lengths), len(PHYSCHEM_NAMES)))
+    out[:, 0] = lengths
+    ok = lengths >= 5
+    L = lengths[ok].astype(np.float64)
+    aac_c, dpc_c = aac_c[ok], dpc_c[ok]
+    out[ok, 1] = aac_c @ _RESIDUE_MW - (L - 1) * _WATER
+    out[ok, 2] = aac_c @ _KYTE_DOOLITTLE / L
+    out[ok, 3] = aac_c @ _AROMATIC / L
+    out[ok, 4] = 10.0 / L * (dpc_c @ _INSTABILITY)
+    return out.astype(np.float32)
+
+def aac_matrix(encoded):
+    return _aac_from_counts(aac_counts(encoded), _lengths(encoded))
+
+def dpc_matrix(encoded):
+    return _dpc_from_counts(dpc_counts(encoded), _lengths(encoded))
+
+def physchem_matrix(encoded):
+    """Length, molecular weight, GRAVY, aromaticity, instability index."""
+    return _physchem_from_counts(aac_counts(encoded), dpc_counts(encoded), _lengths(encoded))
+
+def protein_features(seqs, names=None):
+    """
+    425-dim feature block (AAC + DPC + physchem) per sequence, shape (n, 425).
+
+    If names (a subset of PROTEIN_NAMES) is given, only the feature families
+    those names need are computed and the other entries are left at zero.
+    """
+    encoded = [encode(s) for s in seqs]
+    lengths = _lengths(encoded)
+    names = set(PROTEIN_NAMES if names is None else names)
+    need_physchem = bool(names & set(PHYSCHEM_NAMES[1:]))
+    need_aac = need_physchem or bool(names & set(AAC_NAMES))
+    need_dpc = need_physchem or bool(names & set(DPC_NAMES))
+
+    # residue / dipeptide counts are taken once and shared by AAC, DPC and physchem
+    aac_c = aac_counts(encoded) if need_aac else None
+    dpc_c = dpc_counts(encoded) if need_dpc else None
+
+    X = np.zeros((len(seqs), PROTEIN_DIM), dtype=np.float32)
+    if names & set(AAC_NAMES):
+        X[:, :N_AA] = _aac_from_counts(aac_c, lengths)
+    if names & set(DPC_NAMES):
+        X[:, N_AA:N_AA + N_DPC] = _dpc_from_counts(dpc_c, lengths)
+    if need_physchem:
+        X[:, N_AA + N_DPC:] = _physchem_from_counts(aac_c, dpc_c, lengths)
+    elif "len" in names:
+        X[:, PROTEIN_NAMES.index("len")] = lengths
+    return X
+
+def column_index(feature_cols, layout=PROTEIN_NAMES):
+    """
+    Positions of feature_cols within the [viral, human] pair block, where each
+    side is laid out as `layout` (the 425 PROTEIN_NAMES, or those followed by
+    k-mer columns): 850 positions by default.
+    """
+    pos = {name: i for i, name in enumerate(layout)}
+    idx = []
+    for c in feature_cols:
+        side, name = c[:2], c[2:]
+        name = ALIASES.get(name, name)
+        if side in ("v_", "h_") and name not in pos and _KMER_NAME.match(name):
+            raise ValueError(f"Feature column {c} is a k-mer spectrum column; models trained with "
+                             "--kmers are scored through engine.InferenceEngine, which knows their KmerSpectrum")
+        if side not in ("v_", "h_") or name not in pos:
+            raise ValueError(f"Unknown feature column: {c}")
+        idx.append(pos[name] + (len(layout) if side == "h_" else 0))
+    return np.array(idx, dtype=np.int64)
+
+def required_names(feature_cols, layout=PROTEIN_NAMES):
+    """(viral, human) names in layout needed to build feature_cols."""
+    idx = column_index(feature_cols, layout)
+    dim = len(layout)
+    return [layout[i] for i in idx[idx < dim]], [layout[i - dim] for i in idx[idx >= dim]]
+
+def pair_features(viral_seqs, human_seqs, feature_cols=None):
+    """
+    Pair features, viral block followed by human block, in the order of
+    feature_cols (850-column layout only; k-mer models go through
+    engine.InferenceEngine).
+    """
+    if feature_cols is None:
+        return np.hstack([protein_features(viral_seqs), protein_features(human_seqs)])
+    v_names, h_names = required_names(feature_cols)
+    X = np.hstack([protein_features(viral_seqs, v_names), protein_features(human_seqs, h_names)])
+    return X[:, column_index(feature_cols)]
+
+# -------------------------
+# Single-sequence helpers
+# -------------------------
+def aac(seq):
+    return aac_matrix([encode(seq)])[0].tolist()
+
+def dpc(seq):
+    return dpc_matrix([encode(seq)])[0].tolist()
+
+def physchem(seq):
+    return physchem_matrix([encode(seq)])[0].tolist()
+
+def extract_pair_features(viral_seq, human_seq, feature_cols=None):
+    """Extract feature vector for a viral-human protein pair."""
+    v = clean_seq(viral_seq)
+    h = clean_seq(human_seq)
+    if len(v) < 5 or len(h) < 5:
+        raise ValueError(f"Sequences too short after cleaning (viral: {len(v)}, human: {len(h)})")
+    return pair_features([v], [h], feature_cols)[0]
@@ -0,0 +1,74 @@
+"""
+Bounded-concurrency UniProt FASTA fetcher used by pipeline.py.
+
+All requests share one requests.Session whose connection pool is sized to the
+worker count. Transient failures (connection errors, timeouts, 429 and 5xx)
+are retried with exponential backoff; every accession gets a status row so
+nothing is silently dropped.
+"""
+
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+UNIPROT_URL = "https://rest.uniprot.org/uniprotkb"
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+def make_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _fetch_one(session, acc, base_url, timeout, retries, backoff):
+    """Fetch one accession; return (sequence or None, status row)."""
+    start = time.perf_counter()
+    status, error = "error", None
+    attempt = 0
+    for attempt in range(1, retries + 2):
+        try:
+            r = session.get(f"{base_url}/{acc}.fasta", timeout=timeout)
+            if r.status_code == 200 and r.text.startswith(">"):
+                seq = "".join(r.text.splitlines()[1:])
+                return seq, {"accession": acc, "status": "ok", "attempts": attempt,
+                             "error": None, "seconds": round(time.perf_counter() - start, 3)}
+            if r.status_code in (200, 404):
+                # not a transient failure, retrying will not help
+                status, error = "not_found", f"HTTP {r.status_code}"
+                break
+            error = f"HTTP {r.status_code}"
+            if r.status_code not in RETRY_STATUS:
+                break
+        except requests.RequestException as e:
+            error = f"{type(e).__name__}: {e}"
+        if attempt <= retries:
+            time.sleep(backoff * 2 ** (attempt - 1))
+    return None, {"accession": acc, "status": status, "attempts": attempt,
+                  "error": error, "seconds": round(time.perf_counter() - start, 3)}
+
+def fetch_fasta_many(accessions, max_workers=8, retries=3, backoff=0.5,
+                     timeout=20, base_url=UNIPROT_URL):
+    """
+    Fetch FASTA sequences for many accessions concurrently.
+
+    Returns:
+        (dict accession -> sequence for successful fetches,
+         list of per-accession status dicts in input order)
+    """
+    accessions = list(dict.fromkeys(accessions))
+    base_url = base_url.rstrip("/")
+    session = make_session(max_workers)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(
+                lambda acc: _fetch_one(session, acc, base_url, timeout, retries, backoff),
+                accessions
+            ))
+    finally:
+        session.close()
+
+    seqs = {acc: seq for acc, (seq, _) in zip(accessions, results) if seq is not None}
+    report = [row for _, row in results]
+    return seqs, report
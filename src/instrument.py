@@ -0,0 +1,128 @@
+"""
+Lightweight stage instrumentation for the pipeline and training scripts.
+
+    run = RunReport("pipeline")
+    with run.stage("load_biogrid"):
+        ...
+    run.save(path)
+
+Each stage records wall time, CPU time and peak RSS. Stages may overlap
+(pipeline.py runs independent stages on a thread pool), so:
+
+- cpu_s is the CPU time of the thread that ran the stage (time.thread_time);
+  work it hands to other threads (BLAS / XGBoost / fetch pools) is not in it.
+  A stage that ran alone also gets process_cpu_s, which includes that work.
+- On Linux the peak RSS is reset (via /proc/self/clear_refs) when a stage
+  starts with no other stage running. peak_rss_scope says what the peak
+  covers: "stage" (it ran alone, so the peak is its own), "group" (the
+  stages that overlapped it since the last reset), or "process" (the
+  process peak so far, where the reset is unavailable).
+Set PPI_INSTRUMENT=0 to disable: stage() then returns a shared no-op
+context manager and save() writes nothing.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import threading
+import contextlib
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_NOOP = contextlib.nullcontext()
+
+def _reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def _peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+class RunReport:
+    def __init__(self, name, enabled=None):
+        if enabled is None:
+            enabled = os.environ.get("PPI_INSTRUMENT", "1") != "0"
+        self.name = name
+        self.enabled = enabled
+        self.stages = []
+        self._lock = threading.Lock()
+        self._running = []       # overlap flags of the stages in progress
+        self._can_reset = None   # whether clear_refs works here (known after the first stage)
+        self._start = time.perf_counter()
+        self._started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    def stage(self, name, **info):
+        """Time a stage; info (e.g. status="checkpoint") is stored with its record."""
+        if not self.enabled:
+            return _NOOP
+        return self._stage(name, info)
+
+    @contextlib.contextmanager
+    def _stage(self, name, info):
+        with self._lock:
+            state = {"overlap": bool(self._running)}
+            for other in self._running:
+                other["overlap"] = True
+            self._running.append(state)
+            if not state["overlap"]:
+                # nothing else is running, so the process peak can be reset for this stage
+                self._can_reset = _reset_peak_rss()
+        wall, cpu, process_cpu = time.perf_counter(), time.thread_time(), time.process_time()
+        try:
+            yield
+        finally:
+            cpu, process_cpu = time.thread_time() - cpu, time.process_time() - process_cpu
+            with self._lock:
+                self._running.remove(state)
+                overlap = state["overlap"]
+                record = {
+                    "stage": name,
+                    "wall_s": round(time.perf_counter() - wall, 4),
+                    "cpu_s": round(cpu, 4),
+                    "process_cpu_s": None if overlap else round(process_cpu, 4),
+                    "peak_rss_mb": round(_peak_rss_mb() or 0.0, 1),
+                    "peak_rss_scope": "process" if not self._can_reset else ("group" if overlap else "stage"),
+                    **info,
+                }
+                self.stages.append(record)
+
+    def summary(self):
+        return {
+            "run": self.name,
+            "started_at": self._started_at,
+            "total_wall_s": round(time.perf_counter() - self._start, 4),
+            "python": platform.python_version(),
+            "argv": sys.argv,
+            "stages": self.stages,
+        }
+
+    def save(self, path):
+        if not self.enabled:
+            return
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        print(f"\nStage timings (→ {path}):")
+        for s in self.stages:
+            process_cpu = "-" if s["process_cpu_s"] is None else f"{s['process_cpu_s']:.2f}s"
+            print(f"  {s['stage']:<14} wall {s['wall_s']:>9.2f}s | cpu {s['cpu_s']:>9.2f}s (process {process_cpu:>9}) "
+                  f"| peak RSS {s['peak_rss_mb']:>8.1f} MB ({s['peak_rss_scope']})")
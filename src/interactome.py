@@ -0,0 +1,207 @@
+"""
+All-vs-all predicted interactome.
+
+Scores every viral protein (the BioGRID set the pipeline fetched, or the
+records of 38ViralSequences.fasta) against every human protein in
+human_sequences_clean.csv and keeps the pairs whose probability reaches
+--threshold.
+
+The human proteome is cut into shards of --shard-size proteins; a shard is
+scored against all viral proteins, one prediction call per viral protein. Shards
+run in a process pool: each worker loads the Booster once and memory-maps the
+cached human feature blocks (predict.load_human_features), and the viral
+blocks are computed once in the parent and handed to the workers, so no
+protein is featurized twice. Workers split the core budget (workers × threads
+per worker <= cores).
+
+Each finished shard is written to results/interactome/<run key>/ as its own
+CSV, so an interrupted run picks up at the first missing shard; the run key
+covers the model, the human and viral sequences, the threshold and the shard
+size. The shards are then streamed into results/predicted_edges.csv
+(viral_uniprot, human_uniprot, probability), which the web app's network
+view reads.
+"""
+
+import os
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cv import core_budget
+from engine import InferenceEngine
+from features import PROTEIN_NAMES, protein_features
+from predict import FAST_FEATURE_COLS_PATH, FAST_MODEL_PATH, FEATURE_COLS_PATH, HUMAN_SEQS_PATH, MODEL_PATH, load_human_features
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VIRAL_FASTA = os.path.join(BASE_DIR, "data", "raw", "38ViralSequences.fasta")
+BUILD_STATE = os.path.join(BASE_DIR, "data", "processed", "pipeline_state.json")
+SHARD_DIR = os.path.join(BASE_DIR, "results", "interactome")
+EDGES_PATH = os.path.join(BASE_DIR, "results", "predicted_edges.csv")
+
+THRESHOLD = 0.5
+SHARD_SIZE = 1000
+MIN_LEN = 5
+
+# -------------------------
+# Viral proteins
+# -------------------------
+def read_fasta(path):
+    """{accession: sequence} of a multi-record FASTA (accession = first word of the header)."""
+    seqs, acc = {}, None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith(">"):
+                acc = line[1:].split()[0].split("|")[0]
+                seqs[acc] = []
+            elif acc is not None:
+                seqs[acc].append(line)
+    return {a: "".join(s) for a, s in seqs.items()}
+
+def biogrid_viral(state_path=BUILD_STATE):
+    """Viral sequences of the last pipeline build (the BioGRID set, keyed by UniProt accession)."""
+    if not os.path.exists(state_path):
+        raise FileNotFoundError(f"{state_path} not found; run src/pipeline.py first (or use --viral fasta)")
+    with open(state_path) as f:
+        return json.load(f)["viral_sequences"]
+
+# -------------------------
+# Workers
+# -------------------------
+_worker = {}
+
+def _init_worker(model_path, feature_cols_path, human_csv, viral_ids, viral_blocks, threshold, nthread):
+    """Per process: one Booster, the memory-mapped human blocks and the viral blocks."""
+    engine = InferenceEngine.load(model_path, feature_cols_path)
+    engine.booster.set_param({"nthread": nthread})
+    human_ids, human_blocks = load_human_features(human_csv)
+    _worker.update(
+        engine=engine,
+        human_ids=human_ids,
+        human_blocks=human_blocks,
+        human_seqs=pd.read_csv(human_csv)["sequence"].to_numpy() if engine.kmers else None,
+        viral_ids=viral_ids,
+        viral_blocks=viral_blocks,
+        threshold=threshold,
+    )
+
+def score_shard(shard, start, stop, out_path):
+    """Score human proteins [start, stop) against every viral protein; write the kept edges to out_path."""
+    t0 = time.perf_counter()
+    w = _worker
+    engine = w["engine"]
+    len_col = PROTEIN_NAMES.index("len")
+
+    H = np.asarray(w["human_blocks"][start:stop])
+    ok = H[:, len_col] >= MIN_LEN
+    human_ids = w["human_ids"][start:stop][ok]
+    H = H[ok] if engine.kmers is None else engine.extend(H[ok], w["human_seqs"][start:stop][ok])
+
+    parts = []
+    for i, viral_id in enumerate(w["viral_ids"]):
+        probs = engine.predict(engine.pair_matrix(w["viral_blocks"][i:i + 1], H))
+        keep = np.flatnonzero(probs >= w["threshold"])
+        parts.append(pd.DataFrame({
+            "viral_uniprot": viral_id,
+            "human_uniprot": human_ids[keep],
+            "probability": np.round(probs[keep].astype(float), 4),
+        }))
+
+    edges = pd.concat(parts, ignore_index=True)
+    edges.to_csv(out_path + ".tmp", index=False)
+    os.replace(out_path + ".tmp", out_path)
+    return shard, len(human_ids) * len(w["viral_ids"]), len(edges), time.perf_counter() - t0
+
+# -------------------------
+# Run
+# -------------------------
+def run_key(model_path, human_csv, viral, threshold, shard_size):
+    h = hashlib.sha1()
+    for path in (model_path, human_csv):
+        with open(path, "rb") as f:
+            h.update(f.read())
+    h.update(json.dumps({"viral": viral, "threshold": threshold, "shard_size": shard_size}, sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+def merge_shards(shard_paths, out_path=EDGES_PATH):
+    """Stream the shard CSVs, in order, into one edge list."""
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    n = 0
+    with open(out_path + ".tmp", "w") as out:
+        for i, path in enumerate(shard_paths):
+            with open(path) as f:
+                header = f.readline()
+                if i == 0:
+                    out.write(header)
+                for line in f:
+                    out.write(line)
+                    n += 1
+    os.replace(out_path + ".tmp", out_path)
+    return n
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="All-vs-all viral × human predicted interactome")
+    parser.add_argument("--viral", choices=["biogrid", "fasta"], default="biogrid",
+                        help="Viral proteins: the BioGRID set of the last pipeline build, or 38ViralSequences.fasta")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Minimum probability of a kept edge")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="Human proteins per shard")
+    parser.add_argument("--cores", type=int, default=None, help="Total core budget (default: all cores)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: as many as cores allow)")
+    parser.add_argument("--fast", action="store_true", help="Use the compact top-K model from `train.py --top-k`")
+    parser.add_argument("--force", action="store_true", help="Rescore every shard even if already written")
+    parser.add_argument("--output", default=EDGES_PATH, help="Edge list CSV")
+    args = parser.parse_args()
+
+    print("\n=== PREDICTED INTERACTOME ===\n")
+
+    model_path, cols_path = (FAST_MODEL_PATH, FAST_FEATURE_COLS_PATH) if args.fast else (MODEL_PATH, FEATURE_COLS_PATH)
+    engine = InferenceEngine.load(model_path, cols_path)
+
+    viral = read_fasta(VIRAL_FASTA) if args.viral == "fasta" else biogrid_viral()
+    viral_blocks = protein_features(list(viral.values()))
+    ok = viral_blocks[:, PROTEIN_NAMES.index("len")] >= MIN_LEN
+    viral_ids = np.array(list(viral), dtype=str)[ok]
+    viral_blocks = engine.extend(viral_blocks[ok], [s for s, k in zip(viral.values(), ok) if k])
+
+    # computed and cached here, so workers only memory-map them
+    human_ids, _ = load_human_features(HUMAN_SEQS_PATH)
+    n_human = len(human_ids)
+
+    shards = [(i, start, min(start + args.shard_size, n_human))
+              for i, start in enumerate(range(0, n_human, args.shard_size))]
+    key = run_key(model_path, HUMAN_SEQS_PATH, viral, args.threshold, args.shard_size)
+    run_dir = os.path.join(SHARD_DIR, key)
+    os.makedirs(run_dir, exist_ok=True)
+    shard_paths = [os.path.join(run_dir, f"shard_{i:05d}.csv") for i, _, _ in shards]
+    todo = [s for s in shards if args.force or not os.path.exists(shard_paths[s[0]])]
+
+    print(f"Viral proteins: {len(viral_ids)} ({args.viral}) | human proteins: {n_human} "
+          f"| pairs: {len(viral_ids) * n_human:,}")
+    print(f"Shards: {len(shards)} × {args.shard_size} humans | done: {len(shards) - len(todo)} | to score: {len(todo)}")
+
+    if todo:
+        workers, nthread = core_budget(len(todo), args.cores, args.workers)
+        print(f"Running {workers} workers × {nthread} threads\n")
+        start = time.perf_counter()
+        scored = kept = 0
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(model_path, cols_path, HUMAN_SEQS_PATH, viral_ids, viral_blocks, args.threshold, nthread),
+        ) as pool:
+            futures = [pool.submit(score_shard, i, s, e, shard_paths[i]) for i, s, e in todo]
+            for done, fut in enumerate(as_completed(futures), start=1):
+                shard, n_pairs, n_edges, seconds = fut.result()
+                scored += n_pairs
+                kept += n_edges
+                print(f"--- shard {shard:>5} ({done}/{len(todo)}): {n_pairs:,} pairs, {n_edges:,} edges ({seconds:.1f}s)")
+        elapsed = time.perf_counter() - start
+        print(f"\nScored {scored:,} pairs in {elapsed:.1f}s ({scored / max(elapsed, 1e-9):,.0f} pairs/s), kept {kept:,}")
+
+    n_edges = merge_shards(shard_paths, args.output)
+    print(f"Edges with probability >= {args.threshold}: {n_edges:,}")
+    print(f"\nSaved → {os.path.relpath(args.output, BASE_DIR)}")
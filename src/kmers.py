@@ -0,0 +1,140 @@
+"""
+Sparse k-mer spectrum features.
+
+KmerSpectrum counts every k-mer (k = 1..3 by default) of a batch of sequences
+in one pass over the concatenated residue codes and returns a float32 CSR
+matrix, one row per sequence. Counts are divided by the number of k-mers of
+that size in the sequence (L - k + 1), as aac()/dpc() do, unless
+normalize=False.
+
+Without hashing every k-mer has its own column (20 + 400 + 8000 for k = 1..3),
+named k{k}_{kmer}. With n_features set, k-mers are hashed into that many
+columns (kh_{i}); colliding k-mers add up.
+
+The configuration is saved with the dataset (final_ppi_dataset.kmers.json,
+written by pipeline.py --kmers) and, by train.py, inside the model file, so
+InferenceEngine computes the same spectra the model was trained on.
+"""
+
+import os
+import json
+import numpy as np
+import scipy.sparse as sp
+
+from features import AA, N_AA, encode
+
+class KmerSpectrum:
+    def __init__(self, k=(1, 2, 3), n_features=None, normalize=True):
+        self.k = tuple(sorted({int(x) for x in k}))
+        if not self.k or self.k[0] < 1:
+            raise ValueError(f"k-mer sizes must be >= 1, got {k}")
+        self.n_features = int(n_features) if n_features else None
+        self.normalize = bool(normalize)
+        # first column of each k in the unhashed layout (also the k-mer id offset when hashing)
+        sizes = [N_AA ** k for k in self.k]
+        self._offsets = dict(zip(self.k, np.cumsum([0] + sizes[:-1]).tolist()))
+        self.dim = self.n_features or int(sum(sizes))
+
+    @property
+    def names(self):
+        if self.n_features:
+            return [f"kh_{i}" for i in range(self.n_features)]
+        names = []
+        for k in self.k:
+            kmers = [""]
+            for _ in range(k):
+                kmers = [m + a for m in kmers for a in AA]
+            names += [f"k{k}_{m}" for m in kmers]
+        return names
+
+    def config(self):
+        return {"k": list(self.k), "n_features": self.n_features, "normalize": self.normalize}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(**config)
+
+    def _columns(self, k, ids):
+        """Column of each k-mer id (20-ary code of the k residues)."""
+        g = ids + self._offsets[k]
+        if not self.n_features:
+            return g
+        # splitmix64 finalizer: a fixed, well-mixed hash (Python's hash() is salted per process)
+        x = g.astype(np.uint64)
+        x ^= x >> np.uint64(33)
+        x *= np.uint64(0xFF51AFD7ED558CCD)
+        x ^= x >> np.uint64(33)
+        x *= np.uint64(0xC4CEB9FE1A85EC53)
+        x ^= x >> np.uint64(33)
+        return (x % np.uint64(self.n_features)).astype(np.int64)
+
+    def transform(self, seqs, columns=None):
+        """
+        k-mer spectra of seqs as a float32 CSR matrix of shape (n, dim).
+
+        If columns (positions in names) is given, only those columns are
+        filled and the others are left empty; without hashing, k sizes with
+        no wanted column are not counted at all.
+        """
+        wanted = None
+        if columns is not None:
+            wanted = np.zeros(self.dim, dtype=bool)
+            wanted[np.asarray(columns, dtype=np.int64)] = True
+        encoded = [encode(s) for s in seqs]
+        n = len(encoded)
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=n)
+        codes = np.concatenate(encoded).astype(np.int64) if n else np.empty(0, dtype=np.int64)
+        rows = np.repeat(np.arange(n), lengths)
+
+        X = sp.csr_matrix((n, self.dim), dtype=np.float64)
+        for k in self.k:
+            if len(codes) < k:
+                continue
+            first = self._offsets[k]
+            if wanted is not None and not self.n_features and not wanted[first:first + N_AA ** k].any():
+                continue
+            # windows of k residues that start and end in the same sequence
+            start = np.flatnonzero(rows[:len(codes) - k + 1] == rows[k - 1:])
+            ids = np.zeros(len(start), dtype=np.int64)
+            for j in range(k):
+                ids = ids * N_AA + codes[start + j]
+            cols = self._columns(k, ids)
+            if wanted is not None:
+                keep = wanted[cols]
+                start, cols = start[keep], cols[keep]
+            counts = sp.csr_matrix((np.ones(len(start)), (rows[start], cols)), shape=(n, self.dim))
+            if self.normalize:
+                counts = sp.diags(1.0 / np.maximum(1, lengths - k + 1)) @ counts
+            X = X + counts
+        X = X.astype(np.float32).tocsr()
+        X.sort_indices()
+        return X
+
+# -------------------------
+# Configuration next to the dataset / inside the model
+# -------------------------
+def config_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".kmers.json"
+
+def load_config(csv_path):
+    """k-mer configuration the dataset was built with, or None."""
+    path = config_path(csv_path)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def save_config(csv_path, config):
+    """Write (or, for config=None, remove) the dataset's k-mer configuration."""
+    path = config_path(csv_path)
+    if config is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    with open(path, "w") as f:
+        json.dump(config, f, indent=2)
+
+def from_booster(booster):
+    """KmerSpectrum recorded in a booster (see engine.mark_kmers), or None."""
+    config = booster.attr("kmers")
+    return KmerSpectrum.from_config(json.loads(config)) if config else None
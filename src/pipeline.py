@@ -1,190 +1,435 @@
+"""
+Build data/processed/final_ppi_dataset from BioGRID + sequences.
+
+The pipeline is a DAG of named stages (see stages.py):
+
+    previous ──────┬─────> viral_sequences ─┐
+    interactions ──┘                        ├─> pairs ─> negatives ─> features ─> save
+    human_sequences ────────────────────────┘
+
+Stages are keyed by the hashes of their inputs and code and checkpointed under
+data/cache/pipeline/, so a run that stops part-way resumes from the last
+finished stage, and independent stages (BioGRID parse, human sequences, viral
+fetch) run concurrently.
+
+By default the build is incremental against the previous one
+(pipeline_state.json next to the dataset): only viral accessions not fetched
+before are fetched, previous rows that are still valid are kept, rows for
+pairs that left the interaction set are retired, new pairs are appended, and
+per-protein features come from a store keyed by sequence hash, so only new or
+changed sequences are featurized. What changed is written to
+pipeline_manifest.json and pipeline_changes.csv.
+
+    python src/pipeline.py                          # run / resume (incremental when possible)
+    python src/pipeline.py --full                   # rebuild from scratch (refetches every viral sequence)
+    python src/pipeline.py --force viral_sequences  # re-run a stage (and everything after it)
+    python src/pipeline.py --stage negatives        # run only up to a stage
+    python src/pipeline.py --list                   # show stages and checkpoint status
+    python src/pipeline.py --sparse                 # store the feature matrix as float32 CSR
+    python src/pipeline.py --kmers 1 2 3 --kmer-hash 4096   # add hashed k-mer spectra (CSR)
+"""
+
 import pandas as pd
 import numpy as np
-import requests
-import time
 import os
-import re
-import itertools
-from collections import Counter
-from Bio.SeqUtils.ProtParam import ProteinAnalysis
+import json
+import hashlib
+import argparse
+import scipy.sparse as sp
+
+from biogrid import BIOGRID_FILE, SARS_COV2_TAXID, HUMAN_TAXID, file_hash, load_biogrid
+from fetch import fetch_fasta_many
+from dataset import save_dataset, binary_paths, load_ids
+from sampling import sample_negatives
+from instrument import RunReport
+from featstore import FeatureStore, seq_hash
+from features import FEATURE_COLUMNS, PROTEIN_NAMES
+from kmers import KmerSpectrum, config_path, save_config
+from stages import StageGraph
 
 ############################################
 # FILES
 ############################################
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-BIOGRID_FILE = os.path.join(BASE_DIR, "data", "raw", "BIOGRID-PROJECT-covid19_coronavirus_project-5.0.251", "BIOGRID-PROJECT-covid19_coronavirus_project-INTERACTIONS-5.0.251.tab3.txt")
 HUMAN_FASTA_FILE = os.path.join(BASE_DIR, "data", "processed", "human_sequences_clean.csv")
 OUT_DATASET = os.path.join(BASE_DIR, "data", "processed", "final_ppi_dataset.csv")
+FETCH_REPORT = os.path.join(BASE_DIR, "data", "processed", "viral_fetch_report.csv")
+RUN_REPORT = os.path.join(BASE_DIR, "data", "processed", "pipeline_run_report.json")
+BUILD_STATE = os.path.join(BASE_DIR, "data", "processed", "pipeline_state.json")
+MANIFEST = os.path.join(BASE_DIR, "data", "processed", "pipeline_manifest.json")
+CHANGES = os.path.join(BASE_DIR, "data", "processed", "pipeline_changes.csv")
+CHECKPOINT_DIR = os.path.join(BASE_DIR, "data", "cache", "pipeline")
+FEATURE_STORE_DIR = os.path.join(BASE_DIR, "data", "cache")
 
 MIN_SEQ_LEN = 30
 NEG_RATIO = 1
+NEG_PER_VIRAL = False   # per-viral-protein negative quotas instead of uniform sampling
+SEED = 42
+FETCH_WORKERS = 8
+STAGE_WORKERS = 3       # stages allowed to run at the same time
+
+FULL_REBUILD = False    # set from --full
+SPARSE_FEATURES = False # set from --sparse: build and save X as CSR (zeros not stored)
+KMER_CONFIG = None      # set from --kmers / --kmer-hash: KmerSpectrum config, spectra appended to X
+
+# Anything that changes how rows are chosen or laid out invalidates the previous build
+SETTINGS = {
+    "min_seq_len": MIN_SEQ_LEN,
+    "neg_ratio": NEG_RATIO,
+    "neg_per_viral": NEG_PER_VIRAL,
+    "seed": SEED,
+    "feature_columns": hashlib.sha1("\x1f".join(FEATURE_COLUMNS).encode()).hexdigest()[:12],
+}
+
+run = RunReport("pipeline")
+graph = StageGraph(CHECKPOINT_DIR, report=run)
+
+def pair_keys(df):
+    """(viral, human, label, occurrence) per row, so repeated BioGRID pairs diff as a multiset."""
+    occ = df.groupby(["viral_uniprot", "human_uniprot", "label"], sort=False).cumcount()
+    return pd.MultiIndex.from_arrays([df["viral_uniprot"], df["human_uniprot"], df["label"], occ])
+
+def build_inputs():
+    """Fingerprint of everything a build is made from."""
+    return {
+        "biogrid": file_hash(BIOGRID_FILE),
+        "human": file_hash(HUMAN_FASTA_FILE),
+        "settings": SETTINGS,
+        "full": FULL_REBUILD,
+    }
+
+def previous_fingerprint():
+    """
+    Identity of the previous build the next one diffs against. If the inputs
+    have not changed since that build was made, the fingerprint it was built
+    on is reused, so every stage key matches and the run is a no-op.
+    """
+    if not os.path.exists(BUILD_STATE):
+        return {"previous": "none", "full": FULL_REBUILD}
+    with open(BUILD_STATE) as f:
+        build = json.load(f).get("build", {})
+    if build.get("inputs") == build_inputs():
+        return build["based_on"]
+    return {"previous": file_hash(BUILD_STATE), "full": FULL_REBUILD}
 
 ############################################
-# AMINO ACIDS
-############################################
-
-AA = "ACDEFGHIKLMNPQRSTVWY"
-
-############################################
-# FEATURE FUNCTIONS
+# PREVIOUS BUILD
 ############################################
 
-def clean_seq(s):
-    """Remove non-standard amino acid characters."""
-    return re.sub(r"[^ACDEFGHIKLMNPQRSTVWY]", "", str(s).upper())
-
-def aac(seq):
-    c = Counter(seq)
-    return [c[a] / len(seq) for a in AA]
-
-def dpc(seq):
-    pairs = [seq[i:i+2] for i in range(len(seq)-1)]
-    c = Counter(pairs)
-    total = len(pairs)
-    return [c[a+b] / total for a in AA for b in AA]
-
-def physchem(seq):
-    """Compute physicochemical properties using Biopython ProteinAnalysis."""
-    if len(seq) < 5:
-        return [len(seq), 0.0, 0.0, 0.0, 0.0]
-    try:
-        pa = ProteinAnalysis(seq)
-        return [len(seq), pa.molecular_weight(), pa.gravy(), pa.aromaticity(), pa.instability_index()]
-    except Exception:
-        return [len(seq), 0.0, 0.0, 0.0, 0.0]
-
-############################################
-# SAFE VIRAL FASTA FETCH (ONLY ~19)
-############################################
-
-def fetch_fasta(uniprot):
-    url = f"https://rest.uniprot.org/uniprotkb/{uniprot}.fasta"
-    try:
-        r = requests.get(url, timeout=20)
-        if r.status_code == 200 and r.text.startswith(">"):
-            return "".join(r.text.splitlines()[1:])
-    except:
-        pass
-    return None
+@graph.stage(params=lambda: {"fingerprint": previous_fingerprint(), "settings": SETTINGS}, checkpoint=False,
+             code=["dataset"])
+def previous():
+    prev = {"state": None, "ids": None, "reason": "--full", "fingerprint": previous_fingerprint()}
+    if not FULL_REBUILD:
+        if not (os.path.exists(BUILD_STATE) and os.path.exists(OUT_DATASET)):
+            prev["reason"] = "no previous build"
+        else:
+            with open(BUILD_STATE) as f:
+                state = json.load(f)
+            if state.get("settings") != SETTINGS:
+                prev["reason"] = "settings changed"
+            else:
+                prev.update(state=state, ids=load_ids(OUT_DATASET), reason=None)
+
+    mode = "incremental" if prev["state"] else f"full ({prev['reason']})"
+    print(f"\nBuild mode: {mode}")
+    return prev
 
 ############################################
 # LOAD BIOGRID
 ############################################
 
-print("\n=== LOADING BIOGRID ===")
-
-bg = pd.read_csv(BIOGRID_FILE, sep="\t", low_memory=False)
-
-bg = bg[
-    (bg["Organism Name Interactor A"] == "Severe acute respiratory syndrome coronavirus 2") &
-    (bg["Organism Name Interactor B"] == "Homo sapiens")
-]
-
-bg = bg[[
-    "SWISS-PROT Accessions Interactor A",
-    "SWISS-PROT Accessions Interactor B"
-]].dropna()
-
-bg.columns = ["viral_uniprot", "human_uniprot"]
-bg = bg[~bg["viral_uniprot"].str.contains("\\|")]
-bg = bg[~bg["human_uniprot"].str.contains("\\|")]
-
-print("Positive interactions:", len(bg))
-print("Unique viral proteins:", bg["viral_uniprot"].nunique())
-print("Unique human proteins:", bg["human_uniprot"].nunique())
+@graph.stage(files=[BIOGRID_FILE], code=["biogrid"])
+def interactions():
+    print("\n=== LOADING BIOGRID ===")
+    bg = load_biogrid(
+        BIOGRID_FILE,
+        organism_a=SARS_COV2_TAXID,
+        organism_b=HUMAN_TAXID,
+        columns=["SWISS-PROT Accessions Interactor A", "SWISS-PROT Accessions Interactor B"]
+    ).dropna()
+
+    bg.columns = ["viral_uniprot", "human_uniprot"]
+    bg = bg[~bg["viral_uniprot"].str.contains("\\|")]
+    bg = bg[~bg["human_uniprot"].str.contains("\\|")]
+
+    print("Positive interactions:", len(bg))
+    print("Unique viral proteins:", bg["viral_uniprot"].nunique())
+    print("Unique human proteins:", bg["human_uniprot"].nunique())
+    return bg
 
 ############################################
 # LOAD HUMAN SEQUENCES (LOCAL – FAST)
 ############################################
 
-print("\n=== LOADING HUMAN FASTA (LOCAL) ===")
-
-human_df = pd.read_csv(HUMAN_FASTA_FILE)
-human_seq = dict(zip(human_df["uniprot"], human_df["sequence"]))
+@graph.stage(files=[HUMAN_FASTA_FILE], checkpoint=False)
+def human_sequences():
+    print("\n=== LOADING HUMAN FASTA (LOCAL) ===")
+    human_df = pd.read_csv(HUMAN_FASTA_FILE)
+    return dict(zip(human_df["uniprot"], human_df["sequence"]))
 
 ############################################
 # FETCH VIRAL SEQUENCES (ONLY 19)
 ############################################
 
-print("\n=== FETCHING VIRAL FASTA ===")
-
-viral_seq = {}
-for v in bg["viral_uniprot"].unique():
-    s = fetch_fasta(v)
-    if s and len(s) >= MIN_SEQ_LEN:
-        viral_seq[v] = s
+@graph.stage(params={"fetch_workers": FETCH_WORKERS}, outputs=[FETCH_REPORT], code=["fetch"])
+def viral_sequences(previous, interactions):
+    print("\n=== FETCHING VIRAL FASTA ===")
+    # incremental builds reuse the sequences fetched last time and only fetch new accessions
+    known = previous["state"]["viral_sequences"] if previous["state"] else {}
+    wanted = interactions["viral_uniprot"].unique()
+    fetched, fetch_report = fetch_fasta_many([v for v in wanted if v not in known], max_workers=FETCH_WORKERS)
+    fetch_report += [{"accession": v, "status": "reused", "attempts": 0, "error": None, "seconds": 0.0}
+                     for v in wanted if v in known]
+    fetched.update({v: known[v] for v in wanted if v in known})
+
+    fetch_report = pd.DataFrame(fetch_report, columns=["accession", "status", "attempts", "error", "seconds"])
+    fetch_report.to_csv(FETCH_REPORT, index=False)
+
+    print("Fetch status:", fetch_report["status"].value_counts().to_dict())
+    for _, r in fetch_report[~fetch_report["status"].isin(["ok", "reused"])].iterrows():
+        print(f"  {r['accession']}: {r['status']} after {r['attempts']} attempt(s) ({r['error']})")
+    return {"fetched": fetched, "report": fetch_report}
 
 ############################################
 # FILTER VALID PAIRS
 ############################################
 
-bg = bg[
-    bg["viral_uniprot"].isin(viral_seq) &
-    bg["human_uniprot"].isin(human_seq)
-]
+@graph.stage(params={"min_seq_len": MIN_SEQ_LEN}, checkpoint=False)
+def pairs(interactions, viral_sequences, human_sequences):
+    viral_seq = {v: s for v, s in viral_sequences["fetched"].items() if len(s) >= MIN_SEQ_LEN}
+    bg = interactions[
+        interactions["viral_uniprot"].isin(viral_seq) &
+        interactions["human_uniprot"].isin(human_sequences)
+    ]
 
-print("Usable positives:", len(bg))
-print("Final viral proteins:", bg["viral_uniprot"].nunique())
+    print("Usable positives:", len(bg))
+    print("Final viral proteins:", bg["viral_uniprot"].nunique())
+    return {"positives": bg, "viral_seq": viral_seq}
 
 ############################################
 # GENERATE NEGATIVES
 ############################################
 
-all_pairs = set(itertools.product(viral_seq.keys(), human_seq.keys()))
-positive_pairs = set(zip(bg["viral_uniprot"], bg["human_uniprot"]))
-
-negatives = list(all_pairs - positive_pairs)
-np.random.shuffle(negatives)
-negatives = negatives[:len(bg) * NEG_RATIO]
-
-pos_df = bg.copy()
-pos_df["label"] = 1
-
-neg_df = pd.DataFrame(negatives, columns=["viral_uniprot", "human_uniprot"])
-neg_df["label"] = 0
-
-data = pd.concat([pos_df, neg_df], ignore_index=True)
+@graph.stage(params={"neg_ratio": NEG_RATIO, "neg_per_viral": NEG_PER_VIRAL, "seed": SEED},
+             code=["sampling", pair_keys])
+def negatives(previous, pairs, human_sequences):
+    bg, viral_seq, human_seq = pairs["positives"], pairs["viral_seq"], human_sequences
+    prev_ids = previous["ids"]
+
+    pos_df = bg.copy()
+    pos_df["label"] = 1
+    positive_set = set(zip(bg["viral_uniprot"], bg["human_uniprot"]))
+
+    # negatives from the previous build stay while both proteins are usable and the pair is not now a positive
+    kept_neg = pd.DataFrame(columns=["viral_uniprot", "human_uniprot"])
+    if prev_ids is not None:
+        prev_neg = prev_ids[prev_ids["label"] == 0]
+        valid = (
+            prev_neg["viral_uniprot"].isin(viral_seq) &
+            prev_neg["human_uniprot"].isin(human_seq) &
+            ~pd.MultiIndex.from_frame(prev_neg[["viral_uniprot", "human_uniprot"]]).isin(list(positive_set))
+        )
+        kept_neg = prev_neg.loc[valid, ["viral_uniprot", "human_uniprot"]]
+    exclude = positive_set | set(zip(kept_neg["viral_uniprot"], kept_neg["human_uniprot"]))
+
+    if NEG_PER_VIRAL:
+        # same number of negatives per viral protein as it has positives
+        target = bg["viral_uniprot"].value_counts() * NEG_RATIO
+        kept_neg = kept_neg[kept_neg.groupby("viral_uniprot").cumcount() < kept_neg["viral_uniprot"].map(target).fillna(0)]
+        have = kept_neg["viral_uniprot"].value_counts().reindex(target.index, fill_value=0)
+        quotas = {v: int(k) for v, k in (target - have).items() if k > 0}
+        neg_df = sample_negatives(viral_seq.keys(), human_seq.keys(), exclude, quotas=quotas, seed=SEED)
+    else:
+        kept_neg = kept_neg.head(len(bg) * NEG_RATIO)
+        neg_df = sample_negatives(viral_seq.keys(), human_seq.keys(), exclude, n=len(bg) * NEG_RATIO - len(kept_neg), seed=SEED)
+
+    neg_df["label"] = 0
+    kept_neg = kept_neg.assign(label=0)
+
+    if prev_ids is not None:
+        # previous rows that are still valid keep their order; new rows are appended
+        prev_pos = prev_ids[prev_ids["label"] == 1]
+        prev_kept_pos = prev_pos[pair_keys(prev_pos).isin(pair_keys(pos_df))]
+        new_pos = pos_df[~pair_keys(pos_df).isin(pair_keys(prev_pos))]
+        kept = pd.concat([prev_kept_pos, kept_neg]).sort_index()
+        data = pd.concat([kept, new_pos, neg_df], ignore_index=True)
+    else:
+        data = pd.concat([pos_df, neg_df], ignore_index=True)
+
+    print(f"Negatives sampled: {len(neg_df)} (kept from previous build: {len(kept_neg)})")
+    return data
 
 ############################################
 # FEATURE EXTRACTION
 ############################################
 
-print("\n=== FEATURE EXTRACTION ===")
-
-rows = []
-
-for _, r in data.iterrows():
-    v = clean_seq(viral_seq[r["viral_uniprot"]])
-    h = clean_seq(human_seq[r["human_uniprot"]])
-
-    if len(v) < 5 or len(h) < 5:
-        continue
-
-    feat = (
-        aac(v) + dpc(v) + physchem(v) +
-        aac(h) + dpc(h) + physchem(h)
-    )
-
-    rows.append([r["viral_uniprot"], r["human_uniprot"], r["label"]] + feat)
+def sparse_build():
+    # k-mer spectra are only ever stored sparse
+    return SPARSE_FEATURES or KMER_CONFIG is not None
+
+@graph.stage(params=lambda: {"sparse": SPARSE_FEATURES, "kmers": KMER_CONFIG},
+             code=["features", "featstore", "kmers", sparse_build])
+def features(negatives, pairs, human_sequences):
+    print("\n=== FEATURE EXTRACTION ===")
+    data, viral_seq, human_seq = negatives, pairs["viral_seq"], human_sequences
+
+    # One 425-dim block per unique protein (from the sequence-keyed store), then gather rows per pair
+    store = FeatureStore(FEATURE_STORE_DIR)
+    viral_ids = pd.Index(data["viral_uniprot"].unique())
+    human_ids = pd.Index(data["human_uniprot"].unique())
+
+    viral_feat = store.features([viral_seq[v] for v in viral_ids])
+    human_feat = store.features([human_seq[h] for h in human_ids])
+    store.save()
+
+    v_idx = viral_ids.get_indexer(data["viral_uniprot"])
+    h_idx = human_ids.get_indexer(data["human_uniprot"])
+
+    len_col = PROTEIN_NAMES.index("len")
+    keep = (viral_feat[v_idx, len_col] >= 5) & (human_feat[h_idx, len_col] >= 5)
+
+    if sparse_build():
+        # most DPC entries of a protein are zero; the pair matrix is built without densifying
+        X = sp.hstack([sp.csr_matrix(viral_feat)[v_idx[keep]], sp.csr_matrix(human_feat)[h_idx[keep]]],
+                      format="csr", dtype=np.float32)
+    else:
+        X = np.hstack([viral_feat[v_idx[keep]], human_feat[h_idx[keep]]])
+
+    # k-mer spectra, one per unique protein (computed each build, not stored), after the 850 columns
+    columns = FEATURE_COLUMNS
+    if KMER_CONFIG is not None:
+        spectrum = KmerSpectrum.from_config(KMER_CONFIG)
+        viral_kmers = spectrum.transform([viral_seq[v] for v in viral_ids])
+        human_kmers = spectrum.transform([human_seq[h] for h in human_ids])
+        X = sp.hstack([X, viral_kmers[v_idx[keep]], human_kmers[h_idx[keep]]], format="csr", dtype=np.float32)
+        columns = FEATURE_COLUMNS + [f"v_{c}" for c in spectrum.names] + [f"h_{c}" for c in spectrum.names]
+        print(f"k-mer spectra: k = {list(spectrum.k)}, {spectrum.dim} columns per protein")
+
+    print("Feature blocks:", len(viral_ids), "viral,", len(human_ids), "human")
+    print("Computed:", store.computed, "| reused from store:", store.reused)
+    if sparse_build():
+        print(f"Sparse features: {X.nnz / max(1, X.shape[0] * X.shape[1]):.1%} non-zero")
+    return {
+        "ids": data.loc[keep].reset_index(drop=True),
+        "X": X,
+        "columns": columns,
+        "kmers": KMER_CONFIG,
+        "store": {"computed": store.computed, "reused": store.reused},
+    }
 
 ############################################
 # SAVE FINAL DATASET
 ############################################
 
-columns = (
-    ["viral_uniprot", "human_uniprot", "label"] +
-    [f"v_aac_{a}" for a in AA] +
-    [f"v_dpc_{a}{b}" for a in AA for b in AA] +
-    ["v_len","v_mw","v_gravy","v_arom","v_instab"] +
-    [f"h_aac_{a}" for a in AA] +
-    [f"h_dpc_{a}{b}" for a in AA for b in AA] +
-    ["h_len","h_mw","h_gravy","h_arom","h_instab"]
-)
+@graph.stage(outputs=lambda: [OUT_DATASET, *binary_paths(OUT_DATASET, sparse_build()), MANIFEST, CHANGES, BUILD_STATE]
+             + ([config_path(OUT_DATASET)] if KMER_CONFIG else []),
+             code=["dataset", "featstore", "kmers", pair_keys, sparse_build, build_inputs])
+def save(previous, viral_sequences, pairs, human_sequences, features):
+    final, X = features["ids"], features["X"]
+    viral_seq, human_seq = pairs["viral_seq"], human_sequences
+    prev_state = previous["state"]
+    hashes = {
+        "viral": {v: seq_hash(viral_seq[v]) for v in final["viral_uniprot"].unique()},
+        "human": {h: seq_hash(human_seq[h]) for h in final["human_uniprot"].unique()},
+    }
+
+    # Change manifest against the previous dataset
+    if prev_state:
+        before = previous["ids"]
+    else:
+        before = load_ids(OUT_DATASET) if os.path.exists(OUT_DATASET) else final.iloc[:0]
+    before_keys, final_keys = pair_keys(before), pair_keys(final)
+    added = final[~final_keys.isin(before_keys)].assign(change="added")
+    retired = before[~before_keys.isin(final_keys)].assign(change="retired")
+    changes = pd.concat([added, retired], ignore_index=True)
+
+    prev_hashes = prev_state["sequence_hashes"] if prev_state else {"viral": {}, "human": {}}
+    proteins = {}
+    for side in ("viral", "human"):
+        old, new = prev_hashes[side], hashes[side]
+        proteins[side] = {
+            "added": sorted(set(new) - set(old)),
+            "removed": sorted(set(old) - set(new)),
+            "changed": sorted(k for k in set(new) & set(old) if new[k] != old[k]),
+        }
+    changed_proteins = set(proteins["viral"]["changed"]) | set(proteins["human"]["changed"])
+    kept_rows = final[final_keys.isin(before_keys)]
+
+    manifest = {
+        "mode": "incremental" if prev_state else "full",
+        "reason": previous["reason"],
+        "biogrid_file": os.path.basename(BIOGRID_FILE),
+        "rows": {
+            "previous": int(len(before)),
+            "current": int(len(final)),
+            "kept": int(len(kept_rows)),
+            "kept_with_changed_sequence": int((kept_rows["viral_uniprot"].isin(changed_proteins) |
+                                               kept_rows["human_uniprot"].isin(changed_proteins)).sum()),
+            "added": int(len(added)),
+            "retired": int(len(retired)),
+        },
+        "by_label": {
+            change: {str(k): int(v) for k, v in df["label"].value_counts().sort_index().items()}
+            for change, df in (("added", added), ("retired", retired))
+        },
+        "proteins": proteins,
+        "features": features["store"],
+        "fetch": viral_sequences["report"]["status"].value_counts().to_dict(),
+    }
+
+    save_dataset(final, X, features["columns"], OUT_DATASET)
+    save_config(OUT_DATASET, features["kmers"])
+    changes.to_csv(CHANGES, index=False)
+    with open(MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=2)
+    # the state is written last: a build that stops early leaves the previous state in place
+    with open(BUILD_STATE + ".tmp", "w") as f:
+        json.dump({
+            "settings": SETTINGS,
+            "build": {"inputs": build_inputs(), "based_on": previous["fingerprint"]},
+            "viral_sequences": viral_sequences["fetched"],
+            "sequence_hashes": hashes,
+        }, f)
+    os.replace(BUILD_STATE + ".tmp", BUILD_STATE)
+
+    print("\n=== DONE ===")
+    print("Final samples:", X.shape[0])
+    print("Saved →", OUT_DATASET)
+    print("Saved →", " + ".join(os.path.basename(p) for p in binary_paths(OUT_DATASET, sp.issparse(X))))
+    print(f"Changes: +{manifest['rows']['added']} / -{manifest['rows']['retired']} rows "
+          f"({manifest['rows']['kept']} kept) → {os.path.basename(MANIFEST)}")
+    return manifest
 
-final_df = pd.DataFrame(rows, columns=columns)
-final_df.to_csv(OUT_DATASET, index=False)
+############################################
+# CLI
+############################################
 
-print("\n=== DONE ===")
-print("Final samples:", len(final_df))
-print("Saved →", OUT_DATASET)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the SARS-CoV-2 × human PPI dataset")
+    parser.add_argument("--full", action="store_true", help="Ignore the previous build and rebuild from scratch")
+    parser.add_argument("--stage", nargs="+", choices=list(graph.stages), help="Run only these stages (and what they need)")
+    parser.add_argument("--force", nargs="+", default=[], choices=list(graph.stages) + ["all"],
+                        help="Re-run these stages even if checkpointed (their dependents re-run too)")
+    parser.add_argument("--list", action="store_true", help="Show stages and checkpoint status, then exit")
+    parser.add_argument("--jobs", type=int, default=STAGE_WORKERS, help="Stages run concurrently")
+    parser.add_argument("--sparse", action="store_true", help="Store the feature matrix as float32 CSR")
+    parser.add_argument("--kmers", nargs="+", type=int, help="Append k-mer spectra for these k (e.g. 1 2 3); implies --sparse")
+    parser.add_argument("--kmer-hash", type=int, default=0, help="Hash the k-mer spectra into this many columns (0 = one column per k-mer)")
+    args = parser.parse_args()
+    if args.kmer_hash and not args.kmers:
+        parser.error("--kmer-hash requires --kmers")
+    FULL_REBUILD = args.full
+    SPARSE_FEATURES = args.sparse
+    KMER_CONFIG = KmerSpectrum(args.kmers, args.kmer_hash).config() if args.kmers else None
+
+    if args.list:
+        for name, deps, key, fresh in graph.status(args.stage):
+            print(f"{name:<16} {'checkpointed' if fresh else '-':<13} {key}  <- {', '.join(deps) or '(inputs)'}")
+    else:
+        executed = graph.run(args.stage, force=args.force, jobs=args.jobs)
+        if executed:
+            run.save(RUN_REPORT)
+        else:
+            print("Everything up to date.")
@@ -7,15 +7,15 @@ predict the probability of interaction using the trained XGBoost model.
 import pandas as pd
 import numpy as np
 import os
-import re
 import sys
 import json
-import joblib
 import argparse
-import requests
-from collections import Counter
-from Bio.SeqUtils.ProtParam import ProteinAnalysis
-from xgboost import XGBClassifier
+import heapq
+import hashlib
+
+from engine import InferenceEngine
+from features import FEATURES_VERSION, PROTEIN_NAMES, clean_seq, protein_features
+from seqcache import get_cache
 
 # -------------------------
 # Paths
@@ -23,65 +23,83 @@ from xgboost import XGBClassifier
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODEL_PATH = os.path.join(BASE_DIR, "models", "ppi_xgboost_model.json")
 FEATURE_COLS_PATH = os.path.join(BASE_DIR, "models", "feature_columns.pkl")
-
-# -------------------------
-# Feature extraction (same as pipeline.py)
-# -------------------------
-AA = "ACDEFGHIKLMNPQRSTVWY"
-
-def clean_seq(s):
-    return re.sub(r"[^ACDEFGHIKLMNPQRSTVWY]", "", str(s).upper())
-
-def aac(seq):
-    c = Counter(seq)
-    return [c[a] / max(1, len(seq)) for a in AA]
-
-def dpc(seq):
-    pairs = [seq[i:i+2] for i in range(len(seq)-1)]
-    c = Counter(pairs)
-    total = max(1, len(pairs))
-    return [c[a+b] / total for a in AA for b in AA]
-
-def physchem(seq):
-    if len(seq) < 5:
-        return [len(seq), 0.0, 0.0, 0.0, 0.0]
-    try:
-        pa = ProteinAnalysis(seq)
-        return [len(seq), pa.molecular_weight(), pa.gravy(), pa.aromaticity(), pa.instability_index()]
-    except Exception:
-        return [len(seq), 0.0, 0.0, 0.0, 0.0]
-
-def extract_pair_features(viral_seq, human_seq):
-    """Extract feature vector for a viral-human protein pair."""
-    v = clean_seq(viral_seq)
-    h = clean_seq(human_seq)
-    if len(v) < 5 or len(h) < 5:
-        raise ValueError(f"Sequences too short after cleaning (viral: {len(v)}, human: {len(h)})")
-    feat = aac(v) + dpc(v) + physchem(v) + aac(h) + dpc(h) + physchem(h)
-    return np.array(feat)
+# Compact top-K model written by `train.py --top-k K`
+FAST_MODEL_PATH = os.path.join(BASE_DIR, "models", "ppi_xgboost_fast.json")
+FAST_FEATURE_COLS_PATH = os.path.join(BASE_DIR, "models", "feature_columns_fast.pkl")
+HUMAN_SEQS_PATH = os.path.join(BASE_DIR, "data", "processed", "human_sequences_clean.csv")
+CACHE_DIR = os.path.join(BASE_DIR, "data", "cache")
 
 # -------------------------
 # Sequence fetching
 # -------------------------
 def fetch_sequence(uniprot_id):
-    """Fetch protein sequence from UniProt API."""
-    url = f"https://rest.uniprot.org/uniprotkb/{uniprot_id}.fasta"
+    """Fetch protein sequence from UniProt API (through the local sequence cache)."""
     try:
-        r = requests.get(url, timeout=20)
-        if r.status_code == 200 and r.text.startswith(">"):
-            return "".join(r.text.splitlines()[1:])
+        seq, _ = get_cache().get(uniprot_id)
+        return seq
     except Exception as e:
         print(f"Error fetching {uniprot_id}: {e}")
     return None
 
+def is_accession(id_or_seq):
+    """Short input without lower-case letters is treated as a UniProt ID, anything else as a sequence."""
+    return len(id_or_seq) < 30 and not any(c in id_or_seq for c in "acdefghiklmnpqrstvwy")
+
+def resolve_sequence(id_or_seq, kind):
+    """Return (sequence, label) for a UniProt ID or raw sequence."""
+    if is_accession(id_or_seq):
+        print(f"Fetching {kind} sequence for {id_or_seq}...")
+        seq = fetch_sequence(id_or_seq)
+        if seq is None:
+            raise ValueError(f"Could not fetch sequence for {id_or_seq}")
+        return seq, id_or_seq
+    return id_or_seq, f"custom_{kind}"
+
+# -------------------------
+# Human feature blocks (for screening)
+# -------------------------
+def load_human_features(human_csv=HUMAN_SEQS_PATH, cache_dir=CACHE_DIR):
+    """
+    425-dim feature block for every human protein in human_csv.
+
+    Blocks are computed once and stored under cache_dir keyed by the CSV
+    content hash and FEATURES_VERSION; later calls memory-map them.
+
+    Returns:
+        (array of human UniProt IDs, float32 matrix of shape (n, 425))
+    """
+    h = hashlib.sha1(FEATURES_VERSION.encode())
+    with open(human_csv, "rb") as f:
+        h.update(f.read())
+    key = h.hexdigest()[:16]
+    feat_path = os.path.join(cache_dir, f"human_features_{key}.npy")
+    ids_path = os.path.join(cache_dir, f"human_features_{key}.ids.npy")
+
+    if os.path.exists(feat_path) and os.path.exists(ids_path):
+        return np.load(ids_path), np.load(feat_path, mmap_mode="r")
+
+    human_df = pd.read_csv(human_csv)
+    print(f"Computing feature blocks for {len(human_df)} human proteins...")
+    ids = human_df["uniprot"].to_numpy(dtype=str)
+    blocks = protein_features(human_df["sequence"].tolist())
+
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(ids_path + ".tmp.npy", ids)
+    np.save(feat_path + ".tmp.npy", blocks)
+    os.replace(ids_path + ".tmp.npy", ids_path)
+    os.replace(feat_path + ".tmp.npy", feat_path)
+    return ids, blocks
+
 # -------------------------
 # Load model
 # -------------------------
-def load_model():
-    model = XGBClassifier()
-    model.load_model(MODEL_PATH)
-    feature_cols = joblib.load(FEATURE_COLS_PATH)
-    return model, feature_cols
+def load_model(fast=False):
+    """InferenceEngine over the saved Booster (column layout checked here, once) and its feature columns."""
+    if fast:
+        engine = InferenceEngine.load(FAST_MODEL_PATH, FAST_FEATURE_COLS_PATH)
+    else:
+        engine = InferenceEngine.load(MODEL_PATH, FEATURE_COLS_PATH)
+    return engine, engine.feature_cols
 
 # -------------------------
 # Predict
@@ -99,34 +117,16 @@ def predict_interaction(viral_id_or_seq, human_id_or_seq, model=None, feature_co
     """
     if model is None:
         model, feature_cols = load_model()
+    engine = InferenceEngine.wrap(model, feature_cols)
 
-    # Determine if input is UniProt ID or raw sequence
-    if len(viral_id_or_seq) < 30 and not any(c in viral_id_or_seq for c in "acdefghiklmnpqrstvwy"):
-        print(f"Fetching viral sequence for {viral_id_or_seq}...")
-        viral_seq = fetch_sequence(viral_id_or_seq)
-        if viral_seq is None:
-            raise ValueError(f"Could not fetch sequence for {viral_id_or_seq}")
-        viral_label = viral_id_or_seq
-    else:
-        viral_seq = viral_id_or_seq
-        viral_label = "custom_viral"
-
-    if len(human_id_or_seq) < 30 and not any(c in human_id_or_seq for c in "acdefghiklmnpqrstvwy"):
-        print(f"Fetching human sequence for {human_id_or_seq}...")
-        human_seq = fetch_sequence(human_id_or_seq)
-        if human_seq is None:
-            raise ValueError(f"Could not fetch sequence for {human_id_or_seq}")
-        human_label = human_id_or_seq
-    else:
-        human_seq = human_id_or_seq
-        human_label = "custom_human"
-
-    # Extract features
-    feat_vector = extract_pair_features(viral_seq, human_seq)
-    X = pd.DataFrame([feat_vector], columns=feature_cols)
+    viral_seq, viral_label = resolve_sequence(viral_id_or_seq, "viral")
+    human_seq, human_label = resolve_sequence(human_id_or_seq, "human")
+    v_len, h_len = len(clean_seq(viral_seq)), len(clean_seq(human_seq))
+    if v_len < 5 or h_len < 5:
+        raise ValueError(f"Sequences too short after cleaning (viral: {v_len}, human: {h_len})")
 
-    # Predict
-    prob = model.predict_proba(X)[0, 1]
+    # Extract features (+ k-mer spectra for a k-mer model) and predict
+    prob = engine.predict_pair(viral_seq, human_seq)
     pred = int(prob >= 0.5)
 
     return {
@@ -134,39 +134,154 @@ def predict_interaction(viral_id_or_seq, human_id_or_seq, model=None, feature_co
         "human_protein": human_label,
         "interaction_probability": round(float(prob), 4),
         "prediction": "INTERACTING" if pred else "NON-INTERACTING",
-        "viral_seq_length": len(clean_seq(viral_seq)),
-        "human_seq_length": len(clean_seq(human_seq))
+        "viral_seq_length": v_len,
+        "human_seq_length": h_len
     }
 
+# -------------------------
+# Proteome-wide screen
+# -------------------------
+def screen(viral_id_or_seq, top_k=100, output_csv=None, model=None, feature_cols=None,
+           human_csv=HUMAN_SEQS_PATH, chunk_size=25000, cache_dir=CACHE_DIR):
+    """
+    Score one viral protein against every human protein in human_csv.
+
+    Human feature blocks come from load_human_features() (k-mer spectra, for
+    a model that uses them, are computed per chunk); the viral block is
+    computed once and broadcast. Scores are computed chunk by chunk (one
+    prediction call per chunk of chunk_size humans) and only the best top_k
+    of each chunk are pushed into a bounded min-heap, so memory is
+    O(top_k + chunk_size) whatever the proteome size. Ties keep the human
+    listed first.
+
+    Returns:
+        DataFrame of the top_k human proteins ranked by interaction probability
+    """
+    if top_k < 1:
+        raise ValueError(f"top_k must be at least 1, got {top_k}")
+    if model is None:
+        model, feature_cols = load_model()
+    engine = InferenceEngine.wrap(model, feature_cols)
+
+    viral_seq, viral_label = resolve_sequence(viral_id_or_seq, "viral")
+    viral_block = protein_features([viral_seq], engine.viral_names + ["len"])
+    len_col = PROTEIN_NAMES.index("len")
+    if viral_block[0, len_col] < 5:
+        raise ValueError(f"Viral sequence too short after cleaning ({int(viral_block[0, len_col])})")
+    viral_block = engine.extend(viral_block, [viral_seq])
+
+    human_ids, human_blocks = load_human_features(human_csv, cache_dir)
+    human_seqs = pd.read_csv(human_csv)["sequence"].to_numpy() if engine.kmers else None
+
+    # min-heap of (probability, -position, human id): the root is the weakest hit kept
+    heap = []
+    for start in range(0, len(human_ids), chunk_size):
+        H = np.asarray(human_blocks[start:start + chunk_size])
+        ok = H[:, len_col] >= 5
+        H = H[ok] if engine.kmers is None else engine.extend(H[ok], human_seqs[start:start + chunk_size][ok])
+        if H.shape[0] == 0:
+            continue
+        probs = engine.predict(engine.pair_matrix(viral_block, H))
+        pos = start + np.flatnonzero(ok)
+        ids = human_ids[start:start + chunk_size][ok]
+
+        # only this chunk's own top_k can enter the heap
+        cand = np.argpartition(-probs, top_k - 1)[:top_k] if len(probs) > top_k else np.arange(len(probs))
+        for i in cand:
+            item = (float(probs[i]), -int(pos[i]), ids[i])
+            if len(heap) < top_k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+    top = sorted(heap, reverse=True)
+    top_probs = np.array([p for p, _, _ in top], dtype=float)
+    results_df = pd.DataFrame({
+        "rank": np.arange(1, len(top) + 1),
+        "viral_protein": viral_label,
+        "human_protein": [h for _, _, h in top],
+        "interaction_probability": np.round(top_probs, 4),
+        "prediction": np.where(top_probs >= 0.5, "INTERACTING", "NON-INTERACTING")
+    })
+    if output_csv:
+        results_df.to_csv(output_csv, index=False)
+        print(f"Saved top {len(results_df)} → {output_csv}")
+    return results_df
+
 # -------------------------
 # Batch predict
 # -------------------------
-def batch_predict(pairs_csv, output_csv=None):
+def _resolve_blocks(inputs, kind, names=None):
     """
-    Batch predict from a CSV with columns: viral_uniprot, human_uniprot
+    Resolve unique IDs/sequences once and compute their feature blocks
+    (only the features in names, plus the length, when names is given).
+
+    Returns:
+        (labels, sequences, feature blocks, error message or None) per unique input
     """
-    model, feature_cols = load_model()
-    pairs = pd.read_csv(pairs_csv)
-    
-    results = []
-    for _, row in pairs.iterrows():
+    labels, seqs, errors = [], [], []
+    for x in inputs:
         try:
-            result = predict_interaction(
-                row["viral_uniprot"], row["human_uniprot"],
-                model=model, feature_cols=feature_cols
-            )
-            results.append(result)
+            seq, label = resolve_sequence(str(x), kind)
+            labels.append(label)
+            seqs.append(seq)
+            errors.append(None)
         except Exception as e:
-            results.append({
-                "viral_protein": row["viral_uniprot"],
-                "human_protein": row["human_uniprot"],
-                "interaction_probability": None,
-                "prediction": f"ERROR: {e}",
-                "viral_seq_length": 0,
-                "human_seq_length": 0
-            })
-    
-    results_df = pd.DataFrame(results)
+            labels.append(str(x))
+            seqs.append("")
+            errors.append(str(e))
+    return labels, seqs, protein_features(seqs, None if names is None else list(names) + ["len"]), errors
+
+def batch_predict(pairs_csv, output_csv=None, model=None, feature_cols=None, chunk_size=10000):
+    """
+    Batch predict from a CSV with columns: viral_uniprot, human_uniprot
+
+    Each distinct viral and human input is resolved and featurized once; the
+    pair matrix is gathered from those blocks and scored in chunks of
+    chunk_size rows. Rows whose sequences cannot be fetched or are too short
+    are reported with an ERROR prediction.
+    """
+    if model is None:
+        model, feature_cols = load_model()
+    engine = InferenceEngine.wrap(model, feature_cols)
+    pairs = pd.read_csv(pairs_csv)
+
+    v_codes, v_unique = pd.factorize(pairs["viral_uniprot"].astype(str))
+    h_codes, h_unique = pd.factorize(pairs["human_uniprot"].astype(str))
+    v_labels, v_seqs, v_blocks, v_errors = _resolve_blocks(v_unique, "viral", engine.viral_names)
+    h_labels, h_seqs, h_blocks, h_errors = _resolve_blocks(h_unique, "human", engine.human_names)
+
+    len_col = PROTEIN_NAMES.index("len")
+    v_len = v_blocks[v_codes, len_col].astype(int)
+    h_len = h_blocks[h_codes, len_col].astype(int)
+
+    errors = []
+    for vi, hi, vl, hl in zip(v_codes, h_codes, v_len, h_len):
+        e = v_errors[vi] or h_errors[hi]
+        if e is None and (vl < 5 or hl < 5):
+            e = f"Sequences too short after cleaning (viral: {vl}, human: {hl})"
+        errors.append(e)
+    ok = np.array([e is None for e in errors], dtype=bool)
+
+    # k-mer spectra (if the model uses them) are appended once per distinct protein
+    v_blocks, h_blocks = engine.extend(v_blocks, v_seqs), engine.extend(h_blocks, h_seqs)
+    rows = np.flatnonzero(ok)
+    probs = np.full(len(pairs), np.nan)
+    for start in range(0, len(rows), chunk_size):
+        r = rows[start:start + chunk_size]
+        probs[r] = engine.predict(engine.pair_matrix(v_blocks[v_codes[r]], h_blocks[h_codes[r]]))
+
+    results_df = pd.DataFrame({
+        "viral_protein": np.where(ok, np.array(v_labels, dtype=object)[v_codes], pairs["viral_uniprot"]),
+        "human_protein": np.where(ok, np.array(h_labels, dtype=object)[h_codes], pairs["human_uniprot"]),
+        "interaction_probability": [round(float(p), 4) if o else None for p, o in zip(probs, ok)],
+        "prediction": [
+            ("INTERACTING" if p >= 0.5 else "NON-INTERACTING") if o else f"ERROR: {e}"
+            for p, o, e in zip(probs, ok, errors)
+        ],
+        "viral_seq_length": np.where(ok, v_len, 0),
+        "human_seq_length": np.where(ok, h_len, 0)
+    })
     if output_csv:
         results_df.to_csv(output_csv, index=False)
         print(f"Saved predictions → {output_csv}")
@@ -177,17 +292,32 @@ def batch_predict(pairs_csv, output_csv=None):
 # -------------------------
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Predict SARS-CoV-2 × Human PPI")
-    parser.add_argument("--viral", required=True, help="Viral UniProt ID or sequence")
-    parser.add_argument("--human", required=True, help="Human UniProt ID or sequence")
+    parser.add_argument("--viral", help="Viral UniProt ID or sequence")
+    parser.add_argument("--human", help="Human UniProt ID or sequence")
     parser.add_argument("--batch", help="CSV file with viral_uniprot, human_uniprot columns")
-    parser.add_argument("--output", help="Output CSV for batch predictions")
+    parser.add_argument("--screen", action="store_true", help="Score --viral against every protein in human_sequences_clean.csv")
+    parser.add_argument("--top-k", type=int, default=100, help="Number of ranked hits kept by --screen")
+    parser.add_argument("--output", help="Output CSV for batch / screen predictions")
+    parser.add_argument("--offline", action="store_true", help="Only use cached sequences, never call UniProt")
+    parser.add_argument("--fast", action="store_true", help="Use the compact top-K model from `train.py --top-k`")
     args = parser.parse_args()
 
+    if args.offline:
+        get_cache().offline = True
+    model, feature_cols = load_model(fast=args.fast)
+
     if args.batch:
-        results = batch_predict(args.batch, args.output)
+        results = batch_predict(args.batch, args.output, model, feature_cols)
         print(results)
+    elif args.screen:
+        if not args.viral:
+            parser.error("--screen requires --viral")
+        results = screen(args.viral, top_k=args.top_k, output_csv=args.output, model=model, feature_cols=feature_cols)
+        print(results.head(20).to_string(index=False))
     else:
-        result = predict_interaction(args.viral, args.human)
+        if not (args.viral and args.human):
+            parser.error("--viral and --human are required for a single prediction")
+        result = predict_interaction(args.viral, args.human, model, feature_cols)
         print("\n=== PREDICTION RESULT ===")
         for k, v in result.items():
             print(f"  {k}: {v}")
@@ -0,0 +1,74 @@
+"""
+Negative pair sampling for pipeline.py.
+
+Pairs are handled as int64 codes v * n_human + h over the viral and human ID
+lists, so the viral × human cross product is never materialized: random codes
+are drawn in batches and known positives and repeats are rejected. Memory is
+O(positives + negatives) regardless of proteome size.
+"""
+
+import numpy as np
+import pandas as pd
+
+def _sample_codes(rng, total, excluded, n):
+    """Draw up to n distinct codes from range(total) that are not in the sorted array excluded."""
+    available = total - len(excluded)
+    n = min(n, available)
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    # Dense regime: rejection would spin, enumerate the complement instead
+    if n > available // 2:
+        pool = np.setdiff1d(np.arange(total, dtype=np.int64), excluded, assume_unique=True)
+        return rng.choice(pool, size=n, replace=False)
+
+    chosen = np.empty(0, dtype=np.int64)
+    while len(chosen) < n:
+        need = n - len(chosen)
+        draw = rng.integers(0, total, size=int(need * 1.2) + 16, dtype=np.int64)
+        draw = draw[~np.isin(draw, excluded, assume_unique=False)]
+        merged = np.concatenate([chosen, draw])
+        _, first = np.unique(merged, return_index=True)
+        chosen = merged[np.sort(first)]
+    return chosen[:n]
+
+def sample_negatives(viral_ids, human_ids, positive_pairs, n=None, quotas=None, seed=42):
+    """
+    Sample (viral, human) pairs that are not known positives.
+
+    Args:
+        viral_ids, human_ids: candidate protein IDs
+        positive_pairs: iterable of (viral_id, human_id) to exclude
+        n: number of negatives drawn uniformly over all viral × human pairs
+        quotas: alternatively, dict viral_id -> number of negatives for that protein
+        seed: RNG seed
+
+    Returns:
+        DataFrame with columns viral_uniprot, human_uniprot
+    """
+    viral_index = pd.Index(list(viral_ids))
+    human_index = pd.Index(list(human_ids))
+    n_human = len(human_index)
+    rng = np.random.default_rng(seed)
+
+    pos = pd.DataFrame(list(positive_pairs), columns=["v", "h"])
+    v_pos = viral_index.get_indexer(pos["v"]) if len(pos) else np.empty(0, dtype=np.int64)
+    h_pos = human_index.get_indexer(pos["h"]) if len(pos) else np.empty(0, dtype=np.int64)
+    keep = (v_pos >= 0) & (h_pos >= 0)
+    pos_codes = np.unique(v_pos[keep].astype(np.int64) * n_human + h_pos[keep])
+
+    if quotas is None:
+        codes = _sample_codes(rng, len(viral_index) * n_human, pos_codes, int(n or 0))
+    else:
+        parts = []
+        for v, k in quotas.items():
+            i = viral_index.get_loc(v)
+            lo = i * n_human
+            own = pos_codes[(pos_codes >= lo) & (pos_codes < lo + n_human)] - lo
+            parts.append(_sample_codes(rng, n_human, own, int(k)) + lo)
+        codes = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    return pd.DataFrame({
+        "viral_uniprot": viral_index[codes // n_human] if n_human else [],
+        "human_uniprot": human_index[codes % n_human] if n_human else []
+    })
@@ -0,0 +1,167 @@
+"""
+Persistent UniProt sequence cache shared by predict.py and the Flask app.
+
+Sequences are kept in a small in-memory LRU in front of a SQLite file keyed by
+accession (zlib-compressed FASTA), so repeated lookups of the same protein cost
+no network round-trip, across processes as well as within one. The file is
+size-bounded: once the stored bytes exceed max_bytes the least recently used
+entries are evicted. In offline mode the cache never touches the network and a
+miss simply returns None.
+"""
+
+import os
+import time
+import zlib
+import sqlite3
+import threading
+import contextlib
+import requests
+from collections import OrderedDict
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_PATH = os.path.join(BASE_DIR, "data", "cache", "uniprot_sequences.sqlite")
+UNIPROT_URL = "https://rest.uniprot.org/uniprotkb"
+
+def parse_fasta(text, accession):
+    """Return (sequence, protein name) from a single-record UniProt FASTA."""
+    lines = text.splitlines()
+    header = lines[0]
+    seq = "".join(lines[1:])
+    name = header.split("|")[-1].split(" OS=")[0].strip() if "|" in header else accession
+    return seq, name
+
+class SequenceCache:
+    def __init__(self, path=CACHE_PATH, max_bytes=256 * 1024 * 1024, memory_size=4096,
+                 offline=False, base_url=UNIPROT_URL, timeout=20):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory_size = memory_size
+        self.offline = offline
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        # shared by every thread using the cache (Flask request threads, fetch pools)
+        self._session = requests.Session()
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with self._connect() as con:
+                con.execute(
+                    "CREATE TABLE IF NOT EXISTS seq ("
+                    "accession TEXT PRIMARY KEY, fasta BLOB NOT NULL, "
+                    "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+                )
+                con.execute("CREATE INDEX IF NOT EXISTS seq_last_used ON seq (last_used)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """One transaction on a fresh connection, which is closed afterwards."""
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    # -------------------------
+    # Layers
+    # -------------------------
+    def _mem_get(self, acc):
+        with self._lock:
+            if acc in self._mem:
+                self._mem.move_to_end(acc)
+                return self._mem[acc]
+        return None
+
+    def _mem_put(self, acc, value):
+        with self._lock:
+            self._mem[acc] = value
+            self._mem.move_to_end(acc)
+            while len(self._mem) > self.memory_size:
+                self._mem.popitem(last=False)
+
+    def _disk_get(self, acc):
+        if not self.path:
+            return None
+        with self._connect() as con:
+            row = con.execute("SELECT fasta FROM seq WHERE accession = ?", (acc,)).fetchone()
+            if row is None:
+                return None
+            con.execute("UPDATE seq SET last_used = ? WHERE accession = ?", (time.time(), acc))
+        return zlib.decompress(row[0]).decode()
+
+    def _disk_put(self, acc, fasta):
+        if not self.path:
+            return
+        blob = zlib.compress(fasta.encode())
+        with self._connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO seq (accession, fasta, size, last_used) VALUES (?, ?, ?, ?)",
+                (acc, blob, len(blob), time.time())
+            )
+            self._evict(con)
+
+    def _evict(self, con):
+        total = con.execute("SELECT COALESCE(SUM(size), 0) FROM seq").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        doomed, freed = [], 0
+        for acc, size in con.execute("SELECT accession, size FROM seq ORDER BY last_used"):
+            doomed.append((acc,))
+            freed += size
+            if freed >= excess:
+                break
+        con.executemany("DELETE FROM seq WHERE accession = ?", doomed)
+
+    def _download(self, acc):
+        """FASTA text from UniProt, or None (not found, HTTP error or network failure; nothing is cached)."""
+        try:
+            r = self._session.get(f"{self.base_url}/{acc}.fasta", timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"Warning: could not fetch {acc}: {type(e).__name__}: {e}")
+            return None
+        if r.status_code == 200 and r.text.startswith(">"):
+            return r.text
+        return None
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    def get_fasta(self, accession):
+        """Raw FASTA text for an accession, or None if unavailable."""
+        acc = accession.strip()
+        fasta = self._mem_get(acc)
+        if fasta is not None:
+            return fasta
+        fasta = self._disk_get(acc)
+        if fasta is None and not self.offline:
+            fasta = self._download(acc)
+            if fasta is not None:
+                self._disk_put(acc, fasta)
+        if fasta is not None:
+            self._mem_put(acc, fasta)
+        return fasta
+
+    def get(self, accession):
+        """(sequence, protein name) for an accession, or (None, None)."""
+        fasta = self.get_fasta(accession)
+        if fasta is None:
+            return None, None
+        return parse_fasta(fasta, accession.strip())
+
+    def __contains__(self, accession):
+        acc = accession.strip()
+        return self._mem_get(acc) is not None or self._disk_get(acc) is not None
+
+_default = None
+
+def get_cache():
+    """Process-wide cache; PPI_SEQ_CACHE overrides the path, PPI_OFFLINE=1 disables the network."""
+    global _default
+    if _default is None:
+        _default = SequenceCache(
+            path=os.environ.get("PPI_SEQ_CACHE", CACHE_PATH),
+            offline=os.environ.get("PPI_OFFLINE", "0") == "1"
+        )
+    return _default
@@ -0,0 +1,204 @@
+"""
+Minimal stage DAG with on-disk checkpoints, used by pipeline.py.
+
+A stage is a function whose parameters are named after the stages it depends
+on; it receives their results and returns its own. Each stage declares the
+files and parameters it reads and the code it calls beyond its own body
+(module names, hashed from their source files, or helper functions), and its
+key is the SHA-1 of its name, source, code, parameters, input file contents
+and the keys of its dependencies, so a change anywhere upstream gives every
+downstream stage a new key.
+
+Checkpointed stages pickle their result (joblib) to
+<checkpoint_dir>/<stage>/<key>.pkl as soon as they finish. A rerun skips every
+stage whose checkpoint matches (and whose declared output files exist),
+loads the checkpoints that a re-executed stage needs, and runs the rest.
+Independent stages run concurrently on a thread pool.
+"""
+
+import os
+import json
+import inspect
+import hashlib
+import joblib
+import contextlib
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from biogrid import file_hash
+
+def code_hash(obj):
+    """SHA-1 of a module's source file (by name, without importing it) or of a function's source."""
+    if callable(obj):
+        return hashlib.sha1(inspect.getsource(obj).encode()).hexdigest()
+    spec = importlib.util.find_spec(obj)
+    if spec is None or not spec.has_location:
+        raise ValueError(f"Cannot hash the source of module {obj!r}")
+    return file_hash(spec.origin)
+
+class Stage:
+    def __init__(self, fn, files, params, outputs, checkpoint, code):
+        self.fn = fn
+        self.name = fn.__name__
+        self.deps = list(inspect.signature(fn).parameters)
+        self.files = list(files)
+        self.params = params
+        self.outputs = outputs
+        self.checkpoint = checkpoint
+        self.source = inspect.getsource(fn)
+        self.code = {c if isinstance(c, str) else c.__name__: c for c in code}
+
+class StageGraph:
+    def __init__(self, checkpoint_dir, report=None):
+        self.checkpoint_dir = checkpoint_dir
+        self.report = report
+        self.stages = {}
+
+    def stage(self, files=(), params=None, outputs=(), checkpoint=True, code=()):
+        """
+        Register a stage. params is a JSON-able dict, or a callable returning
+        one (evaluated when the run is planned); outputs is a list of files
+        the stage writes, or a callable returning one; code lists the modules
+        (by name) and helper functions the result depends on.
+        """
+        def register(fn):
+            st = Stage(fn, files, params, outputs, checkpoint, code)
+            for c in st.code.values():
+                code_hash(c)    # a misspelt module name fails here, not when the run is planned
+            unknown = [d for d in st.deps if d not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {st.name} depends on unregistered stage(s): {unknown}")
+            self.stages[st.name] = st
+            return fn
+        return register
+
+    # -------------------------
+    # Planning
+    # -------------------------
+    def sinks(self):
+        used = {d for st in self.stages.values() for d in st.deps}
+        return [n for n in self.stages if n not in used]
+
+    def _order(self, targets):
+        """Targets and their transitive dependencies, in registration (= topological) order."""
+        needed, todo = set(), list(targets)
+        while todo:
+            name = todo.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name not in needed:
+                needed.add(name)
+                todo.extend(self.stages[name].deps)
+        return [n for n in self.stages if n in needed]
+
+    def keys(self, order):
+        hashes, keys = {}, {}
+        for name in order:
+            st = self.stages[name]
+            params = st.params() if callable(st.params) else (st.params or {})
+            for p in st.files:
+                if p not in hashes:
+                    hashes[p] = file_hash(p)
+            payload = json.dumps({
+                "stage": name,
+                "source": st.source,
+                "code": {label: code_hash(c) for label, c in st.code.items()},
+                "params": params,
+                "files": {os.path.basename(p): hashes[p] for p in st.files},
+                "deps": {d: keys[d] for d in st.deps},
+            }, sort_keys=True, default=str)
+            keys[name] = hashlib.sha1(payload.encode()).hexdigest()[:16]
+        return keys
+
+    def _path(self, name, key):
+        return os.path.join(self.checkpoint_dir, name, f"{key}.pkl")
+
+    def is_fresh(self, name, key):
+        st = self.stages[name]
+        outputs = st.outputs() if callable(st.outputs) else st.outputs
+        return (st.checkpoint and os.path.exists(self._path(name, key))
+                and all(os.path.exists(p) for p in outputs))
+
+    def status(self, targets=None):
+        """(stage, deps, key, fresh) for every stage the targets need."""
+        order = self._order(targets or self.sinks())
+        keys = self.keys(order)
+        return [(n, self.stages[n].deps, keys[n], self.is_fresh(n, keys[n])) for n in order]
+
+    # -------------------------
+    # Execution
+    # -------------------------
+    def _save(self, name, key, value):
+        path = self._path(name, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump(value, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        # one checkpoint per stage is enough
+        for f in os.listdir(os.path.dirname(path)):
+            if f.endswith(".pkl") and f != os.path.basename(path):
+                os.remove(os.path.join(os.path.dirname(path), f))
+
+    def _timed(self, name, status):
+        if self.report is None:
+            return contextlib.nullcontext()
+        return self.report.stage(name, status=status)
+
+    def _execute(self, name, key, inputs):
+        st = self.stages[name]
+        with self._timed(name, "run"):
+            value = st.fn(**inputs)
+        if st.checkpoint:
+            self._save(name, key, value)
+        return value
+
+    def _load(self, name, key):
+        with self._timed(name, "checkpoint"):
+            return joblib.load(self._path(name, key))
+
+    def run(self, targets=None, force=(), jobs=2):
+        """
+        Bring targets (default: the sink stages) up to date.
+
+        force: stage names (or "all") to re-execute even if their checkpoint
+        matches; their dependents are re-executed too.
+        Returns the names of the stages that were executed.
+        """
+        order = self._order(targets or self.sinks())
+        keys = self.keys(order)
+
+        forced = set(order) if "all" in force else set()
+        for name in order:
+            st = self.stages[name]
+            if name in force or any(d in forced for d in st.deps):
+                forced.add(name)
+
+        # walk back from the targets: a stage that has to run needs its inputs
+        active = set(targets or self.sinks())
+        to_run = set()
+        for name in reversed(order):
+            if name in active and (name in forced or not self.is_fresh(name, keys[name])):
+                to_run.add(name)
+                active.update(self.stages[name].deps)
+        needed = {d for n in to_run for d in self.stages[n].deps}
+        to_load = [n for n in order if n in needed and n not in to_run]
+        for name in order:
+            state = "run" if name in to_run else ("checkpoint" if name in to_load else "up to date")
+            print(f"  [{state:>10}] {name}")
+
+        results = {n: self._load(n, keys[n]) for n in to_load}
+        pending = [n for n in order if n in to_run]
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            while pending or running:
+                for name in list(pending):
+                    if len(running) >= max(1, jobs):
+                        break
+                    if all(d in results for d in self.stages[name].deps):
+                        pending.remove(name)
+                        inputs = {d: results[d] for d in self.stages[name].deps}
+                        running[pool.submit(self._execute, name, keys[name], inputs)] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name = running.pop(fut)
+                    results[name] = fut.result()
+        return [n for n in order if n in to_run]
@@ -1,10 +1,18 @@
 import pandas as pd
 import numpy as np
 import os
+import time
 import joblib
+import argparse
+import scipy.sparse as sp
 import matplotlib.pyplot as plt
 
 from xgboost import XGBClassifier
+from cv import load_tuned, sklearn_params
+from dataset import load_dataset
+from engine import InferenceEngine, mark_kmers, mark_sparse
+from kmers import load_config
+from instrument import RunReport
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import (
     roc_auc_score,
@@ -19,6 +27,13 @@ from sklearn.metrics import (
     PrecisionRecallDisplay
 )
 
+parser = argparse.ArgumentParser(description="Train the XGBoost PPI model")
+parser.add_argument("--top-k", type=int, default=0,
+                    help="Also train a compact model on the K most important features (0 = off)")
+parser.add_argument("--tuned", action="store_true",
+                    help="Use the configuration found by tune.py (models/tuned_params.json)")
+args = parser.parse_args()
+
 print("\n=== XGBOOST TRAINING WITH FULL EVALUATION ===\n")
 
 # -------------------------
@@ -28,32 +43,41 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATASET = os.path.join(BASE_DIR, "data", "processed", "final_ppi_dataset.csv")
 MODEL_DIR = os.path.join(BASE_DIR, "models")
 RESULTS_DIR = os.path.join(BASE_DIR, "results")
+HUMAN_SEQS = os.path.join(BASE_DIR, "data", "processed", "human_sequences_clean.csv")
+
+run = RunReport("train")
 
 # -------------------------
 # Load dataset
 # -------------------------
-df = pd.read_csv(DATASET)
-
-id_cols = ["viral_uniprot", "human_uniprot", "label"]
-feature_cols = [c for c in df.columns if c not in id_cols]
+with run.stage("load"):
+    ids, X, feature_cols = load_dataset(DATASET)
 
-X = df[feature_cols]
-y = df["label"]
+    # a sparse build stays CSR (zeros are missing values to XGBoost); dense goes through a DataFrame
+    sparse = sp.issparse(X)
+    if not sparse:
+        X = pd.DataFrame(X, columns=feature_cols)
+    y = ids["label"]
+    # k-mer spectra the dataset was built with (pipeline.py --kmers), recorded in the saved models
+    kmer_config = load_config(DATASET)
 
 print("Total samples :", X.shape[0])
 print("Total features:", X.shape[1])
 print("Positive ratio:", y.mean())
+if sparse:
+    print(f"Sparse matrix : {X.nnz / (X.shape[0] * X.shape[1]):.1%} non-zero")
 
 # -------------------------
 # Train / Test split
 # -------------------------
-X_train, X_test, y_train, y_test = train_test_split(
-    X,
-    y,
-    test_size=0.2,
-    stratify=y,
-    random_state=42
-)
+with run.stage("split"):
+    X_train, X_test, y_train, y_test = train_test_split(
+        X,
+        y,
+        test_size=0.2,
+        stratify=y,
+        random_state=42
+    )
 
 print("\nTrain samples:", X_train.shape[0])
 print("Test samples :", X_test.shape[0])
@@ -73,28 +97,31 @@ model = XGBClassifier(
     random_state=42,
     n_jobs=-1
 )
+if args.tuned:
+    params, n_rounds = load_tuned()
+    model = XGBClassifier(n_estimators=n_rounds, n_jobs=-1, **sklearn_params(params))
+    print(f"\nUsing tuned configuration: {n_rounds} rounds, {params}")
 
 # -------------------------
 # Training
 # -------------------------
 print("\nTraining XGBoost...")
-model.fit(X_train, y_train)
+with run.stage("fit"):
+    model.fit(X_train, y_train)
 
 # -------------------------
-# Predictions
+# Predictions + metrics
 # -------------------------
-y_prob = model.predict_proba(X_test)[:, 1]
-y_pred = (y_prob >= 0.5).astype(int)
+with run.stage("evaluate"):
+    y_prob = model.predict_proba(X_test)[:, 1]
+    y_pred = (y_prob >= 0.5).astype(int)
 
-# -------------------------
-# Metrics
-# -------------------------
-roc_auc = roc_auc_score(y_test, y_prob)
-pr_auc  = average_precision_score(y_test, y_prob)
-acc     = accuracy_score(y_test, y_pred)
-prec    = precision_score(y_test, y_pred)
-rec     = recall_score(y_test, y_pred)
-f1      = f1_score(y_test, y_pred)
+    roc_auc = roc_auc_score(y_test, y_prob)
+    pr_auc  = average_precision_score(y_test, y_prob)
+    acc     = accuracy_score(y_test, y_pred)
+    prec    = precision_score(y_test, y_pred)
+    rec     = recall_score(y_test, y_pred)
+    f1      = f1_score(y_test, y_pred)
 
 print("\n=== EVALUATION METRICS ===")
 print(f"ROC-AUC      : {roc_auc:.4f}")
@@ -148,12 +175,93 @@ plt.show()
 # -------------------------
 # Save model & features
 # -------------------------
-model.get_booster().save_model(os.path.join(MODEL_DIR, "ppi_xgboost_model.json"))
-joblib.dump(feature_cols, os.path.join(MODEL_DIR, "feature_columns.pkl"))
-imp_df.to_csv(os.path.join(RESULTS_DIR, "feature_importance_full.csv"), index=False)
+def columns(X, cols):
+    """Columns of the DataFrame / CSR feature matrix, by name."""
+    if sparse:
+        pos = {c: i for i, c in enumerate(feature_cols)}
+        return X[:, [pos[c] for c in cols]]
+    return X[cols]
+
+def tag_booster(m, cols):
+    """Record how the model's input was built (CSR, k-mer spectra) in its booster, for InferenceEngine."""
+    booster = m.get_booster()
+    if sparse:
+        mark_sparse(booster, cols)
+    if kmer_config:
+        mark_kmers(booster, kmer_config)
+    return booster
+
+with run.stage("save"):
+    tag_booster(model, feature_cols).save_model(os.path.join(MODEL_DIR, "ppi_xgboost_model.json"))
+    joblib.dump(feature_cols, os.path.join(MODEL_DIR, "feature_columns.pkl"))
+    imp_df.to_csv(os.path.join(RESULTS_DIR, "feature_importance_full.csv"), index=False)
 
 print("\nSaved files:")
 print(" → models/ppi_xgboost_model.json")
 print(" → models/feature_columns.pkl")
 print(" → results/feature_importance_full.csv")
+
+# -------------------------
+# Compact top-K model
+# -------------------------
+def model_report(name, m, cols, seq_pairs):
+    """Test metrics, size and latency of a model scored through InferenceEngine."""
+    engine = InferenceEngine.wrap(m, cols)
+    X_eval = columns(X_test, cols)
+    X_eval = X_eval.astype(np.float32) if sparse else np.ascontiguousarray(X_eval.to_numpy(dtype=np.float32))
+    start = time.perf_counter()
+    prob = engine.predict(X_eval)
+    batch_s = time.perf_counter() - start
+
+    report = {
+        "model": name,
+        "n_features": len(cols),
+        "roc_auc": roc_auc_score(y_test, prob),
+        "pr_auc": average_precision_score(y_test, prob),
+        "accuracy": accuracy_score(y_test, (prob >= 0.5).astype(int)),
+        "model_size_kb": len(engine.booster.save_raw("json")) / 1024,
+        "batch_us_per_row": batch_s / X_eval.shape[0] * 1e6,
+        "pair_ms": None,
+    }
+    # single pair, sequences → features → probability
+    if seq_pairs:
+        start = time.perf_counter()
+        for v, h in seq_pairs:
+            engine.predict_pair(v, h)
+        report["pair_ms"] = (time.perf_counter() - start) / len(seq_pairs) * 1e3
+    return report
+
+if args.top_k:
+    top = set(imp_df["feature"].head(args.top_k))
+    top_cols = [c for c in feature_cols if c in top]  # keep the full model's column order
+
+    print(f"\nTraining compact model on top {len(top_cols)} features...")
+    fast_model = XGBClassifier(**model.get_params())
+    with run.stage("fit_fast"):
+        fast_model.fit(columns(X_train, top_cols), y_train)
+    tag_booster(fast_model, top_cols)
+
+    seq_pairs = []
+    if os.path.exists(HUMAN_SEQS):
+        seqs = pd.read_csv(HUMAN_SEQS)["sequence"].sample(n=200, replace=True, random_state=42).tolist()
+        seq_pairs = list(zip(seqs[::2], seqs[1::2]))
+
+    with run.stage("compare_fast"):
+        comparison = pd.DataFrame([
+            model_report("full", model, feature_cols, seq_pairs),
+            model_report(f"top{len(top_cols)}", fast_model, top_cols, seq_pairs),
+        ])
+
+    print("\n=== FULL vs COMPACT MODEL ===")
+    print(comparison.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+    fast_model.get_booster().save_model(os.path.join(MODEL_DIR, "ppi_xgboost_fast.json"))
+    joblib.dump(top_cols, os.path.join(MODEL_DIR, "feature_columns_fast.pkl"))
+    comparison.to_csv(os.path.join(RESULTS_DIR, "fast_model_comparison.csv"), index=False)
+    print(" → models/ppi_xgboost_fast.json")
+    print(" → models/feature_columns_fast.pkl")
+    print(" → results/fast_model_comparison.csv")
+
+run.save(os.path.join(RESULTS_DIR, "train_run_report.json"))
+
 print("\n=== DONE ===")
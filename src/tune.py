@@ -0,0 +1,161 @@
+"""
+Hyperparameter search on viral-grouped folds.
+
+Candidate configurations (the current PARAMS first, then random draws from
+SEARCH_SPACE) are evaluated on the same grouped folds. Within a fold the
+model trains until the AUC on a held-out set of viral proteins stops
+improving, so the number of trees is learned rather than fixed. After
+--prune-after folds a trial whose running mean ROC-AUC is below the median of
+the trials that reached the same fold is stopped. Trials run concurrently
+under one core budget (parallel trials × threads per trial <= cores).
+
+Writes models/tuned_params.json (best params + number of rounds, read by
+`train.py --tuned` / `eval_viral_cv.py --tuned`) and
+results/tuning_trials.csv (every trial with its scores and timings).
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from cv import PARAMS, N_ROUNDS, TUNED_PARAMS_PATH, core_budget, fit_early_stopping, grouped_folds, validation_split
+from dataset import dataset_hash, load_dataset
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET = os.path.join(BASE_DIR, "data", "processed", "final_ppi_dataset.csv")
+TRIALS_PATH = os.path.join(BASE_DIR, "results", "tuning_trials.csv")
+
+SEARCH_SPACE = {
+    "max_depth": [4, 6, 8, 10],
+    "eta": [0.02, 0.05, 0.1, 0.2],
+    "subsample": [0.6, 0.7, 0.8, 0.9, 1.0],
+    "colsample_bytree": [0.4, 0.6, 0.8, 1.0],
+    "min_child_weight": [1, 2, 5, 10],
+    "reg_lambda": [0.5, 1.0, 2.0, 5.0],
+}
+
+def sample_configs(n, seed=42):
+    """The current PARAMS, then n - 1 random draws from SEARCH_SPACE (no repeats)."""
+    rng = np.random.default_rng(seed)
+    configs = [{k: PARAMS.get(k, 1.0) for k in SEARCH_SPACE}]
+    tries = 0
+    while len(configs) < n and tries < 100 * n:
+        c = {k: v[rng.integers(len(v))] for k, v in SEARCH_SPACE.items()}
+        c = {k: v.item() if hasattr(v, "item") else v for k, v in c.items()}
+        if c not in configs:
+            configs.append(c)
+        tries += 1
+    return configs
+
+class MedianPruner:
+    """Stop a trial whose running mean at a fold is below the median of earlier trials at that fold."""
+
+    def __init__(self, prune_after=2, min_trials=3):
+        self.prune_after = prune_after
+        self.min_trials = min_trials
+        self.history = {}
+        self._lock = threading.Lock()
+
+    def should_prune(self, step, value):
+        with self._lock:
+            seen = self.history.setdefault(step, [])
+            prune = step >= self.prune_after and len(seen) >= self.min_trials and value < np.median(seen)
+            seen.append(value)
+        return prune
+
+def run_trial(trial, config, X, y, folds, splits, pruner, args, nthread):
+    params = {**PARAMS, **config}
+    start = time.perf_counter()
+    scores, iterations, fold_seconds = [], [], []
+    status = "complete"
+    for step, ((name, _, test_rows), (train_rows, valid_rows)) in enumerate(zip(folds, splits), start=1):
+        r = fit_early_stopping(X, y, train_rows, valid_rows, test_rows, params,
+                               args.max_rounds, args.early_stopping, nthread)
+        scores.append((r["roc_auc"], r["pr_auc"]))
+        iterations.append(r["best_iteration"] + 1)
+        fold_seconds.append(round(r["seconds"], 3))
+        if step < len(folds) and pruner.should_prune(step, np.mean([s[0] for s in scores])):
+            status = "pruned"
+            break
+    return {
+        "trial": trial,
+        **config,
+        "status": status,
+        "folds_run": len(scores),
+        "roc_auc": float(np.mean([s[0] for s in scores])),
+        "pr_auc": float(np.mean([s[1] for s in scores])),
+        "n_rounds": int(np.median(iterations)),
+        "rounds_per_fold": iterations,
+        "seconds_per_fold": fold_seconds,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grouped hyperparameter search with early stopping")
+    parser.add_argument("--trials", type=int, default=20, help="Configurations to evaluate (the first is the current PARAMS)")
+    parser.add_argument("--folds", type=int, default=5, help="Viral-grouped folds per trial")
+    parser.add_argument("--cores", type=int, default=None, help="Total core budget (default: all cores)")
+    parser.add_argument("--parallel-trials", type=int, default=None, help="Trials run concurrently (default: as many as cores allow)")
+    parser.add_argument("--max-rounds", type=int, default=2000, help="Upper bound on boosting rounds")
+    parser.add_argument("--early-stopping", type=int, default=50, help="Rounds without validation AUC improvement before stopping")
+    parser.add_argument("--prune-after", type=int, default=2, help="Folds a trial runs before it can be pruned")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print("\n=== GROUPED HYPERPARAMETER SEARCH ===\n")
+
+    ids, X, feature_cols = load_dataset(DATASET)
+    y = ids["label"].to_numpy()
+    viral = ids["viral_uniprot"].to_numpy()
+
+    folds = grouped_folds(viral, y, n_folds=args.folds, seed=args.seed)
+    splits = [validation_split(viral, y, train_rows, seed=args.seed + i) for i, (_, train_rows, _) in enumerate(folds)]
+    configs = sample_configs(args.trials, seed=args.seed)
+
+    parallel, nthread = core_budget(len(configs), args.cores, args.parallel_trials)
+    print(f"Samples: {X.shape[0]} | viral proteins: {len(np.unique(viral))} | folds: {len(folds)}")
+    print(f"Running {len(configs)} trials: {parallel} in parallel × {nthread} threads\n")
+
+    pruner = MedianPruner(prune_after=args.prune_after)
+    trials = []
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        futures = [pool.submit(run_trial, i, c, X, y, folds, splits, pruner, args, nthread) for i, c in enumerate(configs)]
+        for fut in as_completed(futures):
+            t = fut.result()
+            trials.append(t)
+            print(f"--- trial {t['trial']:>3} {t['status']:<8} ROC-AUC {t['roc_auc']:.4f} | PR-AUC {t['pr_auc']:.4f} "
+                  f"| rounds {t['n_rounds']:>4} | {t['folds_run']} folds in {t['seconds']:.1f}s")
+
+    trials_df = pd.DataFrame(sorted(trials, key=lambda t: t["trial"]))
+    os.makedirs(os.path.dirname(TRIALS_PATH), exist_ok=True)
+    trials_df.to_csv(TRIALS_PATH, index=False)
+
+    complete = trials_df[trials_df["status"] == "complete"]
+    best = complete.loc[complete["roc_auc"].idxmax()]
+    baseline = trials_df.iloc[0]
+    tuned = {
+        "params": {k: best[k].item() if hasattr(best[k], "item") else best[k] for k in SEARCH_SPACE},
+        "n_rounds": int(best["n_rounds"]),
+        "roc_auc": float(best["roc_auc"]),
+        "pr_auc": float(best["pr_auc"]),
+        "trial": int(best["trial"]),
+        "folds": len(folds),
+        "early_stopping": args.early_stopping,
+        "dataset": dataset_hash(ids, X),
+    }
+    with open(TUNED_PARAMS_PATH, "w") as f:
+        json.dump(tuned, f, indent=2)
+
+    print("\n=== BEST CONFIGURATION ===")
+    for k, v in tuned["params"].items():
+        print(f"  {k}: {v}")
+    print(f"  n_rounds: {tuned['n_rounds']} (fixed setting: {N_ROUNDS})")
+    print(f"ROC-AUC {tuned['roc_auc']:.4f} vs current params {baseline['roc_auc']:.4f} ({baseline['status']})")
+    print(f"Pruned trials: {(trials_df['status'] == 'pruned').sum()} / {len(trials_df)}")
+    print(f"\nSaved → {os.path.relpath(TUNED_PARAMS_PATH, BASE_DIR)}")
+    print(f"Saved → {os.path.relpath(TRIALS_PATH, BASE_DIR)}")
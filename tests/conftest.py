@@ -0,0 +1,117 @@
+import os
+import sys
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+# -------------------------
+# Local UniProt stand-in
+# -------------------------
+class FakeUniProt:
+    """
+    Serves GET /<accession>.fasta from scripted responses.
+
+    routes[acc] is a list of (status, body) pairs returned in turn (the last
+    one repeats); unknown accessions get a 404. hits counts requests per
+    accession.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.hits = defaultdict(int)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                acc = self.path.strip("/").removesuffix(".fasta")
+                with server._lock:
+                    n = server.hits[acc]
+                    server.hits[acc] += 1
+                responses = server.routes.get(acc, [(404, "Not found")])
+                status, body = responses[min(n, len(responses) - 1)]
+                data = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def fasta(self, acc, seq, name="Test protein"):
+        """A FASTA record as UniProt formats it."""
+        return f">sp|{acc}|TEST_HUMAN {name} OS=Homo sapiens\n{seq[:60]}\n{seq[60:]}\n"
+
+    @property
+    def total_hits(self):
+        return sum(self.hits.values())
+
+@pytest.fixture
+def uniprot():
+    server = FakeUniProt()
+    thread = threading.Thread(target=server.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+@pytest.fixture
+def dead_url():
+    """A URL nothing listens on (connection refused)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.server_close()
+    return url
+
+# -------------------------
+# Synthetic sequences and a small model
+# -------------------------
+def random_seqs(n, low, high, seed):
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("ACDEFGHIKLMNPQRSTVWY"))
+    return ["".join(rng.choice(letters, size=rng.integers(low, high + 1))) for _ in range(n)]
+
+@pytest.fixture(scope="session")
+def tiny_model():
+    """(XGBClassifier, feature_cols) trained on random pairs in the 850-column layout."""
+    from xgboost import XGBClassifier
+    from features import FEATURE_COLUMNS, pair_features
+
+    viral, human = random_seqs(200, 30, 400, seed=10), random_seqs(200, 30, 400, seed=11)
+    X = pair_features(viral, human)
+    # a label the features can explain: hydrophobic, aromatic-rich human partners
+    y = (X[:, FEATURE_COLUMNS.index("h_gravy")] + X[:, FEATURE_COLUMNS.index("v_arom")] * 5 > 0).astype(int)
+    model = XGBClassifier(n_estimators=20, max_depth=3, n_jobs=1, random_state=0)
+    model.fit(X, y)
+    return model, list(FEATURE_COLUMNS)
+
+@pytest.fixture
+def human_csv(tmp_path):
+    """A small human_sequences_clean.csv: 300 proteins, two of them too short to score."""
+    seqs = random_seqs(300, 20, 600, seed=12)
+    seqs[5], seqs[17] = "MKV", "XXXXXXXX"
+    path = tmp_path / "human_sequences_clean.csv"
+    pd.DataFrame({"uniprot": [f"Q{i:05d}" for i in range(len(seqs))], "sequence": seqs}).to_csv(path, index=False)
+    return str(path)
+
+# -------------------------
+# Flask app
+# -------------------------
+@pytest.fixture(scope="session")
+def webapp():
+    """The app/app.py module (imported with app/ on sys.path)."""
+    sys.path.insert(0, os.path.join(ROOT, "app"))
+    import app
+    return app
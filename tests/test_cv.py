@@ -0,0 +1,149 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from sklearn.metrics import average_precision_score, roc_auc_score
+from xgboost import XGBClassifier
+
+from cv import PARAMS, FoldCache, fold_key, leave_one_group_out, run_folds, sklearn_params
+from dataset import dataset_hash
+
+N_ROUNDS = 15
+
+@pytest.fixture(scope="module")
+def data():
+    """Synthetic grouped data: 6 'viral proteins', 40 features, a learnable label."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 40)).astype(np.float32)
+    X[rng.random(X.shape) < 0.3] = 0.0
+    y = (X[:, 0] + 0.5 * X[:, 1] - X[:, 2] + rng.normal(scale=0.5, size=600) > 0).astype(int)
+    groups = np.repeat([f"V{i}" for i in range(6)], 100)
+    folds = [(g, tr, te) for g, tr, te in leave_one_group_out(groups, y) if te is not None]
+    return X, y, groups, folds
+
+def sklearn_fold(X, y, train_rows, test_rows):
+    """The original per-fold model: XGBClassifier.fit on the training rows."""
+    model = XGBClassifier(n_estimators=N_ROUNDS, n_jobs=1, **sklearn_params(PARAMS))
+    model.fit(X[train_rows], y[train_rows])
+    return model.predict_proba(X[test_rows])[:, 1]
+
+def test_leave_one_group_out_skips_single_class_groups():
+    y = np.array([0, 1, 0, 1, 1, 1])
+    groups = np.array(["a", "a", "b", "b", "c", "c"])
+    folds = list(leave_one_group_out(groups, y))
+    assert [g for g, _, te in folds if te is None] == ["c"]
+    for g, tr, te in folds:
+        if te is not None:
+            assert set(groups[te]) == {g} and g not in set(groups[tr])
+
+@pytest.mark.parametrize("parallel_folds", [1, 3])
+def test_per_fold_bins_reproduce_xgbclassifier(data, parallel_folds):
+    X, y, _, folds = data
+    results = run_folds(X, y, folds, cores=3, parallel_folds=parallel_folds, n_rounds=N_ROUNDS)
+    assert set(results) == {g for g, _, _ in folds}
+    for g, tr, te in folds:
+        expected = sklearn_fold(X, y, tr, te)
+        r = results[g]
+        np.testing.assert_allclose(r["y_prob"], expected, rtol=1e-6, atol=1e-7)
+        assert r["roc_auc"] == pytest.approx(roc_auc_score(y[te], expected))
+        assert r["pr_auc"] == pytest.approx(average_precision_score(y[te], expected))
+        assert r["n_test_samples"] == len(te)
+
+def test_csr_folds_treat_absent_entries_as_missing(data):
+    X, y, _, folds = data
+    X_nan = np.where(X == 0, np.nan, X).astype(np.float32)
+    dense = run_folds(X_nan, y, folds[:2], cores=1, n_rounds=N_ROUNDS)
+    sparse = run_folds(sp.csr_matrix(X), y, folds[:2], cores=1, n_rounds=N_ROUNDS)
+    for g, _, _ in folds[:2]:
+        np.testing.assert_allclose(sparse[g]["y_prob"], dense[g]["y_prob"], rtol=1e-6)
+
+def test_shared_bins_run_and_stay_close(data):
+    X, y, _, folds = data
+    own = run_folds(X, y, folds, cores=2, n_rounds=N_ROUNDS)
+    shared = run_folds(X, y, folds, cores=2, shared=True, n_rounds=N_ROUNDS)
+    for g, _, _ in folds:
+        assert abs(shared[g]["roc_auc"] - own[g]["roc_auc"]) < 0.1
+
+def test_on_result_called_once_per_fold(data):
+    X, y, _, folds = data
+    seen = []
+    run_folds(X, y, folds, cores=2, n_rounds=5, on_result=lambda g, r: seen.append(g))
+    assert sorted(seen) == sorted(g for g, _, _ in folds)
+
+# -------------------------
+# Fold cache
+# -------------------------
+def fold_ids(groups, y):
+    return pd.DataFrame({"viral_uniprot": groups, "human_uniprot": [f"H{i}" for i in range(len(y))], "label": y})
+
+def test_fold_key_changes_with_every_input(data):
+    X, y, groups, _ = data
+    ids = fold_ids(groups, y)
+    cols = [f"f{i}" for i in range(X.shape[1])]
+    h = dataset_hash(ids, X)
+    base = fold_key(h, "V0", cols, PARAMS, N_ROUNDS, False)
+    assert base == fold_key(h, "V0", list(cols), dict(PARAMS), N_ROUNDS, False)
+
+    X2 = X.copy()
+    X2[5, 3] += 1.0
+    ids2 = ids.copy()
+    ids2.loc[7, "label"] = 1 - ids2.loc[7, "label"]
+    variants = [
+        fold_key(dataset_hash(ids, X2), "V0", cols, PARAMS, N_ROUNDS, False),         # one feature value
+        fold_key(dataset_hash(ids2, X), "V0", cols, PARAMS, N_ROUNDS, False),         # one label
+        fold_key(dataset_hash(ids, sp.csr_matrix(X)), "V0", cols, PARAMS, N_ROUNDS, False),  # CSR
+        fold_key(h, "V1", cols, PARAMS, N_ROUNDS, False),
+        fold_key(h, "V0", cols[::-1], PARAMS, N_ROUNDS, False),
+        fold_key(h, "V0", cols, {**PARAMS, "max_depth": 6}, N_ROUNDS, False),
+        fold_key(h, "V0", cols, {**PARAMS, "eta": 0.1}, N_ROUNDS, False),
+        fold_key(h, "V0", cols, PARAMS, N_ROUNDS + 1, False),
+        fold_key(h, "V0", cols, PARAMS, N_ROUNDS, True),
+    ]
+    assert base not in variants
+    assert len(set(variants)) == len(variants)
+
+def test_fold_cache_round_trip_and_partial_entries(tmp_path):
+    cache = FoldCache(str(tmp_path / "cv_cache"))
+    assert cache.get("k1") is None
+    result = {"n_test_samples": 3, "roc_auc": 0.75, "pr_auc": 0.5, "seconds": 1.2, "y_prob": np.array([0.1, 0.9, 0.4])}
+    oof = pd.DataFrame({"viral_uniprot": "V0", "human_uniprot": ["a", "b", "c"], "label": [0, 1, 0], "y_prob": result["y_prob"]})
+    cache.put("k1", result, oof)
+
+    got = cache.get("k1")
+    assert {k: got[k] for k in ("n_test_samples", "roc_auc", "pr_auc", "seconds")} == \
+        {"n_test_samples": 3, "roc_auc": 0.75, "pr_auc": 0.5, "seconds": 1.2}
+    assert "y_prob" not in got
+    pd.testing.assert_frame_equal(got["oof"], oof)
+
+    # a fold interrupted between its two files is not a hit
+    os.remove(os.path.join(cache.cache_dir, "k1.json"))
+    assert cache.get("k1") is None
+
+def test_interrupted_run_resumes_from_cache(data, tmp_path):
+    X, y, groups, folds = data
+    ids = fold_ids(groups, y)
+    cols = [f"f{i}" for i in range(X.shape[1])]
+    h = dataset_hash(ids, X)
+    keys = {g: fold_key(h, g, cols, PARAMS, N_ROUNDS, False) for g, _, _ in folds}
+    cache = FoldCache(str(tmp_path / "cv_cache"))
+
+    def store(g, r):
+        te = dict((f[0], f[2]) for f in folds)[g]
+        cache.put(keys[g], r, pd.DataFrame({"viral_uniprot": g, "label": y[te], "y_prob": r["y_prob"]}))
+
+    # first run stops after three folds
+    first = run_folds(X, y, folds[:3], cores=1, n_rounds=N_ROUNDS, on_result=store)
+
+    cached = {g: cache.get(keys[g]) for g, _, _ in folds}
+    todo = [f for f in folds if cached[f[0]] is None]
+    assert [g for g, _, _ in todo] == [g for g, _, _ in folds[3:]]
+    second = run_folds(X, y, todo, cores=1, n_rounds=N_ROUNDS, on_result=store)
+
+    full = run_folds(X, y, folds, cores=1, n_rounds=N_ROUNDS)
+    for g, _, _ in folds:
+        r = cache.get(keys[g])
+        assert r["roc_auc"] == pytest.approx(full[g]["roc_auc"])
+        np.testing.assert_allclose(r["oof"]["y_prob"], full[g]["y_prob"], rtol=1e-6)
+    assert set(first) | set(second) == set(full)
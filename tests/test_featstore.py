@@ -0,0 +1,50 @@
+import importlib
+import os
+
+import numpy as np
+
+import features
+import featstore
+from conftest import random_seqs
+from featstore import FeatureStore
+from features import protein_features
+
+SEQS = random_seqs(20, 30, 300, seed=40)
+
+def test_blocks_match_protein_features_and_persist(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    X = store.features(SEQS + SEQS[:5])
+    np.testing.assert_array_equal(X, protein_features(SEQS + SEQS[:5]))
+    assert (store.computed, store.reused) == (20, 0)
+    store.save()
+
+    again = FeatureStore(str(tmp_path))
+    np.testing.assert_array_equal(again.features(SEQS[::-1]), X[:20][::-1])
+    assert (again.computed, again.reused) == (0, 20)
+
+def test_keyed_by_cleaned_sequence(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    store.features([SEQS[0]])
+    X = store.features([SEQS[0].lower(), SEQS[0][:10] + "X-" + SEQS[0][10:]])
+    # both spellings clean to the stored sequence: one distinct hit, no new block
+    assert (store.computed, store.reused) == (1, 1)
+    np.testing.assert_array_equal(X[0], X[1])
+
+def test_layout_key_covers_feature_version(tmp_path, monkeypatch):
+    store = FeatureStore(str(tmp_path))
+    store.features(SEQS)
+    store.save()
+    old = featstore.LAYOUT_KEY
+    monkeypatch.setattr(features, "FEATURES_VERSION", "changed")
+    try:
+        importlib.reload(featstore)
+        assert featstore.LAYOUT_KEY != old
+        fresh = featstore.FeatureStore(str(tmp_path))
+        fresh.features(SEQS)
+        assert fresh.computed == len(SEQS)
+        fresh.save()
+        assert len([f for f in os.listdir(tmp_path) if f.endswith(".keys.npy")]) == 2
+    finally:
+        monkeypatch.undo()
+        importlib.reload(featstore)
+    assert featstore.LAYOUT_KEY == old
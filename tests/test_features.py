@@ -0,0 +1,109 @@
+"""Batch features against Biopython ProteinAnalysis and the original per-sequence Counter formulas."""
+
+from collections import Counter
+
+import numpy as np
+import pytest
+from Bio.SeqUtils.ProtParam import ProteinAnalysis
+
+from features import (AA, AAC_NAMES, DPC_NAMES, PHYSCHEM_NAMES, PROTEIN_DIM, PROTEIN_NAMES, aac, clean_seq,
+                      dpc, physchem, protein_features)
+
+RTOL, ATOL = 1e-5, 1e-6   # float32 output
+
+# -------------------------
+# Reference implementations (the formulas the vectorized code replaced)
+# -------------------------
+def ref_aac(seq):
+    c = Counter(seq)
+    return [c[a] / max(1, len(seq)) for a in AA]
+
+def ref_dpc(seq):
+    pairs = [seq[i:i + 2] for i in range(len(seq) - 1)]
+    c = Counter(pairs)
+    total = max(1, len(pairs))
+    return [c[a + b] / total for a in AA for b in AA]
+
+def ref_physchem(seq):
+    if len(seq) < 5:
+        return [len(seq), 0.0, 0.0, 0.0, 0.0]
+    pa = ProteinAnalysis(seq)
+    return [len(seq), pa.molecular_weight(), pa.gravy(), pa.aromaticity(), pa.instability_index()]
+
+def reference(raw):
+    seq = clean_seq(raw)
+    return np.array(ref_aac(seq) + ref_dpc(seq) + ref_physchem(seq))
+
+# -------------------------
+# Sequences
+# -------------------------
+def random_seqs(n, low, high, seed):
+    rng = np.random.default_rng(seed)
+    letters = np.array(list(AA))
+    return ["".join(rng.choice(letters, size=rng.integers(low, high + 1))) for _ in range(n)]
+
+RANDOM = random_seqs(60, 5, 1500, seed=0)
+SHORT = ["", "A", "MK", "WYF", "ACDE", "ACDEF"]
+NON_STANDARD = [
+    "MKXXTAYIAKQR",             # unknown residue
+    "MBZKTAYIAKQRQISF",         # ambiguous Asx / Glx
+    "MUKTAYUIAKQROOISF",        # selenocysteine / pyrrolysine
+    "mktayiakqrqisfvkshfsrq",   # lowercase
+    "MkTaY-IAK*QR QIS\nFVK",    # mixed case, gaps, stop, whitespace
+    "XXXXBZUO",                 # nothing standard left
+    "XAXCXDX",                  # fewer than 5 standard residues once cleaned
+]
+LONG = random_seqs(3, 20000, 35000, seed=1)
+ALL = RANDOM + SHORT + NON_STANDARD + LONG
+
+@pytest.fixture(scope="module")
+def batch():
+    return protein_features(ALL)
+
+@pytest.mark.parametrize("i", range(len(ALL)))
+def test_protein_features_match_reference(batch, i):
+    np.testing.assert_allclose(batch[i], reference(ALL[i]), rtol=RTOL, atol=ATOL)
+
+def test_layout_and_dtype(batch):
+    assert batch.shape == (len(ALL), PROTEIN_DIM)
+    assert batch.dtype == np.float32
+    assert len(AAC_NAMES) + len(DPC_NAMES) + len(PHYSCHEM_NAMES) == PROTEIN_DIM
+
+@pytest.mark.parametrize("seq", RANDOM[:5] + SHORT + NON_STANDARD)
+def test_single_sequence_helpers(seq):
+    cleaned = clean_seq(seq)
+    np.testing.assert_allclose(aac(seq), ref_aac(cleaned), rtol=RTOL, atol=ATOL)
+    np.testing.assert_allclose(dpc(seq), ref_dpc(cleaned), rtol=RTOL, atol=ATOL)
+    np.testing.assert_allclose(physchem(seq), ref_physchem(cleaned), rtol=RTOL, atol=ATOL)
+
+@pytest.mark.parametrize("name", ["mw", "gravy", "arom", "instab"])
+def test_physchem_against_protein_analysis(batch, name):
+    col = PROTEIN_NAMES.index(name)
+    method = {"mw": "molecular_weight", "gravy": "gravy", "arom": "aromaticity", "instab": "instability_index"}[name]
+    for raw in RANDOM + LONG:
+        expected = getattr(ProteinAnalysis(clean_seq(raw)), method)()
+        assert batch[ALL.index(raw), col] == pytest.approx(expected, rel=RTOL, abs=ATOL)
+
+def test_short_sequences_have_zero_physchem_but_length(batch):
+    start = PROTEIN_NAMES.index("len")
+    for seq in SHORT[:5]:
+        row = batch[ALL.index(seq)]
+        assert row[start] == len(seq)
+        assert not row[start + 1:].any()
+
+def test_batch_rows_do_not_leak_dipeptides():
+    # the last residue of one sequence and the first of the next are not a dipeptide
+    X = protein_features(["AAAAA", "CCCCC"])
+    ac = PROTEIN_NAMES.index("dpc_AC")
+    assert X[0, ac] == 0 and X[1, ac] == 0
+    np.testing.assert_array_equal(X, np.vstack([protein_features(["AAAAA"]), protein_features(["CCCCC"])]))
+
+@pytest.mark.parametrize("names", [["aac_A"], ["dpc_WY"], ["len"], ["gravy"], ["aac_C", "instab"]])
+def test_subset_names_compute_only_what_is_asked(names):
+    full = protein_features(RANDOM[:10])
+    part = protein_features(RANDOM[:10], names)
+    idx = [PROTEIN_NAMES.index(n) for n in names]
+    np.testing.assert_array_equal(part[:, idx], full[:, idx])
+
+def test_empty_batch():
+    assert protein_features([]).shape == (0, PROTEIN_DIM)
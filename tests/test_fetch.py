@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+import fetch
+from fetch import fetch_fasta_many
+
+SEQ = "MFVFLVLLPLVSSQCVNLTTRTQLPPAYTNSFTRGVYYPDKVFRSSVLHSTQDLFLPFFSNVTWFHAIHVSGTNGTKRFDNPVLPFNDGVYFASTEKSNIIRGWIFGTTLDSKTQSLLIVNNATNVVIKVCEFQFCNDPFLGVYYHKNNKSW"
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of sleeping."""
+    delays = []
+    monkeypatch.setattr(fetch.time, "sleep", delays.append)
+    return delays
+
+def fetch_one(uniprot, acc, **kwargs):
+    seqs, report = fetch_fasta_many([acc], base_url=uniprot.url, **kwargs)
+    assert len(report) == 1
+    return seqs.get(acc), report[0]
+
+def test_ok(uniprot, sleeps):
+    uniprot.routes["P0DTC2"] = [(200, uniprot.fasta("P0DTC2", SEQ))]
+    seq, row = fetch_one(uniprot, "P0DTC2")
+    assert seq == SEQ
+    assert row["status"] == "ok" and row["attempts"] == 1 and row["error"] is None
+    assert sleeps == []
+
+def test_404_is_not_found_without_retries(uniprot, sleeps):
+    seq, row = fetch_one(uniprot, "NOPE")
+    assert seq is None
+    assert row["status"] == "not_found" and row["error"] == "HTTP 404" and row["attempts"] == 1
+    assert uniprot.hits["NOPE"] == 1
+    assert sleeps == []
+
+def test_200_without_fasta_is_not_found(uniprot, sleeps):
+    uniprot.routes["EMPTY"] = [(200, "")]
+    seq, row = fetch_one(uniprot, "EMPTY")
+    assert seq is None and row["status"] == "not_found"
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_transient_status_succeeds_after_retries(uniprot, sleeps, status):
+    uniprot.routes["P1"] = [(status, "busy"), (status, "busy"), (200, uniprot.fasta("P1", SEQ))]
+    seq, row = fetch_one(uniprot, "P1", retries=3, backoff=0.5)
+    assert seq == SEQ
+    assert row["status"] == "ok" and row["attempts"] == 3
+    assert sleeps == [0.5, 1.0]     # exponential backoff
+
+def test_retries_exhausted(uniprot, sleeps):
+    uniprot.routes["P1"] = [(503, "busy")]
+    seq, row = fetch_one(uniprot, "P1", retries=2, backoff=0.1)
+    assert seq is None
+    assert row["status"] == "error" and row["error"] == "HTTP 503" and row["attempts"] == 3
+    assert uniprot.hits["P1"] == 3
+    assert sleeps == pytest.approx([0.1, 0.2])
+
+def test_other_http_errors_are_not_retried(uniprot, sleeps):
+    uniprot.routes["P1"] = [(403, "forbidden"), (200, uniprot.fasta("P1", SEQ))]
+    seq, row = fetch_one(uniprot, "P1")
+    assert seq is None
+    assert row["status"] == "error" and row["error"] == "HTTP 403" and row["attempts"] == 1
+
+def test_connection_error_is_retried_then_reported(dead_url, sleeps):
+    seqs, report = fetch_fasta_many(["P1"], base_url=dead_url, retries=2, backoff=0.1, timeout=2)
+    assert seqs == {}
+    row = report[0]
+    assert row["status"] == "error" and row["attempts"] == 3
+    assert row["error"].startswith("ConnectionError")
+    assert len(sleeps) == 2
+
+def test_report_covers_every_accession_in_order(uniprot, sleeps):
+    uniprot.routes["A"] = [(200, uniprot.fasta("A", SEQ))]
+    uniprot.routes["B"] = [(500, "oops"), (200, uniprot.fasta("B", SEQ[:50]))]
+    uniprot.routes["D"] = [(502, "bad gateway")]
+    seqs, report = fetch_fasta_many(["A", "B", "C", "A", "D"], max_workers=4, retries=1,
+                                    backoff=0, base_url=uniprot.url + "/")
+    assert seqs == {"A": SEQ, "B": SEQ[:50]}
+    assert [r["accession"] for r in report] == ["A", "B", "C", "D"]     # duplicates fetched once
+    assert [r["status"] for r in report] == ["ok", "ok", "not_found", "error"]
+    assert [r["attempts"] for r in report] == [1, 2, 1, 2]
+    assert uniprot.hits["A"] == 1
+    for r in report:
+        assert set(r) == {"accession", "status", "attempts", "error", "seconds"}
+        assert r["seconds"] >= 0
+
+def test_real_backoff_waits(uniprot):
+    uniprot.routes["P1"] = [(429, "slow down"), (200, uniprot.fasta("P1", SEQ))]
+    start = time.perf_counter()
+    seq, row = fetch_one(uniprot, "P1", backoff=0.2)
+    assert seq == SEQ and row["attempts"] == 2
+    assert time.perf_counter() - start >= 0.2
@@ -0,0 +1,182 @@
+import json
+import subprocess
+import sys
+from collections import Counter
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+import xgboost as xgb
+from xgboost import XGBClassifier
+
+import predict
+from conftest import random_seqs
+from engine import InferenceEngine, mark_kmers, mark_sparse
+from features import FEATURE_COLUMNS, PROTEIN_NAMES, clean_seq, pair_features, protein_features
+from kmers import KmerSpectrum, config_path, from_booster, load_config, save_config
+
+SEQS = random_seqs(30, 1, 300, seed=50) + ["", "MK", "mkt-ayX*iak"]
+
+def reference(seq, spectrum):
+    """Per-k-mer normalized counts by brute force, in spectrum.names order (unhashed)."""
+    seq = clean_seq(seq)
+    row = {}
+    for k in spectrum.k:
+        counts = Counter(seq[i:i + k] for i in range(len(seq) - k + 1))
+        for kmer, c in counts.items():
+            row[f"k{k}_{kmer}"] = c / max(1, len(seq) - k + 1) if spectrum.normalize else c
+    return np.array([row.get(name, 0.0) for name in spectrum.names])
+
+# -------------------------
+# KmerSpectrum
+# -------------------------
+@pytest.mark.parametrize("k,normalize", [((1, 2, 3), True), ((2,), False), ((1, 3), True)])
+def test_spectrum_matches_brute_force(k, normalize):
+    spectrum = KmerSpectrum(k, normalize=normalize)
+    X = spectrum.transform(SEQS)
+    assert X.shape == (len(SEQS), spectrum.dim) and X.dtype == np.float32
+    assert len(spectrum.names) == spectrum.dim == sum(20 ** x for x in spectrum.k)
+    for i, seq in enumerate(SEQS):
+        np.testing.assert_allclose(X[i].toarray()[0], reference(seq, spectrum), rtol=1e-6)
+
+def test_hashed_spectrum_folds_the_full_one():
+    full, hashed = KmerSpectrum((1, 2, 3)), KmerSpectrum((1, 2, 3), n_features=64)
+    X, H = full.transform(SEQS), hashed.transform(SEQS)
+    assert H.shape == (len(SEQS), 64) and hashed.names == [f"kh_{i}" for i in range(64)]
+    # each unhashed column lands in exactly one hashed column
+    cols = np.concatenate([hashed._columns(k, np.arange(20 ** k)) for k in hashed.k])
+    fold = sp.csr_matrix((np.ones(full.dim), (np.arange(full.dim), cols)), shape=(full.dim, 64))
+    np.testing.assert_allclose((X @ fold).toarray(), H.toarray(), rtol=1e-5)
+
+def test_spectrum_is_deterministic_across_processes():
+    code = ("import sys, json; sys.path.insert(0, 'src'); from kmers import KmerSpectrum; "
+            "X = KmerSpectrum((1, 2, 3), n_features=97).transform(['MKTAYIAKQRQISFVKSHFSRQ']); "
+            "print(json.dumps([X.indices.tolist(), X.data.tolist()]))")
+    runs = {subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                           env={"PYTHONHASHSEED": seed}).stdout for seed in ("1", "2")}
+    assert len(runs) == 1
+    X = KmerSpectrum((1, 2, 3), n_features=97).transform(["MKTAYIAKQRQISFVKSHFSRQ"])
+    assert json.loads(runs.pop()) == [X.indices.tolist(), X.data.tolist()]
+
+@pytest.mark.parametrize("n_features", [None, 50])
+def test_column_subset_fills_only_those_columns(n_features):
+    spectrum = KmerSpectrum((1, 2, 3), n_features=n_features)
+    full = spectrum.transform(SEQS).toarray()
+    cols = [3, 25, 30, 41] if n_features else [3, 25, 30, 419]   # k = 1, 2 only: k = 3 is not counted
+    part = spectrum.transform(SEQS, cols).toarray()
+    np.testing.assert_array_equal(part[:, cols], full[:, cols])
+    assert not np.delete(part, cols, axis=1).any()
+
+def test_bad_k():
+    with pytest.raises(ValueError):
+        KmerSpectrum(())
+    with pytest.raises(ValueError):
+        KmerSpectrum((0, 1))
+
+# -------------------------
+# Configuration
+# -------------------------
+def test_config_round_trip(tmp_path):
+    csv = str(tmp_path / "final_ppi_dataset.csv")
+    assert load_config(csv) is None
+    spectrum = KmerSpectrum([3, 1, 1], n_features=256, normalize=False)
+    save_config(csv, spectrum.config())
+    assert config_path(csv) == str(tmp_path / "final_ppi_dataset.kmers.json")
+    loaded = KmerSpectrum.from_config(load_config(csv))
+    assert loaded.config() == {"k": [1, 3], "n_features": 256, "normalize": False}
+    assert loaded.names == spectrum.names
+    np.testing.assert_array_equal(loaded.transform(SEQS).toarray(), spectrum.transform(SEQS).toarray())
+    save_config(csv, None)
+    assert load_config(csv) is None
+    save_config(csv, None)   # nothing left to remove
+
+def test_from_booster():
+    booster = XGBClassifier(n_estimators=2).fit(np.random.default_rng(0).random((20, 3)), [0, 1] * 10).get_booster()
+    assert from_booster(booster) is None
+    config = KmerSpectrum((1, 2), n_features=128).config()
+    mark_kmers(booster, config)
+    assert from_booster(booster).config() == config
+    # the attribute survives a save / load
+    copy = xgb.Booster()
+    copy.load_model(bytearray(booster.save_raw("json")))
+    assert from_booster(copy).config() == config
+
+def test_pair_features_points_kmer_columns_to_the_engine():
+    with pytest.raises(ValueError, match="InferenceEngine"):
+        pair_features(["MKTAYIAKQR"], ["MKTAYIAKQR"], ["v_len", "h_k2_AC"])
+    with pytest.raises(ValueError, match="Unknown feature column: v_nope"):
+        pair_features(["MKTAYIAKQR"], ["MKTAYIAKQR"], ["v_nope"])
+
+# -------------------------
+# A k-mer model: train -> InferenceEngine / predict.py / app
+# -------------------------
+SPECTRUM = KmerSpectrum((1, 2), n_features=64)
+VIRAL, HUMAN = random_seqs(150, 30, 300, seed=51), random_seqs(150, 30, 300, seed=52)
+COLUMNS = FEATURE_COLUMNS + [f"v_{c}" for c in SPECTRUM.names] + [f"h_{c}" for c in SPECTRUM.names]
+
+def build_rows(viral, human):
+    """Pair rows the way pipeline.py builds a --kmers dataset."""
+    return sp.hstack([sp.csr_matrix(protein_features(viral)), sp.csr_matrix(protein_features(human)),
+                      SPECTRUM.transform(viral), SPECTRUM.transform(human)], format="csr", dtype=np.float32)
+
+@pytest.fixture(scope="module")
+def kmer_models(tmp_path_factory):
+    """Full and compact k-mer models, tagged and saved as train.py does."""
+    X = build_rows(VIRAL, HUMAN)
+    y = (X[:, COLUMNS.index("h_kh_5")].toarray()[:, 0] + X[:, COLUMNS.index("v_gravy")].toarray()[:, 0] > 0.05).astype(int)
+    out = tmp_path_factory.mktemp("models")
+    models = {}
+    for name, cols in (("full", COLUMNS), ("top", ["v_gravy", "h_len", "h_kh_5", "v_kh_7", "h_kh_40"])):
+        model = XGBClassifier(n_estimators=15, max_depth=3, n_jobs=1, random_state=0)
+        model.fit(X[:, [COLUMNS.index(c) for c in cols]], y)
+        booster = mark_kmers(mark_sparse(model.get_booster(), cols), SPECTRUM.config())
+        booster.save_model(str(out / f"{name}.json"))
+        joblib.dump(cols, out / f"{name}.pkl")
+        models[name] = (model, cols, str(out / f"{name}.json"), str(out / f"{name}.pkl"))
+    return models
+
+PAIRS = list(zip(random_seqs(12, 30, 300, seed=53), random_seqs(12, 30, 300, seed=54)))
+
+def trained_probs(model, cols):
+    X = build_rows([v for v, _ in PAIRS], [h for _, h in PAIRS])
+    return model.predict_proba(X[:, [COLUMNS.index(c) for c in cols]])[:, 1]
+
+@pytest.mark.parametrize("name", ["full", "top"])
+def test_engine_and_predict_match_training(kmer_models, name):
+    model, cols, model_path, cols_path = kmer_models[name]
+    engine = InferenceEngine.load(model_path, cols_path)
+    assert engine.kmers.config() == SPECTRUM.config()
+    expected = trained_probs(model, cols)
+    for (v, h), p in zip(PAIRS, expected):
+        assert engine.predict_pair(v, h) == pytest.approx(p, abs=1e-6)
+        assert predict.predict_interaction(v, h, engine, engine.feature_cols)["interaction_probability"] == \
+            pytest.approx(round(float(p), 4), abs=1e-4)
+
+def test_compact_model_counts_only_its_columns(kmer_models):
+    full = InferenceEngine.load(*kmer_models["full"][2:])
+    top = InferenceEngine.load(*kmer_models["top"][2:])
+    assert full.kmer_columns is None
+    assert top.kmer_columns.tolist() == [5, 7, 40]
+    blocks = top.protein_blocks([v for v, _ in PAIRS])
+    assert blocks.shape[1] == len(PROTEIN_NAMES) + SPECTRUM.dim
+    assert set(blocks[:, len(PROTEIN_NAMES):].indices) <= {5, 7, 40}
+
+@pytest.mark.parametrize("name", ["full", "top"])
+def test_app_matches_training(kmer_models, webapp, monkeypatch, name):
+    model, cols, model_path, cols_path = kmer_models[name]
+    monkeypatch.setattr(webapp, "_engine", InferenceEngine.load(model_path, cols_path))
+    monkeypatch.setattr(webapp, "result_cache", webapp.ResultCache())
+    results = webapp.score_pairs(PAIRS)
+    np.testing.assert_allclose([r["probability"] for r in results], np.round(trained_probs(model, cols), 4), atol=1e-4)
+
+def test_screen_with_a_kmer_model(kmer_models, human_csv, tmp_path):
+    model, cols, model_path, cols_path = kmer_models["full"]
+    engine = InferenceEngine.load(model_path, cols_path)
+    viral = PAIRS[0][0]
+    out = predict.screen(viral, top_k=5, model=engine, feature_cols=engine.feature_cols, human_csv=human_csv,
+                         chunk_size=64, cache_dir=str(tmp_path / "cache"))
+    humans = pd.read_csv(human_csv).set_index("uniprot")["sequence"]
+    X = build_rows([viral] * len(out), humans[out["human_protein"]].tolist())
+    np.testing.assert_allclose(out["interaction_probability"], np.round(model.predict_proba(X)[:, 1], 4), atol=1e-4)
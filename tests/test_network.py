@@ -0,0 +1,170 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset import save_dataset
+
+# -------------------------
+# A small network
+# -------------------------
+# P0DTC2 (Spike): H1 H2 H3 known, H1 twice (two BioGRID records)
+# P0DTC9 (Nucleocapsid): H1 H4 known
+# P0DTC5 (Membrane): H1 known
+# predicted: P0DTC2-H4 0.9, P0DTC2-H5 0.6, P0DTC9-H2 0.7, P0DTC9-H2 0.8 (duplicate), P0DTC2-H1 0.95 (also known)
+KNOWN = pd.DataFrame([
+    ("P0DTC2", "H1"), ("P0DTC2", "H1"), ("P0DTC2", "H2"), ("P0DTC2", "H3"),
+    ("P0DTC9", "H1"), ("P0DTC9", "H4"), ("P0DTC5", "H1"),
+], columns=["viral_uniprot", "human_uniprot"])
+PREDICTED = pd.DataFrame([
+    ("P0DTC2", "H4", 0.9), ("P0DTC2", "H5", 0.6), ("P0DTC9", "H2", 0.7), ("P0DTC9", "H2", 0.8), ("P0DTC2", "H1", 0.95),
+], columns=["viral_uniprot", "human_uniprot", "probability"])
+
+@pytest.fixture(scope="module")
+def network(webapp):
+    import network
+    return network
+
+@pytest.fixture
+def index(network):
+    return network.NetworkIndex(KNOWN, PREDICTED)
+
+def pairs(page):
+    return [(e["source"], e["target"]) for e in page["edges"]]
+
+# -------------------------
+# Index
+# -------------------------
+def test_page_bounds(network):
+    assert network.page_bounds(10, 0, 4) == (0, 4, {"total": 10, "offset": 0, "limit": 4, "next_offset": 4})
+    assert network.page_bounds(10, 8, 4)[2]["next_offset"] is None
+    assert network.page_bounds(10, -5, 0)[:2] == (0, 1)
+    assert network.page_bounds(5000, 0, 10 ** 6)[1] == network.MAX_PAGE
+    assert network.page_bounds(0)[2] == {"total": 0, "offset": 0, "limit": 100, "next_offset": None}
+
+def test_edges_merge_known_and_predicted(index):
+    edges = index.edges.set_index(["viral_uniprot", "human_uniprot"])
+    assert len(edges) == 9
+    assert edges.loc[("P0DTC2", "H1"), "kind"] == "known"
+    assert edges.loc[("P0DTC2", "H1"), "evidence"] == 2
+    assert edges.loc[("P0DTC2", "H1"), "probability"] == 0.95          # known edge carries the prediction
+    assert edges.loc[("P0DTC9", "H2"), "probability"] == 0.8           # best of duplicate predictions
+    assert edges.loc[("P0DTC2", "H5"), "kind"] == "predicted"
+    summary = index.summary()
+    assert (summary["known_edges"], summary["predicted_edges"]) == (6, 3)
+    assert (summary["viral_proteins"], summary["human_proteins"], summary["max_human_degree"]) == (3, 5, 3)
+    assert [(v["id"], v["label"], v["degree"]) for v in summary["viral"]] == \
+        [("P0DTC2", "Spike (S)", 5), ("P0DTC9", "Nucleocapsid (N)", 3), ("P0DTC5", "Membrane (M)", 1)]
+
+def test_known_only_index(network):
+    index = network.NetworkIndex(KNOWN)
+    assert (index.edges["kind"] == "known").all() and index.edges["probability"].isna().all()
+    assert index.subgraph(kind="predicted")["total"] == 0
+
+def test_neighbors_known_first_then_by_probability(index):
+    page = index.neighbors("P0DTC2")
+    # a known edge without a score ranks as probability 1, ahead of the known H1 edge scored 0.95
+    assert pairs(page) == [("P0DTC2", "H2"), ("P0DTC2", "H3"), ("P0DTC2", "H1"), ("P0DTC2", "H4"), ("P0DTC2", "H5")]
+    assert [e["kind"] for e in page["edges"]] == ["known"] * 3 + ["predicted"] * 2
+    assert [n["id"] for n in page["nodes"]] == ["H2", "H3", "H1", "H4", "H5"]
+    assert page["node"] == {"id": "P0DTC2", "label": "Spike (S)", "type": "viral", "degree": 5}
+    assert pairs(index.neighbors("P0DTC2", "predicted")) == [("P0DTC2", "H4"), ("P0DTC2", "H5")]
+    assert index.neighbors("P0DTC2", "known")["node"]["degree"] == 3
+
+def test_neighbors_of_a_human_protein(index):
+    page = index.neighbors("H2")
+    assert pairs(page) == [("P0DTC2", "H2"), ("P0DTC9", "H2")]
+    assert [n["type"] for n in page["nodes"]] == ["viral", "viral"]
+    assert page["edges"][1]["probability"] == 0.8
+    assert index.neighbors("H5", "known")["total"] == 0
+
+def test_neighbor_pages_concatenate(index):
+    full = pairs(index.neighbors("P0DTC2"))
+    got, offset = [], 0
+    while offset is not None:
+        page = index.neighbors("P0DTC2", offset=offset, limit=2)
+        got += pairs(page)
+        offset = page["next_offset"]
+    assert got == full
+
+def test_subgraph_orders_hubs_first_and_filters_by_degree(index):
+    page = index.subgraph()
+    assert page["total"] == 9
+    degrees = [index.views["all"].human_degree[h] for _, h in pairs(page)]
+    assert degrees == sorted(degrees, reverse=True)
+    assert pairs(page)[:3] == [("P0DTC2", "H1"), ("P0DTC5", "H1"), ("P0DTC9", "H1")]
+    assert {n["id"] for n in page["nodes"]} == {x for e in pairs(page) for x in e}
+
+    hubs = index.subgraph(min_degree=2)
+    assert hubs["total"] == 7 and "H3" not in {h for _, h in pairs(hubs)} and "H5" not in {h for _, h in pairs(hubs)}
+    assert index.subgraph(min_degree=4)["total"] == 0
+    known = index.subgraph(kind="known", min_degree=2)
+    assert pairs(known) == [("P0DTC2", "H1"), ("P0DTC5", "H1"), ("P0DTC9", "H1")]
+
+def test_subgraph_pages_concatenate(index):
+    full = pairs(index.subgraph(min_degree=2))
+    pages = [index.subgraph(min_degree=2, offset=o, limit=3) for o in (0, 3, 6)]
+    assert sum((pairs(p) for p in pages), []) == full
+    assert [p["next_offset"] for p in pages] == [3, 6, None]
+
+def test_nodes_by_degree_and_query(index):
+    assert [n["id"] for n in index.nodes("human")["nodes"]] == ["H1", "H2", "H4", "H3", "H5"]
+    assert [n["id"] for n in index.nodes("human", min_degree=2)["nodes"]] == ["H1", "H2", "H4"]
+    assert [n["id"] for n in index.nodes("viral", q="spike")["nodes"]] == ["P0DTC2"]
+    assert [n["id"] for n in index.nodes("viral", q="dtc9")["nodes"]] == ["P0DTC9"]
+    page = index.nodes("human", offset=1, limit=2)
+    assert [n["id"] for n in page["nodes"]] == ["H2", "H4"] and page["next_offset"] == 3
+    assert index.nodes("human", kind="predicted")["total"] == 3
+
+def test_load_and_staleness(network, tmp_path):
+    ids = pd.concat([KNOWN.assign(label=1), pd.DataFrame({"viral_uniprot": ["P0DTC5"], "human_uniprot": ["H9"], "label": [0]})],
+                    ignore_index=True)
+    dataset = str(tmp_path / "final_ppi_dataset.csv")
+    save_dataset(ids, np.zeros((len(ids), 2), dtype=np.float32), ["v_len", "h_len"], dataset)
+    predicted = str(tmp_path / "predicted_edges.csv")
+
+    index = network.NetworkIndex.load(dataset, predicted)
+    assert index.summary()["predicted_edges"] == 0 and not index.has_node("H9")   # negatives are not edges
+    assert not index.is_stale()
+    PREDICTED.to_csv(predicted, index=False)
+    assert index.is_stale()
+    index = network.NetworkIndex.load(dataset, predicted)
+    assert index.summary()["predicted_edges"] == 3 and not index.is_stale()
+
+# -------------------------
+# /api/network/*
+# -------------------------
+@pytest.fixture
+def client(webapp, index, monkeypatch):
+    monkeypatch.setattr(webapp, "_network", index)
+    return webapp.app.test_client()
+
+def test_api_pages(client):
+    res = client.get("/api/network/summary")
+    assert res.status_code == 200 and res.json["known_edges"] == 6
+    res = client.get("/api/network/subgraph?min_degree=2&offset=3&limit=3")
+    assert res.status_code == 200 and (res.json["offset"], res.json["next_offset"]) == (3, 6)
+    res = client.get("/api/network/neighbors/P0DTC9?kind=predicted")
+    assert res.status_code == 200 and [e["target"] for e in res.json["edges"]] == ["H2"]
+    res = client.get("/api/network/nodes?type=viral&q=membrane")
+    assert res.status_code == 200 and [n["id"] for n in res.json["nodes"]] == ["P0DTC5"]
+    # non-numeric paging arguments fall back to the defaults
+    res = client.get("/api/network/nodes?offset=x&limit=y")
+    assert res.status_code == 200 and (res.json["offset"], res.json["limit"]) == (0, 100)
+
+@pytest.mark.parametrize("url", [
+    "/api/network/nodes?type=protein",
+    "/api/network/nodes?kind=maybe",
+    "/api/network/neighbors/P0DTC2?kind=maybe",
+    "/api/network/subgraph?kind=maybe",
+])
+def test_api_bad_arguments(client, url):
+    res = client.get(url)
+    assert res.status_code == 400
+    assert "error" in res.json
+
+def test_api_unknown_node(client):
+    res = client.get("/api/network/neighbors/Q99999")
+    assert res.status_code == 404
+    assert res.json == {"error": "Unknown protein: Q99999"}
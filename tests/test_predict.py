@@ -0,0 +1,148 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import predict
+from conftest import random_seqs
+from features import pair_features
+from predict import load_human_features, screen
+
+VIRAL = random_seqs(1, 200, 200, seed=20)[0]
+
+# -------------------------
+# Human feature blocks
+# -------------------------
+def test_human_blocks_cached_and_memory_mapped(human_csv, tmp_path):
+    ids, blocks = load_human_features(human_csv, str(tmp_path / "cache"))
+    assert len(ids) == 300 and blocks.shape == (300, 425)
+    files = sorted(os.listdir(tmp_path / "cache"))
+    ids2, blocks2 = load_human_features(human_csv, str(tmp_path / "cache"))
+    assert isinstance(blocks2, np.memmap)
+    np.testing.assert_array_equal(blocks, blocks2)
+    assert sorted(os.listdir(tmp_path / "cache")) == files
+
+def test_human_block_key_covers_feature_version(human_csv, tmp_path, monkeypatch):
+    cache = str(tmp_path / "cache")
+    load_human_features(human_csv, cache)
+    monkeypatch.setattr(predict, "FEATURES_VERSION", "changed")
+    load_human_features(human_csv, cache)
+    assert len([f for f in os.listdir(cache) if f.endswith(".ids.npy")]) == 2
+
+# -------------------------
+# Screen
+# -------------------------
+def reference_screen(model, human_csv):
+    """Every scorable human, best first (ties: first listed), scored through the sklearn model."""
+    humans = pd.read_csv(human_csv)
+    ok = humans["sequence"].map(predict.clean_seq).str.len() >= 5
+    humans = humans[ok]
+    probs = model.predict_proba(pair_features([VIRAL] * len(humans), humans["sequence"].tolist()))[:, 1]
+    order = np.lexsort((np.arange(len(probs)), -probs))
+    return humans["uniprot"].to_numpy()[order], probs[order]
+
+@pytest.mark.parametrize("top_k,chunk_size", [(10, 37), (10, 25000), (50, 7), (1, 300), (1000, 64)])
+def test_screen_matches_full_ranking(tiny_model, human_csv, tmp_path, top_k, chunk_size):
+    model, cols = tiny_model
+    ids, probs = reference_screen(model, human_csv)
+    out = screen(VIRAL, top_k=top_k, model=model, feature_cols=cols, human_csv=human_csv,
+                 chunk_size=chunk_size, cache_dir=str(tmp_path / "cache"))
+    k = min(top_k, len(ids))
+    assert len(out) == k
+    assert out["rank"].tolist() == list(range(1, k + 1))
+    np.testing.assert_allclose(out["interaction_probability"], np.round(probs[:k], 4), atol=1e-4)
+    # ids agree wherever the score is not tied with a neighbour
+    step = np.diff(probs) != 0
+    distinct = (np.r_[True, step] & np.r_[step, True])[:k]
+    assert (out["human_protein"].to_numpy()[distinct] == ids[:k][distinct]).all()
+    assert "Q00005" not in set(out["human_protein"]) and "Q00017" not in set(out["human_protein"])
+
+def test_screen_rejects_bad_input(tiny_model, human_csv, tmp_path):
+    model, cols = tiny_model
+    with pytest.raises(ValueError):
+        screen(VIRAL, top_k=0, model=model, feature_cols=cols, human_csv=human_csv, cache_dir=str(tmp_path))
+    with pytest.raises(ValueError):
+        screen("mkv", model=model, feature_cols=cols, human_csv=human_csv, cache_dir=str(tmp_path))
+
+# -------------------------
+# Batch predict
+# -------------------------
+@pytest.fixture
+def uniprot_cache(uniprot, tmp_path, monkeypatch):
+    """Route predict.py's sequence lookups to the local UniProt stand-in."""
+    from seqcache import SequenceCache
+
+    cache = SequenceCache(path=str(tmp_path / "seq.sqlite"), base_url=uniprot.url, timeout=5)
+    monkeypatch.setattr(predict, "get_cache", lambda: cache)
+    seqs = random_seqs(6, 50, 500, seed=30)
+    for acc, seq in zip(["P0DTC2", "P0DTC9", "Q11111", "Q22222", "Q33333", "Q44444"], seqs):
+        uniprot.routes[acc] = [(200, uniprot.fasta(acc, seq))]
+    uniprot.routes["Q55555"] = [(200, uniprot.fasta("Q55555", "MKV"))]          # too short
+    uniprot.routes["Q66666"] = [(503, "busy")]                                   # unavailable
+    return uniprot
+
+RAW = random_seqs(1, 80, 80, seed=31)[0].lower()
+
+BATCH = [
+    ("P0DTC2", "Q11111"),
+    ("P0DTC9", "Q22222"),
+    ("P0DTC2", "Q11111"),     # duplicate pair
+    ("P0DTC2", "Q55555"),     # human sequence too short
+    ("P9NOPE", "Q33333"),     # viral accession not found
+    ("P0DTC9", "Q66666"),     # human fetch fails
+    (RAW, "Q44444"),          # raw viral sequence
+    ("P9NOPE", "Q44444"),     # same unfetchable viral again
+    ("P0DTC9", "Q33333"),
+]
+
+def write_pairs(tmp_path, rows):
+    path = tmp_path / "pairs.csv"
+    pd.DataFrame(rows, columns=["viral_uniprot", "human_uniprot"]).to_csv(path, index=False)
+    return str(path)
+
+def test_batch_matches_single_predictions(tiny_model, uniprot_cache, tmp_path):
+    model, cols = tiny_model
+    out = predict.batch_predict(write_pairs(tmp_path, BATCH), str(tmp_path / "out.csv"), model, cols)
+    assert len(out) == len(BATCH)
+    assert pd.read_csv(tmp_path / "out.csv").shape == out.shape
+
+    for (v, h), (_, row) in zip(BATCH, out.iterrows()):
+        try:
+            single = predict.predict_interaction(v, h, model, cols)
+        except ValueError as e:
+            assert row["prediction"].startswith("ERROR: ")
+            assert row["interaction_probability"] is None or np.isnan(row["interaction_probability"])
+            assert (row["viral_protein"], row["human_protein"]) == (v, h)
+            assert row["viral_seq_length"] == 0 and row["human_seq_length"] == 0
+            continue
+        assert row["interaction_probability"] == pytest.approx(single["interaction_probability"], abs=1e-4)
+        for key in ("viral_protein", "human_protein", "prediction", "viral_seq_length", "human_seq_length"):
+            assert row[key] == single[key], key
+
+def test_batch_error_messages(tiny_model, uniprot_cache, tmp_path):
+    model, cols = tiny_model
+    out = predict.batch_predict(write_pairs(tmp_path, BATCH), model=model, feature_cols=cols)
+    errors = dict(zip(range(len(BATCH)), out["prediction"]))
+    viral_len = out.loc[0, "viral_seq_length"]    # P0DTC2, scored fine in row 0
+    assert errors[3] == f"ERROR: Sequences too short after cleaning (viral: {viral_len}, human: 3)"
+    assert errors[4] == "ERROR: Could not fetch sequence for P9NOPE"
+    assert errors[5] == "ERROR: Could not fetch sequence for Q66666"
+    assert errors[7] == errors[4]
+    assert not any(errors[i].startswith("ERROR") for i in (0, 1, 2, 6, 8))
+    assert out.loc[6, "viral_protein"] == "custom_viral"
+
+def test_batch_resolves_each_input_once(tiny_model, uniprot_cache, tmp_path):
+    model, cols = tiny_model
+    out = predict.batch_predict(write_pairs(tmp_path, BATCH), model=model, feature_cols=cols)
+    assert out.loc[0].equals(out.loc[2])
+    # the unfetchable accession appears twice but is requested once
+    assert uniprot_cache.hits["P9NOPE"] == 1
+    assert uniprot_cache.hits["P0DTC2"] == 1 and uniprot_cache.hits["Q44444"] == 1
+
+def test_batch_chunking_does_not_change_results(tiny_model, uniprot_cache, tmp_path):
+    model, cols = tiny_model
+    path = write_pairs(tmp_path, BATCH * 5)
+    whole = predict.batch_predict(path, model=model, feature_cols=cols)
+    chunked = predict.batch_predict(path, model=model, feature_cols=cols, chunk_size=3)
+    pd.testing.assert_frame_equal(whole, chunked)
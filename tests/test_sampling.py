@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+import sampling
+from sampling import _sample_codes, sample_negatives
+
+VIRAL = [f"V{i}" for i in range(5)]
+HUMAN = [f"H{i:03d}" for i in range(200)]
+
+def positives(seed=0, n=300):
+    rng = np.random.default_rng(seed)
+    return {(VIRAL[rng.integers(len(VIRAL))], HUMAN[rng.integers(len(HUMAN))]) for _ in range(n)}
+
+def pairs(df):
+    return list(zip(df["viral_uniprot"], df["human_uniprot"]))
+
+@pytest.fixture
+def dense_calls(monkeypatch):
+    """Count how often the dense (complement enumeration) regime runs."""
+    calls = []
+    real = np.setdiff1d
+
+    def spy(*args, **kwargs):
+        calls.append(args[0].shape)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(sampling.np, "setdiff1d", spy)
+    return calls
+
+def test_uniform_sampling_excludes_positives_and_repeats(dense_calls):
+    pos = positives()
+    neg = sample_negatives(VIRAL, HUMAN, pos, n=300, seed=1)
+    got = pairs(neg)
+    assert len(got) == 300
+    assert len(set(got)) == 300
+    assert not set(got) & pos
+    assert set(neg["viral_uniprot"]) <= set(VIRAL) and set(neg["human_uniprot"]) <= set(HUMAN)
+    assert dense_calls == []     # 300 of ~740 free pairs: rejection sampling
+
+def test_quotas_hold_per_viral_protein():
+    pos = positives()
+    quotas = {"V0": 10, "V2": 50, "V4": 0}
+    neg = sample_negatives(VIRAL, HUMAN, pos, quotas=quotas, seed=3)
+    counts = neg["viral_uniprot"].value_counts().to_dict()
+    assert counts == {"V0": 10, "V2": 50}
+    assert not set(pairs(neg)) & pos
+    assert len(set(pairs(neg))) == len(neg)
+
+def test_quota_capped_at_available_humans():
+    pos = {("V1", h) for h in HUMAN[:150]}
+    neg = sample_negatives(VIRAL, HUMAN, pos, quotas={"V1": 500}, seed=0)
+    assert len(neg) == 50
+    assert set(neg["human_uniprot"]) == set(HUMAN[150:])
+
+def test_same_seed_same_output():
+    pos = positives()
+    a = sample_negatives(VIRAL, HUMAN, pos, n=300, seed=7)
+    b = sample_negatives(VIRAL, HUMAN, pos, n=300, seed=7)
+    c = sample_negatives(VIRAL, HUMAN, pos, n=300, seed=8)
+    assert a.equals(b)
+    assert not a.equals(c)
+    q = {"V0": 20, "V3": 20}
+    assert sample_negatives(VIRAL, HUMAN, pos, quotas=q, seed=7).equals(
+        sample_negatives(VIRAL, HUMAN, pos, quotas=q, seed=7))
+
+def test_dense_regime_when_more_than_half_the_free_pairs_are_wanted(dense_calls):
+    total, excluded = 1000, np.arange(0, 1000, 4, dtype=np.int64)   # 750 free codes
+    rng = np.random.default_rng(0)
+
+    sparse = _sample_codes(rng, total, excluded, 375)                # exactly half: rejection
+    assert dense_calls == []
+    dense = _sample_codes(rng, total, excluded, 376)
+    assert len(dense_calls) == 1
+
+    for codes, n in ((sparse, 375), (dense, 376)):
+        assert len(codes) == n and len(np.unique(codes)) == n
+        assert not np.isin(codes, excluded).any()
+        assert codes.min() >= 0 and codes.max() < total
+
+def test_dense_regime_can_take_every_free_pair():
+    pos = positives(n=900)
+    free = len(VIRAL) * len(HUMAN) - len(pos)
+    neg = sample_negatives(VIRAL, HUMAN, pos, n=free + 100, seed=0)
+    assert len(neg) == free
+    all_pairs = {(v, h) for v in VIRAL for h in HUMAN}
+    assert set(pairs(neg)) == all_pairs - pos
+
+def test_positives_with_unknown_ids_are_ignored():
+    pos = {("V0", "H000"), ("VX", "H001"), ("V1", "HX")}
+    neg = sample_negatives(["V0"], ["H000", "H001", "H002"], pos, n=5, seed=0)
+    assert sorted(pairs(neg)) == [("V0", "H001"), ("V0", "H002")]
+
+def test_nothing_to_sample():
+    assert len(sample_negatives(VIRAL, HUMAN, positives(), n=0)) == 0
+    assert len(sample_negatives(VIRAL, [], [], n=10)) == 0
@@ -0,0 +1,126 @@
+from seqcache import SequenceCache
+
+SEQ = "MKTAYIAKQRQISFVKSHFSRQLEERLGLIEVQAPILSRVGDGTQDNLSGAEKAVQVKVKALPDAQFEVVHSLAKWKRQTLGQHDFSAGEGLYTHMKALRPDEDRLSPLHSVYVDQWDWERVMGDGERQFSTLKSTVEAIWAGIKATEAAVSEEFGLAPFLPDQIHFVHSQELLSRYPDLDAKGRERAIAKDLGAVFLVGIGGKLSDGHRHDVRAPDYDDWUAVSE"
+
+def make_cache(tmp_path, uniprot, **kwargs):
+    return SequenceCache(path=str(tmp_path / "seq.sqlite"), base_url=uniprot.url, **kwargs)
+
+def test_fetch_and_parse(tmp_path, uniprot):
+    uniprot.routes["P12345"] = [(200, uniprot.fasta("P12345", SEQ, "Spike glycoprotein"))]
+    cache = make_cache(tmp_path, uniprot)
+    assert cache.get("P12345") == (SEQ, "TEST_HUMAN Spike glycoprotein")
+    assert cache.get(" P12345 ")[0] == SEQ
+    assert "P12345" in cache
+
+def test_memory_lru_hits(tmp_path, uniprot):
+    for acc in ("A1", "A2", "A3"):
+        uniprot.routes[acc] = [(200, uniprot.fasta(acc, SEQ))]
+    # no disk layer: every hit after the first must come from memory
+    cache = SequenceCache(path=None, memory_size=2, base_url=uniprot.url)
+    cache.get("A1")
+    cache.get("A2")
+    cache.get("A1")
+    assert uniprot.hits["A1"] == 1
+    cache.get("A3")              # evicts A2, the least recently used
+    cache.get("A1")
+    assert uniprot.hits["A1"] == 1
+    cache.get("A2")
+    assert uniprot.hits["A2"] == 2
+    assert list(cache._mem) == ["A1", "A2"]
+
+def test_persists_across_instances(tmp_path, uniprot):
+    uniprot.routes["P12345"] = [(200, uniprot.fasta("P12345", SEQ))]
+    make_cache(tmp_path, uniprot).get("P12345")
+    assert uniprot.hits["P12345"] == 1
+
+    fresh = make_cache(tmp_path, uniprot)
+    assert fresh.get("P12345")[0] == SEQ
+    assert uniprot.hits["P12345"] == 1
+
+def test_max_bytes_evicts_least_recently_used(tmp_path, uniprot):
+    accs = [f"Q{i}" for i in range(6)]
+    for i, acc in enumerate(accs):
+        # distinct random-looking sequences so zlib cannot shrink them to nothing
+        seq = "".join("ACDEFGHIKLMNPQRSTVWY"[(j * 7 + i * 13 + j * j) % 20] for j in range(400))
+        uniprot.routes[acc] = [(200, uniprot.fasta(acc, seq))]
+    cache = make_cache(tmp_path, uniprot, max_bytes=10 ** 9)
+    cache.get(accs[0])
+    with cache._connect() as con:
+        size = con.execute("SELECT size FROM seq").fetchone()[0]
+
+    cache = make_cache(tmp_path, uniprot, max_bytes=int(size * 3.5), memory_size=1)
+    for acc in accs[1:]:
+        cache.get(acc)
+    with cache._connect() as con:
+        stored = {r[0] for r in con.execute("SELECT accession FROM seq")}
+        total = con.execute("SELECT SUM(size) FROM seq").fetchone()[0]
+    assert total <= cache.max_bytes
+    assert accs[-1] in stored
+    assert accs[0] not in stored
+
+def test_offline_never_touches_network(tmp_path, uniprot):
+    uniprot.routes["P12345"] = [(200, uniprot.fasta("P12345", SEQ))]
+    cache = make_cache(tmp_path, uniprot, offline=True)
+    assert cache.get("P12345") == (None, None)
+    assert "P12345" not in cache
+    assert uniprot.total_hits == 0
+
+    # offline still serves what an online instance stored
+    make_cache(tmp_path, uniprot).get("P12345")
+    assert make_cache(tmp_path, uniprot, offline=True).get("P12345")[0] == SEQ
+    assert uniprot.total_hits == 1
+
+def test_misses_and_network_errors_return_none(tmp_path, uniprot, dead_url):
+    cache = make_cache(tmp_path, uniprot)
+    assert cache.get("MISSING") == (None, None)
+    assert cache.get("MISSING") == (None, None)
+    assert uniprot.hits["MISSING"] == 2      # a miss is not cached
+
+    uniprot.routes["P5"] = [(503, "busy"), (200, uniprot.fasta("P5", SEQ))]
+    assert cache.get("P5") == (None, None)
+    assert cache.get("P5")[0] == SEQ
+
+    dead = SequenceCache(path=str(tmp_path / "dead.sqlite"), base_url=dead_url, timeout=2)
+    assert dead.get("P12345") == (None, None)
+
+def test_connections_are_closed(tmp_path, uniprot, monkeypatch):
+    import sqlite3
+    import seqcache
+
+    opened = []
+    real_connect = sqlite3.connect
+
+    class Tracked(sqlite3.Connection):
+        closed = False
+
+        def close(self):
+            self.closed = True
+            super().close()
+
+    def connect(*args, **kwargs):
+        con = real_connect(*args, factory=Tracked, **kwargs)
+        opened.append(con)
+        return con
+
+    monkeypatch.setattr(seqcache.sqlite3, "connect", connect)
+    uniprot.routes["P12345"] = [(200, uniprot.fasta("P12345", SEQ))]
+    cache = make_cache(tmp_path, uniprot, memory_size=1)
+    for _ in range(3):
+        cache.get("P12345")
+        cache._mem.clear()
+    assert "P12345" in cache
+    assert len(opened) >= 5
+    assert all(con.closed for con in opened)
+
+def test_concurrent_threads_share_one_session(tmp_path, uniprot):
+    from concurrent.futures import ThreadPoolExecutor
+
+    accs = [f"T{i}" for i in range(16)]
+    for acc in accs:
+        uniprot.routes[acc] = [(200, uniprot.fasta(acc, SEQ))]
+    cache = make_cache(tmp_path, uniprot)
+    session = cache._session
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        seqs = list(pool.map(lambda a: cache.get(a)[0], accs * 2))
+    assert seqs == [SEQ] * len(accs) * 2
+    assert cache._session is session
@@ -0,0 +1,182 @@
+import os
+import subprocess
+import sys
+
+import joblib
+import pytest
+
+from stages import StageGraph
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# -------------------------
+# A small graph: raw ─> clean ─> total, raw ─> count
+# -------------------------
+def scale_helper(x):
+    return 2 * x
+
+def build(tmp_path, scale=1, data_file=None, helper=scale_helper, total_checkpoint=True):
+    """Registered fresh on every call, the way pipeline.py registers its stages on import."""
+    graph = StageGraph(str(tmp_path / "checkpoints"))
+    data_file = data_file or str(tmp_path / "data.txt")
+
+    @graph.stage(files=[data_file], code=["stagemod"])
+    def raw():
+        import stagemod
+        with open(data_file) as f:
+            return [stagemod.parse(x) for x in f.read().split()]
+
+    @graph.stage(params={"scale": scale}, code=[helper])
+    def clean(raw):
+        return [helper(x) * scale for x in raw]
+
+    @graph.stage(checkpoint=total_checkpoint)
+    def total(clean):
+        return sum(clean)
+
+    @graph.stage(outputs=[str(tmp_path / "count.txt")])
+    def count(raw):
+        with open(tmp_path / "count.txt", "w") as f:
+            f.write(str(len(raw)))
+        return len(raw)
+
+    return graph
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    (tmp_path / "data.txt").write_text("1 2 3")
+    (tmp_path / "mods").mkdir()
+    (tmp_path / "mods" / "stagemod.py").write_text("def parse(x):\n    return int(x)\n")
+    monkeypatch.syspath_prepend(str(tmp_path / "mods"))
+    monkeypatch.delitem(sys.modules, "stagemod", raising=False)
+    return tmp_path
+
+def all_keys(graph):
+    return graph.keys(graph._order(graph.sinks()))
+
+def changed(a, b):
+    return sorted(n for n in a if a[n] != b[n])
+
+# -------------------------
+# Keys
+# -------------------------
+def test_keys_are_stable(workdir):
+    a, b = build(workdir), build(workdir)
+    assert all_keys(a) == all_keys(b)
+    assert len(set(all_keys(a).values())) == 4
+    assert a.sinks() == ["total", "count"]
+
+def test_param_change_invalidates_stage_and_dependents(workdir):
+    assert changed(all_keys(build(workdir)), all_keys(build(workdir, scale=3))) == ["clean", "total"]
+
+def test_file_change_invalidates_everything_downstream(workdir):
+    before = all_keys(build(workdir))
+    (workdir / "data.txt").write_text("1 2 3 4")
+    assert changed(before, all_keys(build(workdir))) == ["clean", "count", "raw", "total"]
+
+def test_declared_module_change_invalidates(workdir):
+    before = all_keys(build(workdir))
+    (workdir / "mods" / "stagemod.py").write_text("def parse(x):\n    return int(x) + 1\n")
+    assert changed(before, all_keys(build(workdir))) == ["clean", "count", "raw", "total"]
+
+def test_helper_and_own_source_changes_invalidate(workdir):
+    def scale_helper(x):    # same name, different body
+        return 3 * x
+
+    before = all_keys(build(workdir))
+    assert changed(before, all_keys(build(workdir, helper=scale_helper))) == ["clean", "total"]
+    # whether a stage is checkpointed is not part of its key
+    assert changed(before, all_keys(build(workdir, total_checkpoint=False))) == []
+
+    graph = build(workdir)
+    del graph.stages["count"]
+
+    @graph.stage(outputs=[str(workdir / "count.txt")])
+    def count(raw):
+        return len(set(raw))
+
+    assert changed(before, all_keys(graph)) == ["count"]
+
+def test_registration_errors(workdir):
+    graph = StageGraph(str(workdir / "checkpoints"))
+    with pytest.raises(ValueError, match="unregistered"):
+        @graph.stage()
+        def orphan(missing):
+            return missing
+    with pytest.raises(ValueError, match="no_such_module"):
+        @graph.stage(code=["no_such_module"])
+        def typo():
+            return 1
+    with pytest.raises(ValueError, match="Unknown stage"):
+        build(workdir).run(["nope"])
+
+# -------------------------
+# Runs
+# -------------------------
+def test_rerun_skips_checkpointed_stages(workdir):
+    assert build(workdir).run() == ["raw", "clean", "total", "count"]
+    assert build(workdir).run() == []
+    assert (workdir / "count.txt").read_text() == "3"
+
+def test_changed_param_reruns_only_what_it_affects(workdir):
+    build(workdir).run()
+    graph = build(workdir, scale=3)
+    assert graph.run() == ["clean", "total"]
+    key = all_keys(graph)["total"]
+    assert joblib.load(graph._path("total", key)) == 36
+    # only the current checkpoint is kept
+    assert os.listdir(workdir / "checkpoints" / "total") == [f"{key}.pkl"]
+
+def test_missing_output_or_checkpoint_reruns(workdir):
+    build(workdir).run()
+    os.remove(workdir / "count.txt")
+    assert build(workdir).run() == ["count"]
+    graph = build(workdir, total_checkpoint=False)
+    assert graph.run() == ["total"]
+    assert graph.run() == ["total"]     # never checkpointed, so never fresh
+
+def test_force(workdir):
+    build(workdir).run()
+    assert build(workdir).run(force=["clean"]) == ["clean", "total"]
+    assert build(workdir).run(force=["all"]) == ["raw", "clean", "total", "count"]
+
+def test_targets_run_only_what_they_need(workdir):
+    graph = build(workdir)
+    assert graph.run(["clean"]) == ["raw", "clean"]
+    assert not os.path.exists(workdir / "count.txt")
+    assert [(n, fresh) for n, _, _, fresh in graph.status(["total"])] == \
+        [("raw", True), ("clean", True), ("total", False)]
+    assert graph.run(["total"]) == ["total"]
+
+def test_status_lists_every_stage(workdir):
+    graph = build(workdir)
+    status = graph.status()
+    keys = all_keys(graph)
+    assert [(n, deps, k) for n, deps, k, _ in status] == [(n, graph.stages[n].deps, keys[n]) for n in keys]
+    assert not any(fresh for *_, fresh in status)
+
+# -------------------------
+# pipeline.py --list / --stage
+# -------------------------
+def pipeline(*args):
+    return subprocess.run([sys.executable, os.path.join(SRC, "pipeline.py"), *args],
+                          capture_output=True, text=True, timeout=300)
+
+def test_pipeline_list():
+    out = pipeline("--list")
+    assert out.returncode == 0, out.stderr
+    names = [line.split()[0] for line in out.stdout.splitlines()]
+    assert names == ["previous", "interactions", "human_sequences", "viral_sequences",
+                     "pairs", "negatives", "features", "save"]
+
+def test_pipeline_list_for_a_target_stage():
+    out = pipeline("--list", "--stage", "pairs")
+    assert out.returncode == 0, out.stderr
+    names = [line.split()[0] for line in out.stdout.splitlines()]
+    assert names == ["previous", "interactions", "human_sequences", "viral_sequences", "pairs"]
+    assert "<- interactions, viral_sequences, human_sequences" in out.stdout.splitlines()[-1]
+
+def test_pipeline_rejects_unknown_stage():
+    out = pipeline("--stage", "nope")
+    assert out.returncode == 2
+    assert "invalid choice: 'nope'" in out.stderr